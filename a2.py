@@ -1,10 +1,21 @@
 from curses.ascii import isdigit
 from sys import set_coroutine_origin_tracking_depth
 from a2_support import *
-from typing import Optional
+from typing import NamedTuple, Optional
+import random
+import sys
+from engine import ArrayEngine
+from events import *
+from house_cache import (CompiledHouse, NO_PLANT, UNSET_POT, cache_path, encode_house,
+    open_compiled, store_compiled)
+from snapshot import POT_REPELLENT, POT_UNSET, decode_snapshot, encode_snapshot
+from movelog import MoveLog
+from profiler import PROFILER
 
 class Entity():
     """ Abstract class is composed of Item, Plant and Pot. """
+    __slots__ = ()
+
     def get_class_name(self) -> str:
         """ Retrurn the name of entity's clsss. """
         return self.__class__.__name__
@@ -40,11 +51,25 @@ class Entity():
         return self.__class__.__name__ + "()"
         
 
+class Species(NamedTuple):
+    """ Growing requirements shared by every plant of one kind in PLANTS_DATA. """
+    name: str
+    index: int                      # Position of the species in PLANT_NAMES.
+    drink_rate: float
+    sun_levels: tuple[int, int]
+
+
+SPECIES = {name: Species(name, index, PLANTS_DATA[name]['drink rate'],
+    (PLANTS_DATA[name]['sun-lower'], PLANTS_DATA[name]['sun-upper']))
+    for index, name in enumerate(PLANT_NAMES)}
+
+
 class Plant(Entity):
     """ A plant Entity has water, health points (HP), age and repellent. 
         The drink rate and sun level are determined by the specific plant 
         according to constants.py.
     """
+    __slots__ = ('species', 'health', 'water', 'age', 'repellent')
 
     def __init__(self, name: str):
         """ Set up the plant with a given plant name. 
@@ -52,16 +77,20 @@ class Plant(Entity):
         Parameters:
             name: str from constants.py
         """
-        self.name = name
+        self.species = SPECIES[name]
         self.health = 10
         self.water = 10.0
         self.age = 0
         self.repellent = False
     
 
+    @property
+    def name(self) -> str:
+        return self.species.name
+
     def get_name(self) -> str:
         """ Return name of the plant. """
-        return self.name
+        return self.species.name
     
 
     def get_health(self) -> int:
@@ -81,14 +110,14 @@ class Plant(Entity):
 
     def get_drink_rate(self) -> float:	
         """ Return water drinking rate of the plant. """
-        return PLANTS_DATA[self.name]['drink rate']
+        return self.species.drink_rate
     
 
     def get_sun_levels(self) -> tuple[int, int]:	
         """ Return the acceptable sun level of the plant with the upper and
             lower range.
         """
-        return (PLANTS_DATA[self.name]['sun-lower'], PLANTS_DATA[self.name]['sun-upper'])
+        return self.species.sun_levels
     
 
     def decrease_water(self, amount: float):	
@@ -102,7 +131,7 @@ class Plant(Entity):
 
     def drink_water(self):
         """Reduce water levels by plant drink rate. """
-        self.water = self.water - self.get_drink_rate()
+        self.water = self.water - self.species.drink_rate
         if self.water < 0: # If water levels is zero the plant HP reduces by 1.
             self.health = self.health - 1
         
@@ -152,12 +181,20 @@ class Plant(Entity):
         """ Return True if the plant health is less than or equals to zero,
             False otherwise.
         """
-        if self.get_health() <= 0:
-            return True
-        else:
-            return False
+        return self.health <= 0
     
 
+    def copy(self) -> 'Plant':
+        """ Return a new plant of the same species in the same state. """
+        plant = Plant.__new__(Plant)
+        plant.species = self.species
+        plant.health = self.health
+        plant.water = self.water
+        plant.age = self.age
+        plant.repellent = self.repellent
+        return plant
+
+
     def __repr__(self) -> str:
         """ Return the text which could make a new instance of this class. """
         return self.__class__.__name__ + f"('{self.name}')"
@@ -209,8 +246,15 @@ class PossumRepellent(Item):
         plant.set_repellent(True)
     
 
+ITEM_TYPES = {WATER: Water, FERTILISER: Fertiliser, POSSUM_REPELLENT: PossumRepellent}
+
+
 class Inventory:
-    """ An Inventory contains and manages a collection of items and plant. """
+    """ An Inventory contains and manages a collection of items and plant. 
+        Entities are kept in buckets keyed by plant name or item id, so adding,
+        removing and counting do not depend on the size of the inventory.
+        Stock added by count is only turned into instances when taken out.
+    """
     def __init__(self, initial_items: Optional[list[Item]] = None, 
         initial_plants: Optional[list[Plant]] = None) -> None:
         """ Sets up initial inventory:
@@ -224,17 +268,13 @@ class Inventory:
             initial_items: list of class Item
             initial_plants: list of class Plant
         """
-        self.initial_items = initial_items
-        self.initial_plants = initial_plants
-        if self.initial_items == None and self.initial_plants == None:
-            self.initial_items = []
-            self.initial_plants =  []
-            inventory = {}
-        else:
-            inventory = {}
-            inventory["Item"] = self.initial_items
-            inventory["Plant"] = self.initial_plants
-        self.inventory = inventory
+        self.plants = {}                # Plant name -> instances with that name.
+        self.items = {}                 # Item id -> instances with that id.
+        self.stock = {}                 # Name or id -> units not yet created.
+        for item in initial_items or []:
+            self.add_entity(item)
+        for plant in initial_plants or []:
+            self.add_entity(plant)
     
     def add_entity(self, entity: Item | Plant) -> None:
         """ Adds the given item or plant to this inventory collection of entities.
@@ -243,9 +283,31 @@ class Inventory:
             entity: list of class Item or Plant
         """
         if entity.get_class_name() == "Plant":
-            self.initial_plants.append(entity)
+            self.plants.setdefault(entity.get_name(), []).append(entity)
         else:
-            self.initial_items.append(entity)
+            self.items.setdefault(entity.get_id(), []).append(entity)
+
+    def add_stock(self, entity_name: str, count: int = 1) -> None:
+        """ Adds count units of the given plant name or item id without creating
+            them; an instance is created when one is removed.
+
+        Parameters:
+            entity_name: plant name or item id
+            count: number of units to add
+        """
+        if count <= 0:
+            return
+        if entity_name in SPECIES:
+            self.plants.setdefault(entity_name, [])
+        else:
+            self.items.setdefault(entity_name, [])
+        self.stock[entity_name] = self.stock.get(entity_name, 0) + count
+
+    def _materialise(self, entity_name: str) -> Item | Plant:
+        """ Create a new instance of the given plant name or item id. """
+        if entity_name in SPECIES:
+            return Plant(entity_name)
+        return ITEM_TYPES[entity_name]()
 
     def get_entities(self, entity_type: str) -> dict[str, list[Item | Plant]]:
         """ Returns the a dictionary mapping entity (item or plant) names to the 
@@ -254,27 +316,47 @@ class Inventory:
         Parameters:
             entity_type: The type can either be plant or item.
         """
-        plant_dic = {}
-        item_dic = {}
-        item_data = ["W", "F", "R"]
         if entity_type == "Plant":
-            for plant in self.initial_plants:
-                for name in list(PLANTS_DATA):
-                    if plant.get_name() == name:
-                        if name in list(plant_dic):
-                            plant_dic[name].append(plant)
-                        else:
-                            plant_dic[name] = [plant]
-            return plant_dic
-        if entity_type == "Item":
-            for item in self.initial_items:
-                for id in item_data:
-                    if item.get_id() == id:
-                        if id in item_dic:
-                            item_dic[id].append(item)
-                        else:
-                            item_dic[id] = [item]
-            return item_dic
+            buckets = self.plants
+        elif entity_type == "Item":
+            buckets = self.items
+        else:
+            return None
+        entities = {}
+        for name, bucket in buckets.items():
+            entities[name] = bucket + [self._materialise(name) for _ in \
+                range(self.stock.get(name, 0))]
+        return entities
+
+    def get_counts(self, entity_type: str) -> dict[str, int]:
+        """ Returns a dictionary mapping entity (item or plant) names to the number
+            of entities with that name in the inventory.
+
+        Parameters:
+            entity_type: The type can either be plant or item.
+        """
+        if entity_type == "Plant":
+            buckets = self.plants
+        elif entity_type == "Item":
+            buckets = self.items
+        else:
+            return None
+        return {name: len(bucket) + self.stock.get(name, 0)
+            for name, bucket in buckets.items()}
+
+    def count(self, entity_name: str) -> int:
+        """ Returns the number of entities (item or plant) with the given name. """
+        return len(self.plants.get(entity_name, ())) + \
+            len(self.items.get(entity_name, ())) + self.stock.get(entity_name, 0)
+
+    def copy(self) -> 'Inventory':
+        """ Return an inventory with the same stock and copies of its plants. """
+        inventory = Inventory()
+        inventory.plants = {name: [plant.copy() for plant in bucket]
+            for name, bucket in self.plants.items()}
+        inventory.items = {id: list(bucket) for id, bucket in self.items.items()}
+        inventory.stock = dict(self.stock)
+        return inventory
 
     def remove_entity(self, entity_name: str) -> Optional[Item | Plant]:
         """ Removes one instance of the entity (item or plant) with the given name 
@@ -287,31 +369,23 @@ class Inventory:
         >>> inventory.remove_entity('Rebutia')
         Plant('Rebutia')
         """
-        m = 0
-        del1 = 0
-        del2 = 0
-        if entity_name  in  list(PLANTS_DATA):                # Distinguish plant and item
-            for m in range(len(self.initial_plants)):
-                if entity_name == self.initial_plants[m].get_name():
-                    while del1 in range(len(self.initial_plants)):
-                        if self.initial_plants[del1].get_name() == entity_name:
-                            temp1 = self.initial_plants[del1] # Store deleted plant contemporarily
-                            del self.initial_plants[del1]     # Remove the plant with position
-                        break
-                return temp1
-            else:
-                return None
-        else: 
-            for n in range(len(self.initial_items)):
-                if entity_name == self.initial_items[n].get_id():
-                    while del2 in range(len(self.initial_items)):
-                        if self.initial_items[del2].get_id() == entity_name:
-                            temp2 = self.initial_items[del2]  # Store deleted item contemporarily
-                            del self.initial_items[del2]      # Remove the item with position
-                        break
-                    return temp2
-                else:
-                    return None
+        if entity_name in self.plants:                # Distinguish plant and item
+            buckets = self.plants
+        elif entity_name in self.items:
+            buckets = self.items
+        else:
+            return None
+        bucket = buckets[entity_name]
+        if bucket:
+            entity = bucket.pop()
+        else:
+            entity = self._materialise(entity_name)
+            self.stock[entity_name] -= 1
+            if self.stock[entity_name] == 0:
+                del self.stock[entity_name]
+        if not bucket and entity_name not in self.stock:  # Forget kinds that run out
+            del buckets[entity_name]
+        return entity
     
     def get_inventory(self):   #OPTIONAL
         pass
@@ -319,10 +393,10 @@ class Inventory:
         item_list  = ""
         plant_list = ""
         inventory_list = ""
-        for key1, value1 in self.get_entities("Plant").items():
-            plant_list  =  plant_list + str(key1 + ": " + str(len(value1))) + "\n"
-        for key2, value2 in self.get_entities("Item").items():
-            item_list = item_list + str(key2 + ": " + str(len(value2))) + "\n"
+        for key1, value1 in self.get_counts("Plant").items():
+            plant_list  =  plant_list + str(key1 + ": " + str(value1)) + "\n"
+        for key2, value2 in self.get_counts("Item").items():
+            item_list = item_list + str(key2 + ": " + str(value2)) + "\n"
         inventory_list = item_list + plant_list
         inventory_list = inventory_list.strip("\n")  # Delete the "\n" in the end
         return  inventory_list
@@ -333,15 +407,15 @@ class Inventory:
 
             Note: the order of plant matters while items' not.
         """
-        ordered_plant = []              # Set an empty list to get same plants together
-        plant_entities = self.get_entities("Plant").values()
-        for keys in plant_entities:   
-            ordered_plant.append(keys)  # Append Plant in order
-        return f"Inventory(initial_items={self.initial_items}, initial_plants={ordered_plant})"
+        items = [item for bucket in self.get_entities("Item").values() for item in bucket]
+        ordered_plant = list(self.get_entities("Plant").values())  # Same plants together
+        return f"Inventory(initial_items={items}, initial_plants={ordered_plant})"
 
 
 class Pot(Entity):
     """ Pot is an Entity that has growing conditions information and an instance of plant. """
+    __slots__ = ('plant', 'sun_range', 'evaporation')
+
     def __init__(self) -> None:
         """ Sets up an empty pot and attributes. """     
         self.plant = None
@@ -385,41 +459,141 @@ class Pot(Entity):
         self.plant = None
         return temp                # Return deleted plant.
 
-    def progress(self) -> None: 
+    def copy(self) -> 'Pot':
+        """ Return a pot with the same growing conditions and a copy of the plant. """
+        pot = Pot.__new__(Pot)
+        pot.sun_range = self.sun_range
+        pot.evaporation = self.evaporation
+        pot.plant = None if self.plant is None else self.plant.copy()
+        return pot
+
+    def progress(self, events: EventSink = STDOUT) -> None: 
         """ Progress the state of the plant and check if the current plant 
             is suitable in the given conditions. Decrease the plant water 
             levels based on the evaporation. The health of the plant should 
             decrease by 1:
 
             Check: water level, sun range, and HP.
+
+        Parameters:
+            events: sink for sun mismatches and deaths
         """
+        plant = self.plant
+        species = plant.species
         if self.evaporation != None:
-            water_decrease =  self.evaporation + self.plant.get_drink_rate()
-            self.plant.decrease_water(water_decrease)
+            plant.water -= self.evaporation + species.drink_rate
             
-        if self.sun_range[0] > self.plant.get_sun_levels()[1] or self.sun_range[1] < self.\
-            plant.get_sun_levels()[0]:           # Decrease health when current sun level is\  
-            self.plant.decrease_health()         # out of range of standard level
-            if self.plant.is_dead():
-                print(f"{self.plant.get_name()} is dead")
-            else:
-                print(f"Poor {self.plant.get_name()} dislikes the sun levels.")
-        if self.plant.get_water() < 0:
-            self.plant.decrease_health()         
-            if self.plant.is_dead():
-                print(f"{self.plant.get_name()} is dead")
+        lower, upper = species.sun_levels
+        if self.sun_range[0] > upper or self.sun_range[1] < lower:
+            plant.health -= 1                    # Decrease health when current sun level is
+            if events.listening:                 # out of range of standard level
+                if plant.health <= 0:
+                    events.emit(PlantDied(species.name, 'sun'))
+                else:
+                    events.emit(SunMismatch(species.name))
+        if plant.water < 0:
+            plant.health -= 1
+            if plant.health <= 0 and events.listening:
+                events.emit(PlantDied(species.name, 'water'))
+
+    def advance(self, days: int) -> Optional[int]:
+        """ Progress the plant by a number of days at once, with no animal attacks.
+            The sun penalty does not change from day to day, so only the water
+            is stepped through, and only until the plant gets thirsty and until
+            it dies; health follows from the number of thirsty days. The cost
+            depends on the plant's water and health, not on days.
 
-    def animal_attack(self) -> None:
+        Parameters:
+            days: number of days to progress
+
+        Return:
+            The day (1 to days) on which the plant died, None if it is still alive.
+            A dead plant is left as it was on the day it died.
+        """
+        plant = self.plant
+        species = plant.species
+        rate = 0.0 if self.evaporation is None else self.evaporation + species.drink_rate
+        lower, upper = species.sun_levels
+        sun = 1 if self.sun_range[0] > upper or self.sun_range[1] < lower else 0
+        if plant.health <= 0:               # Already dead, it goes on day 1.
+            plant.age += 1
+            plant.water -= rate
+            plant.health -= sun + (plant.water < 0)
+            return 1
+        water = plant.water
+        health = plant.health
+
+        day = 0                             # Days before the plant gets thirsty.
+        if not rate:
+            day = days if water >= 0 else 0
+        while day < days and rate and water - rate >= 0:
+            water -= rate                   # The same subtractions as progress,
+            day += 1                        # so water matches to the last bit.
+        died = None
+        if sun and health <= day:           # Dies of the sun before getting thirsty.
+            day = health
+            water = plant.water
+            for _ in range(day):
+                water -= rate
+            died = day
+        health -= sun * day
+        if died is None and day < days:     # Thirsty from here on, 1 more damage a day.
+            thirsty = min(days - day, -(-health // (sun + 1)))
+            for _ in range(thirsty):
+                water -= rate
+            health -= (sun + 1) * thirsty
+            day += thirsty
+            if health <= 0:
+                died = day
+        plant.age += day
+        plant.water = water
+        plant.health = health
+        return died
+
+    def forecast(self) -> tuple[Optional[int], Optional[int]]:
+        """ Return the day (counting from 1 for the next progress) on which the
+            plant's water first goes below 0 and the day on which it dies, if
+            it is left alone and never attacked. Either is None if it never
+            happens.
+        """
+        plant = self.plant
+        species = plant.species
+        rate = 0.0 if self.evaporation is None else self.evaporation + species.drink_rate
+        lower, upper = species.sun_levels
+        sun = 1 if self.sun_range[0] > upper or self.sun_range[1] < lower else 0
+        thirsty = None
+        if rate or plant.water < 0:
+            water = plant.water
+            thirsty = 1
+            while water - rate >= 0:        # Stepped as in progress, see advance.
+                water -= rate
+                thirsty += 1
+        health = plant.health
+        if health <= 0:
+            return thirsty, 1
+        if sun and (thirsty is None or health < thirsty):
+            return thirsty, health
+        if thirsty is None:
+            return None, None
+        health -= sun * (thirsty - 1)
+        return thirsty, thirsty - 1 - (-health // (sun + 1))
+
+    def animal_attack(self, events: EventSink = STDOUT) -> None:
         """ Decreases the health of the plant by the animal attack damage dealt 
             if a plant is in the pot. Do nothing otherwise.
+
+        Parameters:
+            events: sink for the attack
         """
         if self.plant != None:            # Ignore if there is no plant.
             if self.plant.has_repellent():
-                print(f"There has been an animal attack! But luckily \
-the {self.plant.get_name()} has repellent.") 
+                if events.listening:
+                    events.emit(AttackBlocked(self.plant.get_name()))
             else:
                 self.plant.decrease_health(ANIMAL_ATTACK_DAMAGE)
-                print(f"There has been an animal attack! Poor {self.plant.get_name()}.")
+                if events.listening:        # Always reported as 'Poor <plant>.'
+                    events.emit(AttackDamage(self.plant.get_name(), ANIMAL_ATTACK_DAMAGE,
+                        False))
 
     def __str__(self) -> str:
         return self.get_class_name()
@@ -428,6 +602,83 @@ the {self.plant.get_name()} has repellent.")
         return f"{self}()"
 
 
+class PlantCounter:
+    """ Running totals of the plants in a house, kept current by the rooms and
+        the model as plants are added, removed, progressed and attacked.
+    """
+    def __init__(self) -> None:
+        """ Start with no plants. """
+        self.planted = 0        # Plants sitting in a pot, dead or alive.
+        self.dead = 0           # Plants in a pot with no health left.
+
+    def get_alive(self) -> int:
+        """ Return the number of planted plants that are not dead. """
+        return self.planted - self.dead
+
+    def add(self, plant: Plant) -> None:
+        """ Count a plant that has just been put in a pot. """
+        self.planted += 1
+        if plant.is_dead():
+            self.dead += 1
+
+    def discard(self, was_dead: bool) -> None:
+        """ Uncount a plant that has just been taken out of its pot.
+
+        Parameters:
+            was_dead: whether the plant was counted as dead
+        """
+        self.planted -= 1
+        if was_dead:
+            self.dead -= 1
+
+    def update(self, was_dead: bool, is_dead: bool) -> None:
+        """ Record a change of health of a planted plant.
+
+        Parameters:
+            was_dead: whether the plant was counted as dead
+            is_dead: whether the plant is dead now
+        """
+        if was_dead != is_dead:
+            self.dead += 1 if is_dead else -1
+
+    def add_room(self, room: 'Room') -> None:
+        """ Count every plant in a room and keep counting its changes. """
+        room.counter = self
+        for plant in room.get_plants().values():
+            if plant != None:
+                self.add(plant)
+
+    def recount(self, rooms: list['Room']) -> tuple[int, int]:
+        """ Return (planted, dead) counted from scratch over the given rooms. """
+        planted = dead = 0
+        for room in rooms:
+            for plant in room.get_plants().values():
+                if plant != None:
+                    planted += 1
+                    if plant.is_dead():
+                        dead += 1
+        return planted, dead
+
+
+class ChangeLog:
+    """ Pots whose drawing may have changed (plant added, removed or grown past
+        3 days) since the view last collected them.
+    """
+    def __init__(self) -> None:
+        """ Start with no changes. """
+        self.pots = set()
+
+    def mark(self, room: 'Room', position: int) -> None:
+        """ Record that the pot at the given position of a room changed. """
+        self.pots.add((room, position))
+
+    def drain(self) -> set[tuple['Room', int]]:
+        """ Return the changed pots and start collecting afresh. """
+        pots = self.pots
+        self.pots = set()
+        return pots
+
+
 class Room:
     def __init__(self, name):
         """ A Room instance represents the space in which plants can be planted and the
@@ -438,11 +689,14 @@ class Room:
         """
         self.pots = {0: Pot(), 1: Pot(), 2: Pot(), 3: Pot()}
         self.name = name
-        for i in list(ROOM_LAYOUTS):
-            if self.name == i:
-                self.layout = ROOM_LAYOUTS[i]["layout"]
-                self.positions = ROOM_LAYOUTS[i]["positions"]
-                self.room_type = ROOM_LAYOUTS[i]["room_type"]
+        self.counter = PlantCounter()
+        self.changes = ChangeLog()
+        self.events = STDOUT
+        room_layout = ROOM_LAYOUTS.get(self.name)
+        if room_layout is not None:
+            self.layout = room_layout["layout"]
+            self.positions = room_layout["positions"]
+            self.room_type = room_layout["room_type"]
         
     def init_positions(self): #OPTIONAL
         return self.positions
@@ -462,8 +716,8 @@ class Room:
     def get_number_of_plants(self) -> int:
         """ Return the total number of live plants in the room. """
         count = 0
-        for n in range(4):
-            if self.get_plants()[n] != None:
+        for pot in self.pots.values():
+            if pot.plant != None:
                 count += 1
         return count
 
@@ -476,7 +730,12 @@ class Room:
             pots: 4 instance of pots
         """
         for p in range(len(list(pots))):
+            if self.pots[p].plant != None:
+                self.counter.discard(self.pots[p].plant.is_dead())
             self.pots[p] = pots[p]
+            if pots[p].plant != None:
+                self.counter.add(pots[p].plant)
+            self.changes.mark(self, p)
 
     def get_pots(self) -> dict[int, Pot]:	
         return self.pots
@@ -487,6 +746,9 @@ class Room:
     def add_plant(self, position: int, plant: Plant):
         if self.pots[position].look_at_plant() == None:
             self.pots[position].put_plant(plant)
+            if plant != None:
+                self.counter.add(plant)
+                self.changes.mark(self, position)
 
         
     def get_name(self) -> str:
@@ -496,18 +758,66 @@ class Room:
         if self.pots[position].look_at_plant() != None:
             temp = self.pots[position].look_at_plant() # Temporarily save the deleted plant
             self.pots[position].remove_plant()
+            self.counter.discard(temp.is_dead())
+            self.changes.mark(self, position)
             return temp
 
     def progress_plant(self, pot: Pot) -> bool:
         if pot.look_at_plant() == None:                # Check if the pot is empty
             return False
         else:
+            was_dead = pot.look_at_plant().is_dead()
             pot.look_at_plant().increase_age()         # Let plant to age
-            pot.progress()
+            pot.progress(self.events)
             if pot.look_at_plant().get_health() <= 0:
                 pot.remove_plant()
+                self.counter.discard(was_dead)
+                self._mark_pot(pot)
+            elif pot.look_at_plant().get_age() == 3:   # Drawn in capitals from now on
+                self._mark_pot(pot)
             return True
+
+    def _mark_pot(self, pot: Pot) -> None:
+        """ Record a change to the given pot of this room in the change log. """
+        for position, room_pot in self.pots.items():
+            if room_pot is pot:
+                self.changes.mark(self, position)
         
+    def copy(self) -> 'Room':
+        """ Return a room of the same type and name with copies of the pots and
+            plants, still attached to this room's counter, change log and events.
+        """
+        room = object.__new__(type(self))
+        room.__dict__.update(self.__dict__)
+        room.pots = {position: pot.copy() for position, pot in self.pots.items()}
+        return room
+
+    def advance(self, days: int) -> None:
+        """ Progress every plant by a number of days at once, see Pot.advance. The
+            result is that of calling progress_plants days times on a room without
+            animal attacks, except for the events, which are not emitted.
+        """
+        for position, pot in self.pots.items():
+            if pot.plant is not None:
+                self.advance_plant(position, days)
+
+    def advance_plant(self, position: int, days: int) -> bool:
+        """ Progress the plant at a position by a number of days at once, as
+            advance does. Returns True if the plant died and was removed.
+        """
+        pot = self.pots[position]
+        plant = pot.plant
+        was_dead = plant.is_dead()
+        age = plant.age
+        if pot.advance(days) is not None:
+            pot.remove_plant()
+            self.counter.discard(was_dead)
+            self.changes.mark(self, position)
+            return True
+        if age < 3 <= plant.age:            # Drawn in capitals from now on
+            self.changes.mark(self, position)
+        return False
+
     def progress_plants(self) -> None:
         """ Implement progress to all the plants in a room. """
         for k in self.pots:
@@ -521,6 +831,8 @@ class Room:
         return f"{self.room_type}('{self.get_name()}')"
 
 class OutDoor(Room): 
+    rng = random                            # Source of animal attack rolls.
+
     def progress_plant(self, pot: Pot) -> bool:
         """ Returns True if pot is not empty and triggers a given pot to check on plant 
             condition and plant to age. False if pot is empty. Checks to see if an animal 
@@ -534,80 +846,131 @@ class OutDoor(Room):
             return False
         else:
             if pot.look_at_plant().get_health() > 0:
-                if dice_roll():     
+                if dice_roll(self.rng):
                     if pot.look_at_plant().has_repellent():
-                        print(f"There has been an animal attack! But luckily \
-the {pot.plant.get_name()} has repellent.")
+                        if self.events.listening:
+                            self.events.emit(AttackBlocked(pot.plant.get_name()))
                     else:
                         pot.look_at_plant().decrease_health(ANIMAL_ATTACK_DAMAGE)
-                        if pot.look_at_plant().is_dead():
-                            print(f"There has been an animal attack! \
-{pot.plant.get_name()} is dead.")
-                        else:
-                            print(f"There has been an animal attack! Poor \
-{pot.plant.get_name()}.")
+                        self.counter.update(False, pot.look_at_plant().is_dead())
+                        if self.events.listening:
+                            self.events.emit(AttackDamage(pot.plant.get_name(),
+                                ANIMAL_ATTACK_DAMAGE, pot.look_at_plant().is_dead()))
             return True
 
-def load_house(filename: str) -> tuple[list[tuple[Room, str]], dict[str, int]]:
+def load_house(filename: str, cache_dir: Optional[str] = None) -> tuple[list[tuple[Room, str]], dict[str, int]]:
     """ Reads a file and creates a dictionary of all the Rooms.
     
     Parameters:
         filename: The path to the file
+        cache_dir: directory of compiled house images. When given, the text is
+            only parsed if there is no image of this exact file content yet,
+            and the image is then stored for the next load.
     
     Return:
         A tuple containing 
             - a list of all Room instances amd their room name,
             - and a dictionary containing plant names and number of plants
     """
+    if cache_dir is None:
+        with open(filename, 'r') as file:
+            return _parse_house(file)
+    with open(filename, 'rb') as file:
+        text = file.read()
+    path = cache_path(cache_dir, text)
+    compiled = open_compiled(path)
+    if compiled is not None:
+        house, mapped = compiled
+        try:
+            return _build_house(house)
+        finally:
+            house.release()
+            mapped.close()
+    rooms, plants, items = _parse_house(text.decode().splitlines())
+    store_compiled(path, encode_house(rooms, plants, items))
+    return rooms, plants, items
+
+def _new_room(name: str) -> Room:
+    """ Return an empty Room or OutDoor for a ROOM_LAYOUTS name. """
+    if ROOM_LAYOUTS[name]['room_type'] == 'OutDoor':
+        return OutDoor(name)
+    return Room(name)
+
+def _build_house(house: CompiledHouse) -> tuple[list[tuple[Room, str]], dict[str, int]]:
+    """ Create the rooms, pots and plants of a compiled house image. """
+    rooms = []
+    room_count = {}
+    evaporation = house.evaporation
+    sun_lower = house.sun_lower
+    sun_upper = house.sun_upper
+    species = house.species
+    for index, name in enumerate(house.room_names()):
+        room_count[name] = room_count.get(name, 0) + 1
+        room = _new_room(name)
+        positions = {}
+        for position in range(4):
+            p = index * 4 + position
+            pot = Pot()
+            if species[p] != UNSET_POT:
+                if species[p] != NO_PLANT:
+                    pot.put_plant(Plant(PLANT_NAMES[species[p]]))
+                pot.set_evaporation(evaporation[p])
+                pot.set_sun_range((sun_lower[p], sun_upper[p]))
+            positions[position] = pot
+        room.add_pots(positions)
+        rooms.append((room, name[:3] + str(room_count[name])))
+    return rooms, dict(house.plants), dict(house.items)
+
+def _parse_house(lines) -> tuple[list[tuple[Room, str]], dict[str, int]]:
+    """ Create the rooms and inventory counts from the lines of a house file. """
     rooms = []
     plants = {}
     items = {}
     room_count = {}
-    with open(filename, 'r') as file:
-        for line in file:
-            line = line.strip()
-            if line.startswith('Room'):
-                _, _, room = line.partition(' - ')
-                name, room_number = room.split(' ')
-                room_number = int(room_number)
-                if room_count.get(name) is None:
-                    room_count[name] = 0
-                room_count[name] += 1
-                if ROOM_LAYOUTS.get(name).get('room_type') == 'Room':
-                    room = Room(name)
-                elif ROOM_LAYOUTS.get(name).get('room_type') == 'OutDoor':
-                    room = OutDoor(name)
-                rooms.append((room, name[:3] + str(room_count[name])))
-                row_index = 0
-
-            elif line.startswith('Plants'):
-                _, _, plant_names = line.partition(' - ')
-                plant_names = plant_names.split(',')
-                for plant in plant_names:
-                    plant = plant.split(' ')
-                    plants[plant[0]] = int(plant[1])
-
-            elif line.startswith('Items'):
-                _, _, item_names = line.partition(' - ')
-                item_names = item_names.split(',')
-                for item in item_names:
-                    item = item.split(' ')
-                    items[item[0]] = int(item[1])
-
-            elif len(line) > 0 and len(rooms) > 0:
-                pots = line.split(',')
-                positions = {}
-                for index, pot in enumerate(pots):
-                    sun_range, evaporation_rate, plant_name = pot.split('_')
-                    pot = Pot()
-                    if plant_name != 'None':
-                        pot.put_plant(Plant(plant_name))
-                    sun_lower, sun_upper = sun_range.split('.')
-                    pot.set_evaporation(float(evaporation_rate))
-                    pot.set_sun_range((int(sun_lower), int(sun_upper)))
-                    positions[index] = pot
-                rooms[-1][0].add_pots(positions)
-                row_index += 1
+    for line in lines:
+        line = line.strip()
+        if line.startswith('Room'):
+            _, _, room = line.partition(' - ')
+            name, room_number = room.split(' ')
+            room_number = int(room_number)
+            if room_count.get(name) is None:
+                room_count[name] = 0
+            room_count[name] += 1
+            if ROOM_LAYOUTS.get(name).get('room_type') == 'Room':
+                room = Room(name)
+            elif ROOM_LAYOUTS.get(name).get('room_type') == 'OutDoor':
+                room = OutDoor(name)
+            rooms.append((room, name[:3] + str(room_count[name])))
+            row_index = 0
+
+        elif line.startswith('Plants'):
+            _, _, plant_names = line.partition(' - ')
+            plant_names = plant_names.split(',')
+            for plant in plant_names:
+                plant = plant.split(' ')
+                plants[plant[0]] = int(plant[1])
+
+        elif line.startswith('Items'):
+            _, _, item_names = line.partition(' - ')
+            item_names = item_names.split(',')
+            for item in item_names:
+                item = item.split(' ')
+                items[item[0]] = int(item[1])
+
+        elif len(line) > 0 and len(rooms) > 0:
+            pots = line.split(',')
+            positions = {}
+            for index, pot in enumerate(pots):
+                sun_range, evaporation_rate, plant_name = pot.split('_')
+                pot = Pot()
+                if plant_name != 'None':
+                    pot.put_plant(Plant(plant_name))
+                sun_lower, sun_upper = sun_range.split('.')
+                pot.set_evaporation(float(evaporation_rate))
+                pot.set_sun_range((int(sun_lower), int(sun_upper)))
+                positions[index] = pot
+            rooms[-1][0].add_pots(positions)
+            row_index += 1
 
     return rooms, plants, items
 
@@ -615,91 +978,383 @@ class Model:
     """ The controller uses Model to understand and mutate the house state.
         The model keeps track of multiple Room instances and an inventory.
     """
-    def __init__(self, house_file: str):
-        """ Exploit load_house function to build a Model. """
+    def __init__(self, house_file: str, engine: str = 'object',
+        rng: Optional[int | str | random.Random] = None, check_counts: bool = False,
+        events: Optional[EventSink] = None, cache_dir: Optional[str] = None):
+        """ Exploit load_house function to build a Model.
+
+        Parameters:
+            house_file: path to the house file
+            engine: 'object' progresses every Room/Pot/Plant in turn, 'array'
+                advances the whole house with the NumPy ArrayEngine.
+            rng: seed or random source for animal attacks, None for the global
+                random stream. The same seed always plays the same game.
+            check_counts: compare the plant counters against a full recount
+                after every change, raising RuntimeError when they disagree.
+            events: sink for deaths and animal attacks; by default the model gets
+                its own TextSink, which prints them.
+            cache_dir: directory of compiled house images, see load_house.
+        """
         self.days = 1
         self.house_file = house_file
-        self.house = load_house(self.house_file)
-        
+        self._setup(load_house(self.house_file, cache_dir), engine, rng, check_counts, events)
+
+    def _setup(self, house: tuple[list[tuple[Room, str]], dict[str, int], dict[str, int]],
+        engine: str, rng: Optional[int | str | random.Random], check_counts: bool,
+        events: Optional[EventSink]) -> None:
+        """ Index the rooms and fill the inventory of a loaded house. """
+        self.house = house
+        self.seed = rng if isinstance(rng, (int, str)) else None
+        self.rng = make_rng(rng)
+        self.rooms = {}                   # Short room name -> Room, e.g. 'Bal1'.
+        self.room_list = []
+        self.room_index = {}              # Short room name -> index in room_list.
+        self.owned = set()                # Short names of rooms not shared with a fork.
+        self.shared_index = False         # rooms, room_list and house shared with a fork.
+        self.room_count = {}              # Room name -> number of such rooms.
+        self.counter = PlantCounter()
+        self.changes = ChangeLog()        # Pots changed since the view last drew.
+        self.check_counts = check_counts
+        self.events = TextSink(buffered=False) if events is None else events
+        self.inventory = Inventory()
+        for name, count in self.house[1].items():
+            self.inventory.add_stock(name, count)
+        for id, count in self.house[2].items():
+            self.inventory.add_stock(id, count)
+        for room, name in self.house[0]:
+            self._index_room(room, name)
+        self.stale_engine = False         # Rooms were copied since the engine was built.
+        if engine == 'object':
+            self.engine = None
+        elif engine == 'array':
+            self.engine = ArrayEngine(self)
+        else:
+            raise ValueError(f"unknown engine: {engine}")
+
+    def fork(self, rng: Optional[int | str | random.Random] = None) -> 'Model':
+        """ Return a clone of the game which can be played on independently.
+
+            The clone shares every room with this model, copy-on-write: whichever
+            of the two changes a shared room first gets its own copy of it, and
+            next() only copies rooms that hold plants. The room index is shared
+            too until either model changes a room. The counters, inventory and
+            the state of the random source are copied, so by default the clone
+            plays exactly as this model would. Its events go to a copy of this
+            model's sink (see EventSink.copy), so the two never share a day or
+            room.
+
+        Parameters:
+            rng: seed or random source for the clone's animal attacks, None to
+                continue from a copy of this model's random source.
+        """
+        clone = Model.__new__(Model)
+        clone.days = self.days
+        clone.house_file = self.house_file
+        clone.house = self.house
+        if rng is None:
+            clone.seed = self.seed
+            clone.rng = random.Random()
+            clone.rng.setstate(self.rng.getstate())
+        else:
+            clone.seed = rng if isinstance(rng, (int, str)) else None
+            clone.rng = make_rng(rng)
+        clone.rooms = self.rooms
+        clone.room_list = self.room_list
+        clone.room_index = self.room_index
+        clone.room_count = dict(self.room_count)
+        clone.counter = PlantCounter()
+        clone.counter.planted = self.counter.planted
+        clone.counter.dead = self.counter.dead
+        clone.changes = ChangeLog()
+        clone.check_counts = self.check_counts
+        clone.events = self.events.copy()
+        clone.inventory = self.inventory.copy()
+        clone.owned = set()               # Every room is shared with this model now.
+        self.owned = set()
+        clone.shared_index = self.shared_index = True
+        self._sync_plants()
+        clone.engine = self.engine
+        clone.stale_engine = self.engine is not None
+        return clone
+
+    def _own(self, name: str) -> Room:
+        """ Return the room with the given short name for changing, first copying
+            it if it is shared with a fork.
+        """
+        room = self.rooms[name]
+        if name in self.owned:
+            return room
+        self._sync_plants()
+        self._unshare_index()
+        room = room.copy()
+        room.rng = self.rng
+        room.changes = self.changes
+        room.events = self.events
+        room.counter = self.counter
+        self.rooms[name] = room
+        self.room_list[self.room_index[name]] = room
+        self.house[0][self.room_index[name]] = (room, name)
+        self.owned.add(name)
+        for position in range(4):
+            self.changes.mark(room, position)
+        if self.engine is not None:
+            self.stale_engine = True
+        return room
+
+    def _sync_plants(self, *locations: tuple[str, int]) -> None:
+        """ Bring the Plant objects at the given (room name, position) locations,
+            every plant if none are given, up to date with the array engine,
+            which keeps the plant state between days.
+        """
+        if self.engine is not None and not self.stale_engine:
+            self.engine.flush([self.engine.index[location] for location in locations]
+                if locations else None)
+
+    def _plants_changed(self, *locations: tuple[str, int]) -> None:
+        """ Tell the array engine that the plants at the given (room name,
+            position) locations, every plant if none are given, were changed
+            through their objects.
+        """
+        if self.engine is not None and not self.stale_engine:
+            self.engine.reload([self.engine.index[location] for location in locations]
+                if locations else None)
+
+    def snapshot(self, applied_items: list[tuple[str, int, Item]] = ()) -> bytes:
+        """ Return a compact binary snapshot of the whole game, see snapshot.py.
+
+        Parameters:
+            applied_items: items waiting for the next day, kept in the snapshot.
+        """
+        return encode_snapshot(self, applied_items)
+
+    @classmethod
+    def restore(cls, data: bytes, check_counts: bool = False,
+        events: Optional[EventSink] = None) -> tuple['Model', list[tuple[str, int, Item]]]:
+        """ Rebuild a game from a snapshot. The restored game plays on exactly
+            as the saved one would have, including its animal attacks.
+
+        Parameters:
+            data: a snapshot made by Model.snapshot
+            check_counts, events: as for Model
+
+        Return:
+            The model and the items that were waiting for the next day.
+
+        Raises:
+            ValueError if the data is not a usable snapshot.
+        """
+        snapshot = decode_snapshot(data)
+        rooms = []
+        room_count = {}
+        for index, name in enumerate(snapshot.room_names()):
+            room_count[name] = room_count.get(name, 0) + 1
+            room = _new_room(name)
+            positions = {}
+            for position in range(4):
+                p = index * 4 + position
+                pot = Pot()
+                if not snapshot.pot_flags[p] & POT_UNSET:
+                    pot.set_evaporation(snapshot.evaporation[p])
+                    pot.set_sun_range((snapshot.sun_lower[p], snapshot.sun_upper[p]))
+                if snapshot.species[p] != NO_PLANT:
+                    plant = Plant(PLANT_NAMES[snapshot.species[p]])
+                    plant.water = snapshot.water[p]
+                    plant.health = snapshot.health[p]
+                    plant.age = snapshot.age[p]
+                    plant.repellent = bool(snapshot.pot_flags[p] & POT_REPELLENT)
+                    pot.put_plant(plant)
+                positions[position] = pot
+            room.add_pots(positions)
+            rooms.append((room, name[:3] + str(room_count[name])))
+
+        rng = snapshot.seed
+        if snapshot.rng_state is not None:
+            rng = random.Random()
+            rng.setstate(snapshot.rng_state)
+        model = cls.__new__(cls)
+        model.days = snapshot.days
+        model.house_file = snapshot.house_file
+        model._setup((rooms, snapshot.plants, snapshot.items), snapshot.engine, rng,
+            check_counts, events)
+        model.seed = snapshot.seed
+        pending = [(room_name, position, ITEM_TYPES[item_id]())
+            for room_name, position, item_id in snapshot.pending]
+        return model, pending
+
+    def save(self, filename: str, applied_items: list[tuple[str, int, Item]] = ()) -> None:
+        """ Write a snapshot of the game to a file. """
+        with open(filename, 'wb') as file:
+            file.write(self.snapshot(applied_items))
+
+    @classmethod
+    def load(cls, filename: str, check_counts: bool = False,
+        events: Optional[EventSink] = None) -> tuple['Model', list[tuple[str, int, Item]]]:
+        """ Resume a game saved with Model.save, see Model.restore. """
+        with open(filename, 'rb') as file:
+            return cls.restore(file.read(), check_counts, events)
+
+    def _unshare_index(self) -> None:
+        """ Take private copies of the room index if it is shared with a fork. """
+        if self.shared_index:
+            self.rooms = dict(self.rooms)
+            self.room_list = list(self.room_list)
+            self.room_index = dict(self.room_index)
+            self.house = (list(self.house[0]), self.house[1], self.house[2])
+            self.shared_index = False
+
+    def _index_room(self, room: Room, name: str) -> None:
+        """ Register a room in the room index under its short name. """
+        room.rng = self.rng
+        room.changes = self.changes
+        room.events = self.events
+        self.counter.add_room(room)
+        self.rooms[name] = room
+        self.room_index[name] = len(self.room_list)
+        self.room_list.append(room)
+        self.owned.add(name)
+        self.room_count[room.get_name()] = self.room_count.get(room.get_name(), 0) + 1
+
+    def add_room(self, room: Room) -> str:
+        """ Add a new room to the house and return its short name, e.g. 'Bal2'.
+
+        Parameters:
+            room: the room to be added
+        """
+        name = room.get_name()[:3] + str(self.room_count.get(room.get_name(), 0) + 1)
+        self._sync_plants()
+        self._unshare_index()
+        self.house[0].append((room, name))
+        self._index_room(room, name)
+        if self.engine is not None:
+            self.engine = ArrayEngine(self)
+            self.stale_engine = False
+        return name
+
+    def verify_counts(self) -> None:
+        """ Raise RuntimeError if the plant counters disagree with a full recount
+            of the house.
+        """
+        self._sync_plants()
+        planted, dead = self.counter.recount(self.room_list)
+        if (planted, dead) != (self.counter.planted, self.counter.dead):
+            raise RuntimeError(f"plant counters out of sync: counted "
+                f"{self.counter.planted} planted and {self.counter.dead} dead, "
+                f"found {planted} planted and {dead} dead")
+
     def get_rooms(self) -> dict[str, Room]: 
-        """ Returns all rooms with room name as keys with a corresponding room instance. """
-        room_list = self.house[0]
-        room_dict = {}
-        for r in range(len(room_list)):
-            room_dict[room_list[r][1]] = room_list[r][0]
-        return room_dict
+        """ Returns all rooms with room name as keys with a corresponding room instance.
+            The index is kept by the model and must not be modified by the caller.
+        """
+        self._sync_plants()
+        return self.rooms
 
     def get_all_rooms(self) -> list[Room]:
-        """ Returns a list of all the room instances. """
-        all_room_list = self.get_rooms().values()
-        return list(all_room_list)
+        """ Returns a list of all the room instances. The list is kept by the model
+            and must not be modified by the caller.
+        """
+        self._sync_plants()
+        return self.room_list
         
     def get_inventory(self) -> Inventory:
-        """ Get inventoey from house file. """
-        plants = []
-        items = []
-        i = p = q = r = 0
-        for k in list(self.house[1]):       # Iterate plant in house file
-            if self.house[1][k] == 1:
-                plants.append(Plant(k))
-            else:
-                while i < self.house[1][k]:
-                    plants.append(Plant(k))
-                    i += 1
-        for m in list(self.house[2]):       # Iterate item in house file
-            if m == "F":
-                if self.house[2][m] == 1:
-                    items.append(Fertiliser())
-                else: 
-                    while p < self.house[2][m]:
-                        items.append(Fertiliser())
-                        p += 1
-            elif m == "W":
-                if self.house[2][m] == 1:
-                    items.append(Water())
-                else: 
-                    while q < self.house[2][m]:
-                        items.append(Water())
-                        q += 1
-            elif m == "R":
-                if self.house[2][m] == 1:
-                    items.append(PossumRepellent())
-                else: 
-                    while r < self.house[2][m]:
-                        items.append(PossumRepellent())
-                        r += 1
-        inventory = Inventory(items, plants)
-        return inventory
+        """ Return the inventory of the house, which the model keeps up to date. """
+        return self.inventory
         
     def get_days_past(self) -> int:
         return self.days
         
     def next(self, applied_items: list[tuple[str, int, Item]]) -> None:
         """ Move to the next day, if there are items in the list of applied items (room name,
-            position, item to be applied) then apply all affects. Add fertiliser and possum
-            repellent to the inventory every 3 days. Progress all plants in all rooms.
+            position, item to be applied) then apply all affects; items put on an empty pot
+            are wasted. Add fertiliser and possum repellent to the inventory every 3 days.
+            Progress all plants in all rooms.
 
         Parameters:
             applied_items: accumulated items to be set.
         """
-        if applied_items == []:
-            for i in range(len(self.get_all_rooms())):
-                self.get_all_rooms()[i].progress_plants()
-        else: 
-            for k in range(len(applied_items)):
-                if applied_items[k][2].get_id() == "F":
-                    applied_items[k][2].apply(self.get_rooms()[applied_items[k][0]].get_pot\
-                        (applied_items[k][1]).look_at_plant())
-                if applied_items[k][2].get_id() == "R":
-                    applied_items[k][2].apply(self.get_rooms()[applied_items[k][0]].get_pot\
-                        (applied_items[k][1]).look_at_plant())
-            for j in range(len(self.get_all_rooms())):
-                self.get_all_rooms()[j].progress_plants()
-            applied_items = []          # Empty the applied_items after implementation
-        if self.get_days_past()%3 == 0: # Add fertiliser and possum repellent to the inventory\
-            self.house[2]["F"] += 1     # every 3 days.
-            self.house[2]["R"] += 1
-        self.days += 1
+        self._apply_items(applied_items)
+        self._own_planted()
+        self.events.day = self.days
+        if self.engine is not None:
+            if self.stale_engine:
+                self.engine = ArrayEngine(self)
+                self.stale_engine = False
+            self.engine.step()
+        elif self.events.listening:
+            for name, room in self.rooms.items():
+                self.events.room = name
+                room.progress_plants()
+        else:
+            for room in self.room_list:
+                room.progress_plants()
+        self._finish_days(1)
+
+    def _apply_items(self, applied_items: list[tuple[str, int, Item]]) -> None:
+        """ Apply fertiliser and repellent to the plants they were put on. """
+        for room_name, position, item in applied_items:
+            plant = self.rooms[room_name].get_pot(position).look_at_plant()
+            if plant is not None and (item.get_id() == "F" or item.get_id() == "R"):
+                self._sync_plants((room_name, position))
+                plant = self._own(room_name).get_pot(position).look_at_plant()
+                was_dead = plant.is_dead()
+                item.apply(plant)
+                self.counter.update(was_dead, plant.is_dead())
+                self._plants_changed((room_name, position))
+
+    def _finish_days(self, days: int) -> None:
+        """ Count days that have been progressed, adding fertiliser and possum
+            repellent to the inventory every 3 days.
+        """
+        restocks = (self.days + days - 1) // 3 - (self.days - 1) // 3
+        if restocks:
+            self.inventory.add_stock(FERTILISER, restocks)
+            self.inventory.add_stock(POSSUM_REPELLENT, restocks)
+        self.days += days
+        self.events.day = self.days - 1
+        if self.check_counts:
+            self.verify_counts()
+        
+    def advance(self, days: int = 1) -> None:
+        """ Move forward a number of days with nothing applied or moved, as that
+            many calls to next([]) would. Rooms without animal attacks are worked
+            out plant by plant (see Pot.advance), so their cost does not depend on
+            days; outdoor rooms are still progressed day by day, in house order,
+            for as long as they hold plants, so they draw the same attack rolls.
+
+            Events would have to be emitted day by day in house order, so a model
+            whose sink is listening simply calls next() days times.
+
+        Parameters:
+            days: number of days to move forward
+        """
+        if days <= 0:
+            return
+        if self.events.listening:
+            for _ in range(days):
+                self.next([])
+            return
+        self._sync_plants()
+        self._own_planted()
+        outdoor = []
+        for room in self.room_list:
+            if isinstance(room, OutDoor):
+                outdoor.append(room)
+            elif room.get_number_of_plants():
+                room.advance(days)
+        for _ in range(days):
+            outdoor = [room for room in outdoor if room.get_number_of_plants()]
+            if not outdoor:
+                break
+            for room in outdoor:
+                room.progress_plants()
+        self._plants_changed()
+        self._finish_days(days)
+
+    def _own_planted(self) -> None:
+        """ Copy the rooms with plants that are shared with a fork. """
+        if len(self.owned) < len(self.rooms):
+            for name, room in list(self.rooms.items()):
+                if name not in self.owned and room.get_number_of_plants():
+                    self._own(name)
         
     def move_plant(self, from_room_name: str, from_position: int, 
         to_room_name: str, to_position: int) -> None: 
@@ -711,57 +1366,79 @@ class Model:
             to_room_name: destination room
             to_position: destination position
         """
-        for r1 in list(self.get_rooms()):
-            if r1 == from_room_name:
-                remove_plant = self.get_rooms()[r1].remove_plant(from_position)
-
-        for r2 in list(self.get_rooms()):
-            if r2 == to_room_name:
-                self.get_rooms()[r2].add_plant(to_position, remove_plant)
+        locations = [(from_room_name, from_position)]
+        if to_room_name in self.rooms:
+            locations.append((to_room_name, to_position))
+        self._sync_plants(*locations)
+        remove_plant = self._own(from_room_name).remove_plant(from_position)
+        if to_room_name in self.rooms:
+            self._own(to_room_name).add_plant(to_position, remove_plant)
+        self._plants_changed(*locations)
+        if self.check_counts:
+            self.verify_counts()
         
     def plant_plant(self, plant_name: str, room_name: str, 
         position: int) -> None:
-        if self.get_rooms()[room_name].get_pot(position).look_at_plant() != None:
-            self.get_rooms()[room_name].remove_plant(position)
-            self.get_rooms()[room_name].add_plant(position, Plant(plant_name))
-        else:
-            self.get_rooms()[room_name].add_plant(position, Plant(plant_name))
-        for p in list(self.house[1]):
-            if p == plant_name:
-                self.house[1][p] -= 1
+        self._sync_plants((room_name, position))
+        room = self._own(room_name)
+        if room.get_pot(position).look_at_plant() != None:
+            room.remove_plant(position)
+        plant = self.inventory.remove_entity(plant_name)
+        if plant == None:                   # Nothing left in the inventory
+            plant = Plant(plant_name)
+        room.add_plant(position, plant)
+        self._plants_changed((room_name, position))
+        if self.check_counts:
+            self.verify_counts()
 
     def swap_plant(self, from_room_name: str, from_position: int, 
         to_room_name: str, to_position: int) -> None:
         """ Swap the two plants from a room at a given position to a room with the given position. """
-        remove_plant_1 = self.get_rooms()[from_room_name].remove_plant(from_position)
-        remove_plant_2 = self.get_rooms()[to_room_name].remove_plant(to_position)
+        locations = [(from_room_name, from_position), (to_room_name, to_position)]
+        self._sync_plants(*locations)
+        from_room = self._own(from_room_name)
+        to_room = self._own(to_room_name)
+        remove_plant_1 = from_room.remove_plant(from_position)
+        remove_plant_2 = to_room.remove_plant(to_position)
         if remove_plant_1 == None and remove_plant_2 != None:   # Check if from plant is None
-            self.get_rooms()[from_room_name].add_plant(from_position, remove_plant_2)
+            from_room.add_plant(from_position, remove_plant_2)
         elif remove_plant_1 != None and remove_plant_2 == None: # Check if to plant is None
-            self.get_rooms()[to_room_name].add_plant(to_position, remove_plant_1)
+            to_room.add_plant(to_position, remove_plant_1)
         elif remove_plant_1 != None and remove_plant_2 != None: # Check if both from and to plants are not None
-            self.get_rooms()[from_room_name].add_plant(from_position, remove_plant_2)
-            self.get_rooms()[to_room_name].add_plant(to_position, remove_plant_1)
+            from_room.add_plant(from_position, remove_plant_2)
+            to_room.add_plant(to_position, remove_plant_1)
+        self._plants_changed(*locations)
+        if self.check_counts:
+            self.verify_counts()
         
+    def water_plant(self, room_name: str, position: int) -> None:
+        """ Water the plant at a position of a room, if there is one. """
+        if self.rooms[room_name].get_pot(position).look_at_plant() is not None:
+            self._sync_plants((room_name, position))
+            self._own(room_name).get_pot(position).look_at_plant().water_plant()
+            self._plants_changed((room_name, position))
+
+    def remove_plant(self, room_name: str, position: int) -> Optional[Plant]:
+        """ Remove and return the plant at a position of a room, if there is one. """
+        if self.rooms[room_name].get_pot(position).look_at_plant() is None:
+            return None
+        self._sync_plants((room_name, position))
+        plant = self._own(room_name).remove_plant(position)
+        self._plants_changed((room_name, position))
+        if self.check_counts:
+            self.verify_counts()
+        return plant
+
     def get_number_of_plants_alive(self) -> int:
-        count = 0
-        for room in self.get_all_rooms():
-            for i in range(4):
-                if room.get_plants()[i] != None:
-                    if not room.get_plants()[i].is_dead():
-                        count += 1
-        return count
+        return self.counter.get_alive()
 
     def has_won(self) -> bool:
         """ Return True if number of plants alive > 50% of number from start of the 15 day
             period. And 15 days has passed.
         """
-        total_alive = 0
         if self.days >= 15: # Check days
-            for m in range(len(self.get_all_rooms())):
-                part_alive = self.get_all_rooms()[m].get_number_of_plants()
-                total_alive += part_alive
-            if self.get_number_of_plants_alive() >= total_alive/2: # Check alive number
+            total_alive = self.counter.planted
+            if self.counter.get_alive() >= total_alive/2: # Check alive number
                 return True
         else:
             return False
@@ -779,23 +1456,194 @@ class Model:
         return f"Model('{self.house_file}')"
 
 
+def tokenize(step: str) -> list[str]:
+    """ Split a command into its words, ignoring extra spaces. """
+    return step.split()
+
+
+def _list(model: Model, applied_items: list, *location) -> Optional[Plant]:
+    """ ls [room position]: return the plant being looked at, if any. """
+    if location:
+        return model.get_rooms()[location[0]].get_pot(location[1]).look_at_plant()
+
+
+def _water(model: Model, applied_items: list, room_name: str, position: int) -> None:
+    model.water_plant(room_name, position)
+
+
+def _apply(model: Model, applied_items: list, room_name: str, position: int,
+    item_id: str) -> None:
+    item = model.get_inventory().remove_entity(item_id)
+    if item is None:                        # Nothing left in the inventory
+        item = ITEM_TYPES[item_id]()
+    applied_items.append((room_name, position, item))
+
+
+def _remove(model: Model, applied_items: list, room_name: str, position: int) -> Optional[Plant]:
+    return model.remove_plant(room_name, position)
+
+
+def _next(model: Model, applied_items: list) -> None:
+    model.next(applied_items)
+    applied_items.clear()                   # Empty applied items after implementation.
+
+
+def _move(model: Model, applied_items: list, *arguments) -> None:
+    model.move_plant(*arguments)
+
+
+def _plant(model: Model, applied_items: list, *arguments) -> None:
+    model.plant_plant(*arguments)
+
+
+def _swap(model: Model, applied_items: list, *arguments) -> None:
+    model.swap_plant(*arguments)
+
+
+LOCATION = ('room', 'position')
+
+COMMANDS = {                                # Name -> (argument kinds accepted, handler)
+    'ls': (((), LOCATION), _list),
+    'm': ((LOCATION + LOCATION,), _move),
+    'p': ((('plant',) + LOCATION,), _plant),
+    'w': ((LOCATION,), _water),
+    'a': ((LOCATION + ('item',),), _apply),
+    's': ((LOCATION + LOCATION,), _swap),
+    'rm': ((LOCATION,), _remove),
+    'n': (((),), _next),
+}
+
+
+def _argument(model: Model, kind: str, word: str) -> Optional[str | int]:
+    """ Return a command word converted to its kind, None if it is not valid. """
+    if kind == 'room':
+        return word if word in model.rooms else None
+    if kind == 'position':
+        return int(word) if word in ('0', '1', '2', '3') else None
+    if kind == 'plant':
+        return word if word in PLANTS_DATA else None
+    if kind == 'item':
+        return word if word == FERTILISER or word == POSSUM_REPELLENT else None
+
+
+def parse_command(words: list[str], model: Model) -> tuple[str, list]:
+    """ Return the name and converted arguments of a tokenized command.
+
+    Raises:
+        ValueError if the command is unknown or its arguments do not fit the house.
+    """
+    if words and words[0] in COMMANDS:
+        for kinds in COMMANDS[words[0]][0]:
+            if len(kinds) == len(words) - 1:
+                arguments = [_argument(model, kind, word)
+                    for kind, word in zip(kinds, words[1:])]
+                if None not in arguments:
+                    return words[0], arguments
+    raise ValueError(INVALID_MOVE + ' '.join(words))
+
+
+def run_command(model: Model, step: str, applied_items: list) -> tuple[str, object]:
+    """ Apply one play command to the model without any input or drawing.
+
+    Parameters:
+        model: the game being played
+        step: the command, e.g. 'm Bal1 0 Bed1 1'
+        applied_items: items waiting for the next day, updated in place
+
+    Return:
+        The command name and what its handler returned, e.g. the removed plant.
+
+    Raises:
+        ValueError if the command is not valid for the house.
+    """
+    name, arguments = parse_command(tokenize(step), model)
+    return name, COMMANDS[name][1](model, applied_items, *arguments)
+
+
 class GardenSim:
     """ Controller class maintain instances of the model and view, collecting user input and
         facilitate communication between the model and view. 
     """
 
-    def __init__(self, game_file: str, view: View):
+    def __init__(self, game_file: str, view: View, seed: Optional[int] = None,
+        log_file: Optional[str] = None, model: Optional[Model] = None):
         """ Creates a new GardenSim house with the given view and a new Model instantiated 
             using the given house_file.
 
         Parameters:
             game_file: given file from player
             view: class that presents status of the game 
+            seed: seed of the animal attacks, picked at random if None
+            log_file: move log to append every accepted command to, see movelog.py
+            model: game of game_file already set up with seed, e.g. a fork, to
+                play instead of loading the house again
         """
         self.game_file = game_file
-        self.model = Model(self.game_file)
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        self.model = Model(self.game_file, rng=self.seed) if model is None else model
         self.view = view
         self.applied_item = []
+        self.log = None if log_file is None else MoveLog(log_file, game_file, self.seed)
+
+    def execute(self, step: str) -> bool:
+        """ Carry out one command and show its result, without redrawing the house.
+            Returns True once the game is over.
+
+        Parameters:
+            step: the command, e.g. 'rm Bal1 2'
+        """
+        try:
+            return self.play_step(step)
+        except ValueError:
+            print(INVALID_MOVE + step)
+            return False
+
+    def play_step(self, step: str) -> bool:
+        """ Carry out one command as execute does, but raise for a command that
+            is not a move instead of showing it. Returns True once the game is over.
+
+        Raises:
+            ValueError if the command is not a valid move for the house.
+        """
+        words = tokenize(step)
+        if len(words) == 2 and words[0] == "save":  # Save or resume the whole game
+            self.model.save(words[1], self.applied_item)
+            print(f"Game saved to {words[1]}.")
+            return False
+        if words == ["stats"]:                       # Time spent in the hot paths so far
+            print(PROFILER.report())
+            return False
+        if len(words) == 2 and words[0] == "load":
+            try:
+                self.model, self.applied_item = Model.load(words[1])
+            except (OSError, ValueError) as error:
+                print(f"Cannot load {words[1]}: {error}")
+                return False
+            if self.log is not None:
+                self.log.record(' '.join(words))
+            return False
+        name, arguments = parse_command(words, self.model)
+        result = COMMANDS[name][1](self.model, self.applied_item, *arguments)
+        if self.log is not None:
+            self.log.record(' '.join(words))
+        if name == "ls" and arguments:
+            room_name, position = arguments
+            self.view.display_room_position_information(self.model.get_rooms()[room_name],
+                position, result)
+        elif name == "ls":
+            inventory = self.model.get_inventory()
+            self.view.display_rooms(self.model.get_rooms())
+            self.view.display_inventory(inventory.get_entities('Plant'), "Plant")
+            self.view.display_inventory(inventory.get_entities('Item'), "Item")
+        elif name == "rm":
+            print(f"{result} has been removed.")
+        elif name == "n" and self.model.get_days_past() >= 15: # Check the results after 15 days.
+            if self.model.has_won():
+                print(WIN_MESSAGE)
+            elif self.model.has_lost():
+                print(LOSS_MESSAGE)
+            return True
+        return False
 
     def play(self):
         """ Executes the entire game until a win or loss occurs. 
@@ -804,101 +1652,59 @@ class GardenSim:
         move not found: m
         >>> Enter a move: rm Bal1 2
         Cereus has been removed.
+        >>> Enter a move: save game.sav
+        Game saved to game.sav.
         """
         self.view.draw(self.model.get_all_rooms())
-        while 1:                                    # Infinite loop until the results showed
-            step = input("\nEnter a move: ")        # Take input from player
-            if step != "n" and step != "ls" and len(step) < 8:  # Detect invalid input
-                print(INVALID_MOVE + step)
+        try:
+            while 1:                                # Infinite loop until the results showed
+                step = input("\nEnter a move: ")    # Take input from player
+                if self.execute(step):
+                    break
                 self.view.draw(self.model.get_all_rooms())
-            else:
-                if step[0] == "l":
-                    if len(step) == 2:
-                        self.view.display_rooms(self.model.get_rooms())
-                        self.view.display_inventory(self.model.get_inventory().get_entities\
-                            ('Plant'), "Plant")
-                        self.view.display_inventory(self.model.get_inventory().get_entities\
-                            ('Item'), "Item")
-                        self.view.draw(self.model.get_all_rooms())
-
-                    elif step[-1].isdigit():
-                        ls_room_name = step[3:7]
-                        ls_position = int(step[-1])
-                        ls_plant = self.model.get_rooms()[ls_room_name].get_pot(ls_position).\
-                            look_at_plant()
-                        self.view.display_room_position_information(self.model.get_rooms()\
-                            [ls_room_name], ls_position, ls_plant)
-                        self.view.draw(self.model.get_all_rooms())
-
-                if step[0] == "m":
-                    m_from_room_name = step[2:6]
-                    m_from_position = int(step[7])
-                    m_to_room_name = step[9:13]
-                    m_to_position = int(step[-1])
-                    self.model.move_plant(m_from_room_name, m_from_position, m_to_room_name, \
-                        m_to_position)
-                    self.view.draw(self.model.get_all_rooms())
-
-                if step[0] == "p" and len(step[0]) == 16:
-                    p_plant_name = step[2:9]
-                    p_room_name = step[10:14]
-                    p_position = int(step[-1])
-                    self.model.plant_plant(p_plant_name, p_room_name, p_position)
-                    self.view.draw(self.model.get_all_rooms())
-
-                if step[0] == "w":
-                    w_room_name = step[2:6]
-                    w_position = int(step[-1])
-                    self.model.get_rooms()[w_room_name].get_pot(w_position).look_at_plant().\
-                        water_plant()
-                    self.view.draw(self.model.get_all_rooms())
-
-                if step[0] == "a":
-                    a_room_name = step[2:6]
-                    a_position = int(step[7])
-                    item_id = step[-1]
-                    if item_id == "F":
-                        self.applied_item.append((a_room_name, a_position, Fertiliser()))
-                        self.model.house[2]["F"] -= 1                   # Decrease inventory after adding\
-                        self.view.draw(self.model.get_all_rooms())      # item to applied item.
-                    if item_id == "R":
-                        self.applied_item.append((a_room_name, a_position, PossumRepellent()))
-                        self.model.house[2]["R"] -= 1          
-                        self.view.draw(self.model.get_all_rooms())
-
-                if step[0] == "s":
-                    from_room_name = step[2:6]
-                    from_position = int(step[7])
-                    to_room_name = step[9:13]
-                    to_position = int(step[-1])
-                    self.model.swap_plant(from_room_name, from_position, to_room_name, to_position)
-                    self.view.draw(self.model.get_all_rooms())
-                
-                if step[0] == "r":
-                    room_name_r = step[3:7]
-                    position_r = int(step[-1])
-                    temp = self.model.get_rooms()[room_name_r].remove_plant(position_r)
-                    print(f"{temp} has been removed.")
-                    self.view.draw(self.model.get_all_rooms())
-
-                if step == "n":
-                    self.model.next(self.applied_item)
-                    self.applied_item = []               # Empty applied item after implementation.
-                    if self.model.get_days_past() >= 15: # Check the results after 15 days.
-                        if self.model.has_won():
-                            print(WIN_MESSAGE)
-                            break                        
-                        elif self.model.has_lost():
-                            print(LOSS_MESSAGE)
-                            break
-                    self.view.draw(self.model.get_all_rooms())
+        finally:
+            self.view.close()
+
+    def play_script(self, lines) -> None:
+        """ Run every command of a script, e.g. an open file or sys.stdin, and draw
+            the house once at the end. Blank lines are skipped; the script stops
+            early when the game is over.
+        """
+        try:
+            for line in lines:
+                step = line.strip()
+                if step and self.execute(step):
+                    return
+            self.view.draw(self.model.get_all_rooms())
+        finally:
+            self.view.close()
 
 def main():
-    """ Entry-point to gameplay """
-    view = View()
+    """ Entry-point to gameplay. Pass --incremental to only redraw the pots that
+        changed on an ANSI terminal, --script <file> to run the commands of a
+        file ('-' for the rest of standard input) instead of prompting for them,
+        --log <file> to record the game for replay.py and --profile to time
+        the hot paths for the 'stats' command.
+    """
+    arguments = sys.argv[1:]
+    if '--profile' in arguments:
+        PROFILER.enable(sys.modules[__name__])
+    view = IncrementalView() if '--incremental' in arguments else View()
     house_file = input('Enter house file: ')
-    garden_gnome = GardenSim(house_file, view)
-    garden_gnome.play()
+    log_file = None
+    if '--log' in arguments[:-1]:
+        log_file = arguments[arguments.index('--log') + 1]
+    garden_gnome = GardenSim(house_file, view, log_file=log_file)
+    script = None
+    if '--script' in arguments[:-1]:
+        script = arguments[arguments.index('--script') + 1]
+    if script is None:
+        garden_gnome.play()
+    elif script == '-':
+        garden_gnome.play_script(sys.stdin)
+    else:
+        with open(script, 'r') as file:
+            garden_gnome.play_script(file)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -1,18 +1,42 @@
-from random import randint
+import random
+import shutil
+import sys
 from typing import Optional
 
 from constants import *
 
-def dice_roll() -> bool:
+DICE_FACES = range(101)
+
+def make_rng(seed: Optional[int | str | random.Random] = None) -> random.Random:
+    """ Return a random source for a game.
+
+    Parameters:
+        seed: None for the shared global stream, an int or str seed for a new
+            independent stream, or an existing random source to use as is.
+    """
+    if seed is None:
+        return random
+    if isinstance(seed, (int, str)):
+        return random.Random(seed)
+    return seed
+
+def dice_roll(rng: random.Random = random) -> bool:
     """ (bool): Return True 15% of the time. False otherwise. """
-    return randint(0, 100) > 70
+    return rng.choices(DICE_FACES)[0] > 70
+
+def dice_rolls(count: int, rng: random.Random = random) -> list[bool]:
+    """ Roll the dice count times in a single call. Draws the same values, in
+        the same order, as count calls to dice_roll with the same source.
+    """
+    return [face > 70 for face in rng.choices(DICE_FACES, k=count)]
 
 def invalid_message(move: str) -> str:
     return f'move not found: {move}'
 
 class View:
     def __init__(self):
-        pass
+        self._templates = {}            # id(layout) -> (layout, encoded rows).
+        self._buffer = bytearray()      # Frame buffer reused between draws.
     def draw(
         self,
         rooms: list['Room'],
@@ -26,39 +50,65 @@ class View:
         all_plants = []
 
         for room in rooms:
-            all_rooms.append(ROOM_LAYOUTS[room.get_name()].get('layout'))
+            room_layout = ROOM_LAYOUTS[room.get_name()]
+            all_rooms.append(room_layout.get('layout'))
             plants = {}
-            for plant_number in room.get_plants():
-                plant = room.get_plants()[plant_number]
+            for plant_number, plant in room.get_plants().items():
                 if plant is not None:
-                    if plant.get_age() < 3:
-                        plant_name = plant.get_name()[0].lower()
-                    else:
-                        plant_name = plant.get_name()[0].upper()
-                    room_layout = ROOM_LAYOUTS.get(room.get_name())
                     plant_position = room_layout.get('positions')[plant_number]
-                    plants[plant_position] = plant_name
+                    plants[plant_position] = self._plant_glyph(plant)
             all_plants.append(plants)
         
         self._draw_house(all_rooms, all_plants)
 
+    def close(self) -> None:
+        """ Give the terminal back at the end of a game. A plain view leaves
+            nothing behind.
+        """
+
     def _draw_house(
         self,
         rooms: list[dict[tuple[int, int], str]],
         all_plants: list[dict[tuple[int, int], str]],
     ) -> None:
-        """ Draw the house with all rooms.
+        """ Draw the house with all rooms. Each room is copied from its static
+            template into a frame buffer, the plants are written over it and the
+            finished frame is written out in one call.
         
         Parameters:
             rooms: a list of rooms
             all_plants: All plants that needs to be displayed
         """
-        for i in range(ROOM_ROW):
-            row_text = ''
-            for room_index, room in enumerate(rooms):
-                row_text += ' '.join(self._draw_room(room, 
-                    all_plants[room_index])[i]) + f' {SEPARATOR} '
-            print(row_text)
+        width = ROOM_COL * 2 - 1 + len(f' {SEPARATOR} ')  # Characters per room row
+        line = width * len(rooms) + 1
+        if len(self._buffer) != line * ROOM_ROW:
+            self._buffer = bytearray(line * ROOM_ROW)
+            for i in range(ROOM_ROW):
+                self._buffer[i * line + line - 1] = ord('\n')
+        buffer = self._buffer
+        for room_index, room in enumerate(rooms):
+            template = self._room_template(room)
+            offset = room_index * width
+            for i in range(ROOM_ROW):
+                start = i * line + offset
+                buffer[start:start + width] = template[i]
+            for (row, col), plant in all_plants[room_index].items():
+                buffer[row * line + offset + col * 2] = ord(plant)
+        sys.stdout.write(buffer.decode())
+
+    def _room_template(self, room: dict[tuple[int, int], str]) -> list[bytes]:
+        """ Return the encoded rows of an empty room, building them on first use.
+
+        Parameters:
+            room: the room layout
+        """
+        cached = self._templates.get(id(room))
+        if cached is None or cached[0] is not room:
+            rows = [(' '.join(row) + f' {SEPARATOR} ').encode() for row in \
+                self._draw_room(room, {})]
+            cached = (room, rows)
+            self._templates[id(room)] = cached
+        return cached[1]
 
     def _draw_room(self, room: dict[tuple[int, int], str], 
         plants: dict[tuple[int, int], str]):
@@ -83,6 +133,12 @@ class View:
             room_list.append(row_list)
         return room_list
 
+    def _plant_glyph(self, plant: 'Plant') -> str:
+        """ Return the character drawn for a plant: lower case while young. """
+        if plant.get_age() < 3:
+            return plant.get_name()[0].lower()
+        return plant.get_name()[0].upper()
+
     def _display_plants(self, plants: dict[int, 'Plant']):
         """ Create the message to provide information all plants.
         
@@ -166,4 +222,108 @@ class View:
                 output += f'{round(plant_water, 3)} and {plant_repellent}'
             print(output)
         else:
-            print(f'No plant lives in {room_name} position {position}')
\ No newline at end of file
+            print(f'No plant lives in {room_name} position {position}')
+
+class IncrementalView(View):
+    """ A View which keeps the house pinned to the top of an ANSI terminal and,
+        after the first frame, only rewrites the cells of pots that changed.
+        Everything else that is printed scrolls in the region below the house.
+
+        Changed pots are taken from the change logs of the rooms (one per game,
+        see Model.changes), so the cost of a draw depends on what changed rather
+        than on the size of the house.
+
+        Cells are addressed by absolute cursor position, so a house wider or
+        taller than the terminal would wrap and put every update in the wrong
+        place; such a house is drawn in full every time, as View does, until
+        the terminal is large enough again. close() must be called at the end
+        of the game to give the whole screen back to scrolling output.
+    """
+    def __init__(self):
+        super().__init__()
+        self._rooms = None              # Room list of the frame on screen.
+        self._room_count = 0
+        self._columns = {}              # Room -> first screen column of the room.
+        self._glyphs = {}               # (room, position) -> glyph on screen.
+
+    def draw(self, rooms: list['Room']) -> None:
+        """ Draw the current game state, redrawing the whole house only when the
+            rooms themselves changed.
+
+        Parameters:
+            rooms: a list of rooms
+        """
+        if not self._fits(rooms):
+            self.close()
+            self._drain(rooms)
+            super().draw(rooms)
+            return
+        if rooms is not self._rooms or len(rooms) != self._room_count:
+            self._draw_frame(rooms)
+            return
+        updates = []
+        for room, position in self._drain(rooms):
+            column = self._columns.get(room)
+            if column is None:          # A room replaced by its copy, see Model.fork.
+                self._draw_frame(rooms)
+                return
+            glyph = self._pot_glyph(room, position)
+            if self._glyphs.get((room, position)) == glyph:
+                continue
+            self._glyphs[(room, position)] = glyph
+            row, col = ROOM_LAYOUTS[room.get_name()]['positions'][position]
+            updates.append(f'\x1b[{row + 1};{column + col * 2}H{glyph}')
+        if updates:
+            sys.stdout.write('\x1b7' + ''.join(updates) + '\x1b8')
+            sys.stdout.flush()
+
+    def _draw_frame(self, rooms: list['Room']) -> None:
+        """ Clear the screen, draw the whole house and reserve the rows below it
+            for scrolling output.
+        """
+        self._rooms = rooms
+        self._room_count = len(rooms)
+        self._columns = {}
+        self._glyphs = {}
+        width = ROOM_COL * 2 - 1 + len(f' {SEPARATOR} ')
+        for index, room in enumerate(rooms):
+            self._columns[room] = index * width + 1
+            for position in range(4):
+                self._glyphs[(room, position)] = self._pot_glyph(room, position)
+        self._drain(rooms)
+        sys.stdout.write('\x1b[r\x1b[2J\x1b[H')
+        super().draw(rooms)
+        sys.stdout.write(f'\x1b[{ROOM_ROW + 2};r\x1b[{ROOM_ROW + 2};1H')
+        sys.stdout.flush()
+
+    def close(self) -> None:
+        """ Stop pinning the house: reset the scroll region to the whole screen,
+            leaving the cursor where it is, and draw a new frame next time.
+        """
+        if self._rooms is not None:
+            sys.stdout.write('\x1b7\x1b[r\x1b8')
+            sys.stdout.flush()
+            self._rooms = None
+
+    def _fits(self, rooms: list['Room']) -> bool:
+        """ Return True if the house and a scrolling line fit on the terminal. """
+        columns, lines = shutil.get_terminal_size()
+        width = ROOM_COL * 2 - 1 + len(f' {SEPARATOR} ')
+        return width * len(rooms) <= columns and ROOM_ROW + 2 <= lines
+
+    def _drain(self, rooms: list['Room']) -> set[tuple['Room', int]]:
+        """ Return and forget the changes in every change log of the rooms. A
+            fork's rooms can use different logs until it copies them.
+        """
+        changes = set()
+        for log in {id(room.changes): room.changes for room in rooms}.values():
+            changes |= log.drain()
+        return changes
+
+    def _pot_glyph(self, room: 'Room', position: int) -> str:
+        """ Return the character drawn for the pot at a position of a room. """
+        plant = room.get_pot(position).look_at_plant()
+        if plant is not None:
+            return self._plant_glyph(plant)
+        layout = ROOM_LAYOUTS[room.get_name()]
+        return layout['layout'].get(layout['positions'][position], EMPTY)
@@ -0,0 +1,181 @@
+""" Headless batch runner: simulates many house files across a process pool and
+    writes one summary row per game.
+
+    Usage:
+        python batch.py house1.txt house2.txt:moves.txt --workers 8 --seed 42 --out results.csv
+
+    Each game is a house file, optionally followed by ':' and a move script.
+    A move script holds one command per line in the same language as
+    GardenSim.play (for example 'm Bal1 0 Bed1 1', 'a Bal1 1 R' or 'n'), run
+    through the same command registry, a2.run_command.
+    After the script ends, the game keeps moving to the next day until day 15.
+
+    Every game gets its own random stream derived from --seed and its position
+    in the batch, so a batch gives the same rows however many workers run it.
+    A game that cannot be played, e.g. because its script is missing or has a
+    command that does not fit the house, gets a row with only the reason in its error
+    column; the rest of the batch carries on.
+
+    --profile <file> times the hot paths in every worker (see profiler.py) and
+    writes the totals to a JSON file when the batch exits.
+"""
+import argparse
+import atexit
+import csv
+import os
+import sys
+from multiprocessing import Pool
+
+from a2 import *
+from profiler import PROFILER
+
+FIELDS = ['house', 'script', 'seed', 'alive', 'has_won', 'days', 'error']
+
+GAME_DAYS = 15
+
+
+def read_script(filename: Optional[str]) -> list[str]:
+    """ Return the commands in a move script, skipping blank lines.
+
+    Parameters:
+        filename: path to the move script, or None for no moves.
+    """
+    if filename is None:
+        return []
+    with open(filename, 'r') as file:
+        return [line.strip() for line in file if line.strip()]
+
+
+def check_script(house_file: str, script: list[str],
+        cache_dir: Optional[str] = None) -> None:
+    """ Check that every command of a script fits a house, without playing it.
+
+    Raises:
+        ValueError naming the first command that is not valid for the house.
+    """
+    model = Model(house_file, events=NullSink(), cache_dir=cache_dir)
+    for step in script:
+        parse_command(tokenize(step), model)
+
+
+def game_seed(seed: int, index: int) -> str:
+    """ Return the seed of the independent random stream for one game of a batch. """
+    return f'{seed}:{index}'
+
+
+def run_game(house_file: str, script: list[str], engine: str = 'object',
+        rng: Optional[int | str] = None, cache_dir: Optional[str] = None) -> dict:
+    """ Play one game to day 15 and return its summary row.
+
+    Parameters:
+        house_file: path to the house file
+        script: commands to apply before idling to day 15
+        engine: the Model engine to use
+        rng: seed for the game's animal attacks
+        cache_dir: directory of compiled house images
+    """
+    model = Model(house_file, engine, rng, events=NullSink(), cache_dir=cache_dir)
+    applied_items = []
+    for step in script:
+        if model.get_days_past() >= GAME_DAYS:
+            break
+        run_command(model, step, applied_items)
+    while model.get_days_past() < GAME_DAYS:
+        model.next(applied_items)
+        applied_items.clear()
+    return {
+        'alive': model.get_number_of_plants_alive(),
+        'has_won': bool(model.has_won()),
+        'days': model.get_days_past(),
+    }
+
+
+def _run_task(task: tuple[str, Optional[str], str, str, Optional[str]]) -> dict:
+    house_file, script_file, engine, seed, cache_dir = task
+    row = {'house': house_file, 'script': script_file or '', 'seed': seed}
+    try:
+        row.update(run_game(house_file, read_script(script_file), engine, seed,
+            cache_dir))
+    except (OSError, ValueError) as error:
+        row['error'] = str(error) or type(error).__name__
+    return row
+
+
+def _profile_task(task: tuple[str, Optional[str], str, str, Optional[str]]
+        ) -> tuple[dict, dict]:
+    PROFILER.enable()
+    PROFILER.reset()
+    row = _run_task(task)
+    return row, PROFILER.stats()
+
+
+def parse_game(game: str) -> tuple[str, Optional[str]]:
+    """ Split a 'house[:script]' argument into its house and script files. """
+    house_file, _, script_file = game.partition(':')
+    return house_file, script_file or None
+
+
+def run_batch(games: list[tuple[str, Optional[str]]], workers: Optional[int] = None,
+        engine: str = 'object', seed: int = 0,
+        cache_dir: Optional[str] = None, profile: bool = False) -> list[dict]:
+    """ Simulate every game in a pool of worker processes.
+
+    Parameters:
+        games: (house file, script file or None) pairs
+        workers: number of worker processes, defaults to the CPU count
+        engine: the Model engine to use
+        seed: base seed of the batch
+        cache_dir: directory of compiled house images shared by the workers
+        profile: time the hot paths of every game and add them to PROFILER
+
+    Return:
+        One summary row per game, in the order of games.
+    """
+    tasks = [(house_file, script_file, engine, game_seed(seed, index), cache_dir)
+        for index, (house_file, script_file) in enumerate(games)]
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(tasks) // (workers * 4))
+    with Pool(workers) as pool:
+        if not profile:
+            return list(pool.imap(_run_task, tasks, chunksize))
+        rows = []
+        for row, stats in pool.imap(_profile_task, tasks, chunksize):
+            rows.append(row)
+            PROFILER.merge(stats)
+        return rows
+
+
+def write_rows(rows: list[dict], file) -> None:
+    """ Write summary rows as CSV. """
+    writer = csv.DictWriter(file, fieldnames=FIELDS)
+    writer.writeheader()
+    writer.writerows(rows)
+
+
+def main():
+    """ Entry-point to batch runs """
+    parser = argparse.ArgumentParser(description='Simulate house files to day 15.')
+    parser.add_argument('games', nargs='+', help='house file, optionally :script')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--engine', choices=['object', 'array'], default='object')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--cache-dir', default=None,
+        help='directory for compiled house files')
+    parser.add_argument('--out', default=None, help='CSV file (default stdout)')
+    parser.add_argument('--profile', default=None,
+        help='JSON file for the time spent in the hot paths')
+    args = parser.parse_args()
+
+    if args.profile is not None:
+        atexit.register(PROFILER.dump, args.profile)
+    rows = run_batch([parse_game(game) for game in args.games], args.workers,
+        args.engine, args.seed, args.cache_dir, args.profile is not None)
+    if args.out is None:
+        write_rows(rows, sys.stdout)
+    else:
+        with open(args.out, 'w', newline='') as file:
+            write_rows(rows, file)
+
+
+if __name__ == '__main__':
+    main()
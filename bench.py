@@ -0,0 +1,244 @@
+""" Benchmark suite for the hot paths of the game.
+
+    Usage:
+        python bench.py run --sizes 10 100 1000 --out results.json
+        python bench.py compare baseline.json results.json --threshold 0.1
+
+    'run' times load_house, Model.next (both engines), View.draw,
+    View.display_rooms, Inventory.get_entities, Inventory.remove_entity and
+    Model.has_won on generated houses of each size, and reports operations per
+    second and the peak memory allocated by one operation (tracemalloc).
+    'compare' matches the results of two runs by benchmark and size and flags
+    every one that got slower or bigger by more than the threshold; it exits
+    with status 1 when there is a regression.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from typing import Callable, Optional
+
+from a2 import *
+from engine import np
+from generate_house import write_house
+
+SIZES = [10, 100, 1000]
+
+GAME_DAYS = 15
+
+CALLS = 1000                        # Calls per operation of the very cheap benchmarks.
+
+
+class Benchmark:
+    """ One timed operation on a house of a given size. The operation returns
+        how many calls it made, so cheap calls can be timed in loops. reset, if
+        given, runs untimed before the operation whenever due() says so.
+    """
+    def __init__(self, name: str, size: int, operation: Callable[[], int],
+            reset: Optional[Callable[[], None]] = None,
+            due: Optional[Callable[[], bool]] = None) -> None:
+        self.name = name
+        self.size = size
+        self.operation = operation
+        self.reset = reset
+        self.due = due or (lambda: reset is not None)
+
+    def _prepare(self) -> None:
+        if self.reset is not None and self.due():
+            self.reset()
+
+    def measure(self, min_time: float, rounds: int = 5) -> dict:
+        """ Time the operation for at least min_time seconds, split in rounds,
+            and return its row. The speed is that of the fastest round, which
+            is the least disturbed by the rest of the machine.
+        """
+        self._prepare()
+        tracemalloc.start()
+        self.operation()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        total_calls = 0
+        total_elapsed = 0.0
+        best = 0.0
+        for _ in range(rounds):
+            elapsed = 0.0
+            calls = 0
+            while elapsed < min_time / rounds:
+                self._prepare()
+                start = time.perf_counter()
+                calls += self.operation()
+                elapsed += time.perf_counter() - start
+            best = max(best, calls / elapsed)
+            total_calls += calls
+            total_elapsed += elapsed
+        return {'name': self.name, 'size': self.size, 'calls': total_calls,
+            'seconds': total_elapsed, 'ops_per_sec': best, 'peak_bytes': peak}
+
+
+def _quiet(function: Callable[[], None]) -> Callable[[], int]:
+    """ Return an operation running function with its output thrown away. """
+    sink = io.StringIO()
+
+    def operation() -> int:
+        with redirect_stdout(sink):
+            function()
+        sink.seek(0)
+        sink.truncate()
+        return 1
+    return operation
+
+
+def house_benchmarks(house_file: str, size: int) -> list[Benchmark]:
+    """ Return the benchmarks of one generated house. """
+    def load() -> int:
+        load_house(house_file)
+        return 1
+    benchmarks = [Benchmark('load_house', size, load)]
+
+    engines = ['object', 'array'] if np is not None else ['object']
+    for engine in engines:
+        game = {}
+
+        def reset(engine=engine, game=game) -> None:
+            if 'start' not in game:
+                game['start'] = Model(house_file, engine, 0, events=NullSink()).snapshot()
+            game['model'], _ = Model.restore(game['start'], events=NullSink())
+
+        def step(game=game) -> int:
+            game['model'].next([])
+            return 1
+
+        def due(game=game) -> bool:
+            return 'model' not in game or game['model'].get_days_past() >= GAME_DAYS
+        benchmarks.append(Benchmark(f'model_next_{engine}', size, step, reset, due))
+
+    model = Model(house_file, rng=0, events=NullSink())
+    view = View()
+    benchmarks.append(Benchmark('view_draw', size,
+        _quiet(lambda: view.draw(model.get_all_rooms()))))
+    benchmarks.append(Benchmark('view_display_rooms', size,
+        _quiet(lambda: view.display_rooms(model.get_rooms()))))
+
+    inventory = Inventory()
+    for name in PLANT_NAMES:
+        inventory.add_stock(name, size)
+
+    def get_entities() -> int:
+        inventory.get_entities('Plant')
+        return 1
+    benchmarks.append(Benchmark('inventory_get_entities', size, get_entities))
+
+    def remove_entity() -> int:
+        for i in range(CALLS):
+            inventory.remove_entity(PLANT_NAMES[i % len(PLANT_NAMES)])
+        return CALLS
+
+    def restock() -> None:
+        for name in PLANT_NAMES:
+            inventory.add_stock(name, size - inventory.count(name))
+    benchmarks.append(Benchmark('inventory_remove_entity', size, remove_entity, restock))
+
+    finished = Model(house_file, rng=0, events=NullSink())
+    while finished.get_days_past() < GAME_DAYS:
+        finished.next([])
+
+    def has_won() -> int:
+        for _ in range(CALLS):
+            finished.has_won()
+        return CALLS
+    benchmarks.append(Benchmark('has_won', size, has_won))
+    return benchmarks
+
+
+def run(sizes: list[int], min_time: float = 0.5, only: Optional[list[str]] = None,
+        seed: int = 0) -> dict:
+    """ Run every benchmark on a generated house of each size.
+
+    Parameters:
+        sizes: room counts of the generated houses
+        min_time: seconds to spend timing each benchmark
+        only: names of the benchmarks to run, all if None
+        seed: seed of the generated houses
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            house_file = os.path.join(directory, f'house{size}.txt')
+            write_house(house_file, size, inventory=size, items=size, seed=seed)
+            for benchmark in house_benchmarks(house_file, size):
+                if only is None or benchmark.name in only:
+                    row = benchmark.measure(min_time)
+                    results.append(row)
+                    print(f"{row['name']:<26} {size:>7} {row['ops_per_sec']:>14.1f} ops/s "
+                        f"{row['peak_bytes'] / 1024:>12.1f} KiB", file=sys.stderr)
+    return {'python': platform.python_version(), 'machine': platform.machine(),
+        'seed': seed, 'min_time': min_time, 'results': results}
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.1) -> list[dict]:
+    """ Return a row for every benchmark present in both runs, with its speed
+        and memory ratios (current / baseline) and whether it regressed by
+        more than threshold.
+    """
+    before = {(row['name'], row['size']): row for row in baseline['results']}
+    rows = []
+    for row in current['results']:
+        old = before.get((row['name'], row['size']))
+        if old is None:
+            continue
+        speed = row['ops_per_sec'] / old['ops_per_sec']
+        memory = row['peak_bytes'] / old['peak_bytes'] if old['peak_bytes'] else 1.0
+        rows.append({'name': row['name'], 'size': row['size'], 'speed': speed,
+            'memory': memory,
+            'regressed': speed < 1 - threshold or memory > 1 + threshold})
+    return rows
+
+
+def main():
+    """ Entry-point to the benchmark suite """
+    parser = argparse.ArgumentParser(description='Benchmark the game hot paths.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', help='run the benchmarks')
+    run_parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    run_parser.add_argument('--min-time', type=float, default=0.5)
+    run_parser.add_argument('--only', nargs='+', default=None)
+    run_parser.add_argument('--seed', type=int, default=0)
+    run_parser.add_argument('--out', default=None, help='JSON file (default stdout)')
+    compare_parser = commands.add_parser('compare', help='flag regressions')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.1)
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        results = run(args.sizes, args.min_time, args.only, args.seed)
+        if args.out is None:
+            json.dump(results, sys.stdout, indent=2)
+        else:
+            with open(args.out, 'w') as file:
+                json.dump(results, file, indent=2)
+        return
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    with open(args.current) as file:
+        current = json.load(file)
+    rows = compare(baseline, current, args.threshold)
+    print(f'{"benchmark":<26} {"size":>7} {"speed":>8} {"memory":>8}')
+    for row in rows:
+        flag = '  REGRESSION' if row['regressed'] else ''
+        print(f"{row['name']:<26} {row['size']:>7} {row['speed']:>7.2f}x "
+            f"{row['memory']:>7.2f}x{flag}")
+    if any(row['regressed'] for row in rows):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
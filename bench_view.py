@@ -0,0 +1,57 @@
+""" Micro-benchmark of View.draw: time per frame against the number of rooms.
+
+    Usage:
+        python bench_view.py [room counts...]
+"""
+import io
+import sys
+import time
+from contextlib import redirect_stdout
+
+from a2 import *
+
+ROOM_COUNTS = [1, 10, 100, 1000]
+
+
+def build_rooms(count: int) -> list[Room]:
+    """ Return count rooms cycling through every layout, with a plant in every
+        other pot.
+    """
+    rooms = []
+    names = list(ROOM_LAYOUTS)
+    for i in range(count):
+        room = Room(names[i % len(names)])
+        for position in range(0, 4, 2):
+            room.add_plant(position, Plant(PLANT_NAMES[(i + position) % len(PLANT_NAMES)]))
+        rooms.append(room)
+    return rooms
+
+
+def time_draw(rooms: list[Room], min_time: float = 0.2) -> float:
+    """ Return the mean seconds per View.draw of the given rooms. """
+    view = View()
+    sink = io.StringIO()
+    frames = 0
+    start = time.perf_counter()
+    with redirect_stdout(sink):
+        while True:
+            view.draw(rooms)
+            frames += 1
+            sink.seek(0)
+            sink.truncate()
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                return elapsed / frames
+
+
+def main():
+    """ Entry-point to the benchmark """
+    counts = [int(arg) for arg in sys.argv[1:]] or ROOM_COUNTS
+    print(f'{"rooms":>8} {"us/frame":>12} {"us/room":>10}')
+    for count in counts:
+        per_frame = time_draw(build_rooms(count))
+        print(f'{count:>8} {per_frame * 1e6:>12.1f} {per_frame * 1e6 / count:>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+from typing import Optional
+
+try:
+    import numpy as np
+except ImportError:                 # NumPy is only needed by the array engine.
+    np = None
+
+from a2_support import dice_rolls
+from constants import *
+from events import *
+
+UNSET_SUN_RANGE = (0, 0)            # Stored for pots without a sun range.
+
+
+class ArrayEngine:
+    """ Alternative day engine for Model which keeps the house in contiguous
+        NumPy arrays (struct-of-arrays) and advances every pot with a handful of
+        array operations instead of per-plant method calls.
+
+        The static pot data (evaporation and sun range) is stored once when the
+        engine is built. Pots that were never given a sun range (a short row in
+        the house file or a room added empty) are masked out of the sun check. The plant state (species, water, health, age,
+        repellent) is gathered from the plants before the first day and then
+        stays in the arrays from one day to the next; the arrays are the source
+        of truth for it. Plants that die are taken out of their pots straight
+        away, but the water, health and age of the others are only written back
+        to the Plant objects by flush(), which Model calls before anyone reads
+        them. After a plant is changed through its object, Model calls reload()
+        for its pot.
+    """
+
+    def __init__(self, model: 'Model') -> None:
+        """ Build the pot arrays for the rooms of a model. The engine uses the
+            model's random source, plant counters and event sink as they are at
+            each step.
+
+        Parameters:
+            model: the game whose house is advanced.
+        """
+        if np is None:
+            raise ImportError("the array engine requires NumPy")
+        self.model = model
+        self.pots = []
+        self.slots = []                 # (room name, room, position) of each pot.
+        self.index = {}                 # (room name, position) -> pot index.
+        outdoor = []
+        for name, room in model.rooms.items():
+            for position, pot in room.get_pots().items():
+                self.index[(name, position)] = len(self.pots)
+                self.pots.append(pot)
+                self.slots.append((name, room, position))
+                outdoor.append(room.room_type == 'OutDoor')
+        count = len(self.pots)
+        self.outdoor = np.array(outdoor, dtype=bool)
+        self.has_evaporation = np.array(
+            [pot.get_evaporation() is not None for pot in self.pots], dtype=bool)
+        self.evaporation = np.array(
+            [pot.get_evaporation() or 0.0 for pot in self.pots], dtype=float)
+        sun_ranges = [pot.get_sun_range() or UNSET_SUN_RANGE for pot in self.pots]
+        self.has_sun = np.array(
+            [pot.get_sun_range() is not None for pot in self.pots], dtype=bool)
+        self.sun_lower = np.array([lower for lower, _ in sun_ranges], dtype=np.int64)
+        self.sun_upper = np.array([upper for _, upper in sun_ranges], dtype=np.int64)
+        self.drink_rate = np.array(
+            [PLANTS_DATA[name]['drink rate'] for name in PLANT_NAMES], dtype=float)
+        self.plant_lower = np.array(
+            [PLANTS_DATA[name]['sun-lower'] for name in PLANT_NAMES], dtype=np.int64)
+        self.plant_upper = np.array(
+            [PLANTS_DATA[name]['sun-upper'] for name in PLANT_NAMES], dtype=np.int64)
+
+        self.occupied = np.zeros(count, dtype=bool)
+        self.species = np.zeros(count, dtype=np.intp)
+        self.water = np.zeros(count, dtype=float)
+        self.health = np.zeros(count, dtype=np.int64)
+        self.age = np.zeros(count, dtype=np.int64)
+        self.repellent = np.zeros(count, dtype=bool)
+        self.dirty = False              # Plant objects lag behind the arrays.
+        self.reload()
+
+    def reload(self, slots: Optional[list[int]] = None) -> None:
+        """ Read the plants of the given pots, every pot if None, back into the
+            arrays after they were changed through their objects. Their objects
+            must be up to date, see flush.
+        """
+        for i in range(len(self.pots)) if slots is None else slots:
+            plant = self.pots[i].plant
+            self.occupied[i] = plant is not None
+            if plant is not None:
+                self.species[i] = plant.species.index
+                self.water[i] = plant.water
+                self.health[i] = plant.health
+                self.age[i] = plant.age
+                self.repellent[i] = plant.repellent
+
+    def flush(self, slots: Optional[list[int]] = None) -> None:
+        """ Write the water, health and age in the arrays to the plants of the
+            given pots, every pot if None.
+        """
+        if not self.dirty:
+            return
+        if slots is None:
+            slots = np.flatnonzero(self.occupied).tolist()
+            self.dirty = False
+        pots = self.pots
+        for i, w, h, a in zip(slots, self.water[slots].tolist(),
+                self.health[slots].tolist(), self.age[slots].tolist()):
+            plant = pots[i].plant
+            if plant is not None:
+                plant.water = w
+                plant.health = h
+                plant.age = a
+
+    def step(self) -> None:
+        """ Progress every plant in the house by one day. Produces the same state
+            and messages as calling Room.progress_plants on every room.
+        """
+        occupied = np.flatnonzero(self.occupied)
+        if not len(occupied):
+            return
+        species = self.species[occupied]
+        water = self.water[occupied]
+        health = self.health[occupied]
+        age = self.age[occupied] + 1
+        repellent = self.repellent[occupied]
+
+        was_dead = health <= 0
+        water = np.where(self.has_evaporation[occupied],
+            water - (self.evaporation[occupied] + self.drink_rate[species]), water)
+
+        mismatch = self.has_sun[occupied] & (
+            (self.sun_lower[occupied] > self.plant_upper[species]) |
+            (self.sun_upper[occupied] < self.plant_lower[species]))
+        health -= mismatch
+        sun_dead = mismatch & (health <= 0)
+        thirsty = water < 0
+        health -= thirsty
+        water_dead = thirsty & (health <= 0)
+        removed = health <= 0
+
+        # Animal attacks only happen to outdoor plants that survived the day.
+        # All rolls are drawn in one call, in house order, so they match the
+        # per-plant rolls of OutDoor.progress_plant for the same source.
+        candidates = np.flatnonzero(self.outdoor[occupied] & ~removed)
+        attacked = np.zeros(len(occupied), dtype=bool)
+        attacked[candidates] = dice_rolls(len(candidates), self.model.rng)
+        damaged = attacked & ~repellent
+        health -= damaged * ANIMAL_ATTACK_DAMAGE
+
+        events = self.model.events
+        if events.listening:
+            talk = np.flatnonzero(mismatch | water_dead | attacked)
+            for i in talk.tolist():
+                name = PLANT_NAMES[species[i]]
+                events.room = self.slots[occupied[i]][0]
+                if sun_dead[i]:
+                    events.emit(PlantDied(name, 'sun'))
+                elif mismatch[i]:
+                    events.emit(SunMismatch(name))
+                if water_dead[i]:
+                    events.emit(PlantDied(name, 'water'))
+                if attacked[i]:
+                    if repellent[i]:
+                        events.emit(AttackBlocked(name))
+                    else:
+                        events.emit(AttackDamage(name, ANIMAL_ATTACK_DAMAGE,
+                            bool(health[i] <= 0)))
+
+        self.water[occupied] = water
+        self.health[occupied] = health
+        self.age[occupied] = age
+        self.dirty = True
+        pots = self.pots
+        for i in occupied[removed].tolist():
+            pots[i].remove_plant()
+            self.occupied[i] = False
+        for i in occupied[removed | (age == 3)].tolist():
+            _, room, position = self.slots[i]
+            room.changes.mark(room, position)
+        counter = self.model.counter
+        counter.planted -= int(removed.sum())
+        counter.dead += int((health <= 0).sum() - removed.sum() - was_dead.sum())
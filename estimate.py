@@ -0,0 +1,201 @@
+""" Monte Carlo estimate of the chance that a house is won with a given script
+    or policy.
+
+    Usage:
+        python estimate.py house1.txt --policy water --games 10000 --precision 0.01
+        python estimate.py house1.txt --script moves.txt --workers 8 --json
+
+    Games are played in rounds across a process pool, every game with its own
+    seed derived from --seed and its index as in batch.py. After each round
+    the Wilson interval of the win rate is updated, and the run stops as soon
+    as its half-width is within --precision. Rounds have a fixed size, so the
+    result does not depend on the number of workers.
+"""
+import argparse
+import json
+import math
+import os
+import sys
+from multiprocessing import Pool
+from statistics import NormalDist, mean, pstdev
+from typing import Callable, Optional
+
+from a2 import *
+from batch import GAME_DAYS, check_script, game_seed, read_script
+
+
+def idle(model: Model) -> list[str]:
+    """ Policy that never does anything. """
+    return []
+
+
+def water(model: Model) -> list[str]:
+    """ Policy that waters every plant just enough not to go thirsty today. """
+    commands = []
+    for name, room in model.get_rooms().items():
+        for position, pot in room.get_pots().items():
+            plant = pot.look_at_plant()
+            if plant is None or pot.get_evaporation() is None:
+                continue
+            level = plant.get_water()
+            while level - (pot.get_evaporation() + plant.get_drink_rate()) < 0:
+                level = level + 1
+                commands.append(f'w {name} {position}')
+    return commands
+
+
+POLICIES = {'idle': idle, 'water': water}
+
+
+def play_game(house_file: str, script: list[str], policy: Callable[[Model], list[str]],
+        engine: str = 'object', rng: Optional[int | str] = None,
+        cache_dir: Optional[str] = None) -> tuple[int, bool]:
+    """ Play a script, then the policy every day until day 15.
+
+    Return:
+        The plants alive at the end and whether the game was won.
+    """
+    model = Model(house_file, engine, rng, events=NullSink(), cache_dir=cache_dir)
+    applied_items = []
+    for step in script:
+        if model.get_days_past() >= GAME_DAYS:
+            break
+        run_command(model, step, applied_items)
+    while model.get_days_past() < GAME_DAYS:
+        for step in policy(model):
+            run_command(model, step, applied_items)
+        run_command(model, 'n', applied_items)
+    return model.get_number_of_plants_alive(), bool(model.has_won())
+
+
+def _play_task(task: tuple[str, list[str], str, str, str, Optional[str]]) -> tuple[int, bool]:
+    house_file, script, policy, engine, seed, cache_dir = task
+    return play_game(house_file, script, POLICIES[policy], engine, seed, cache_dir)
+
+
+def wilson_interval(wins: int, games: int, confidence: float = 0.95) -> tuple[float, float]:
+    """ Return the Wilson score interval of a win rate. """
+    if games == 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    rate = wins / games
+    centre = (rate + z * z / (2 * games)) / (1 + z * z / games)
+    spread = z * math.sqrt(rate * (1 - rate) / games + z * z / (4 * games * games)) \
+        / (1 + z * z / games)
+    return max(0.0, centre - spread), min(1.0, centre + spread)
+
+
+def estimate(house_file: str, script: list[str] = (), policy: str = 'idle',
+        games: int = 10000, precision: float = 0.01, confidence: float = 0.95,
+        workers: Optional[int] = None, round_size: int = 256, engine: str = 'object',
+        seed: int = 0, cache_dir: Optional[str] = None) -> dict:
+    """ Estimate the win probability of a house played with a script and policy.
+
+    Parameters:
+        house_file: path to the house file
+        script: commands played first, as in batch.py
+        policy: name in POLICIES of what to do every day after the script
+        games: most games to play
+        precision: stop once the interval's half-width is at most this
+        confidence: confidence level of the interval
+        workers: number of worker processes, defaults to the CPU count
+        round_size: games played between two checks of the interval
+        engine: the Model engine to use
+        seed: base seed of the games
+        cache_dir: directory of compiled house images shared by the workers
+
+    Return:
+        A summary with the games played, wins, win rate, interval and the
+        distribution of surviving plants.
+
+    Raises:
+        ValueError if games or round_size is below 1, precision is not positive,
+        confidence is not between 0 and 1 or a command of the script does not
+        fit the house.
+    """
+    if games < 1:
+        raise ValueError(f"games must be at least 1, not {games}")
+    if round_size < 1:
+        raise ValueError(f"round_size must be at least 1, not {round_size}")
+    if precision <= 0:
+        raise ValueError(f"precision must be positive, not {precision}")
+    if not 0 < confidence < 1:
+        raise ValueError(f"confidence must be between 0 and 1, not {confidence}")
+    check_script(house_file, script, cache_dir)
+    workers = workers or os.cpu_count() or 1
+    results = []
+    low, high = 0.0, 1.0
+    with Pool(workers) as pool:
+        while len(results) < games:
+            start = len(results)
+            tasks = [(house_file, list(script), policy, engine, game_seed(seed, index),
+                cache_dir) for index in range(start, min(games, start + round_size))]
+            results.extend(pool.map(_play_task, tasks,
+                max(1, len(tasks) // (workers * 4))))
+            wins = sum(won for _, won in results)
+            low, high = wilson_interval(wins, len(results), confidence)
+            if (high - low) / 2 <= precision:
+                break
+    alive = [count for count, _ in results]
+    distribution = {}
+    for count in sorted(alive):
+        distribution[count] = distribution.get(count, 0) + 1
+    return {'house': house_file, 'policy': policy, 'games': len(results),
+        'wins': wins, 'win_rate': wins / len(results), 'confidence': confidence,
+        'interval': [low, high], 'alive_mean': mean(alive), 'alive_stdev': pstdev(alive),
+        'alive': distribution}
+
+
+def main():
+    """ Entry-point to win-probability estimates """
+    parser = argparse.ArgumentParser(description='Estimate the chance of winning a house.')
+    parser.add_argument('house', help='house file')
+    parser.add_argument('--script', default=None, help='move script played first')
+    parser.add_argument('--policy', choices=sorted(POLICIES), default='idle',
+        help='what to do every day after the script')
+    parser.add_argument('--games', type=int, default=10000, help='most games to play')
+    parser.add_argument('--precision', type=float, default=0.01,
+        help='stop once the interval half-width is at most this')
+    parser.add_argument('--confidence', type=float, default=0.95)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--round', type=int, default=256,
+        help='games played between checks of the interval')
+    parser.add_argument('--engine', choices=['object', 'array'], default='object')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--cache-dir', default=None,
+        help='directory for compiled house files')
+    parser.add_argument('--json', action='store_true', help='print the summary as JSON')
+    args = parser.parse_args()
+    if args.games < 1:
+        parser.error('--games must be at least 1')
+    if args.round < 1:
+        parser.error('--round must be at least 1')
+    if args.precision <= 0:
+        parser.error('--precision must be positive')
+    if not 0 < args.confidence < 1:
+        parser.error('--confidence must be between 0 and 1')
+
+    script = read_script(args.script)
+    try:
+        check_script(args.house, script, args.cache_dir)
+    except ValueError as error:
+        parser.error(f'{args.script}: {error}')
+    summary = estimate(args.house, script, args.policy, args.games,
+        args.precision, args.confidence, args.workers, args.round, args.engine,
+        args.seed, args.cache_dir)
+    if args.json:
+        json.dump(summary, sys.stdout, indent=2)
+        print()
+        return
+    low, high = summary['interval']
+    print(f"{summary['house']}: won {summary['wins']} of {summary['games']} games, "
+        f"win rate {summary['win_rate']:.4f} "
+        f"({summary['confidence']:.0%} interval {low:.4f} - {high:.4f})")
+    print(f"plants alive: mean {summary['alive_mean']:.3f}, "
+        f"stdev {summary['alive_stdev']:.3f}")
+    for count, times in summary['alive'].items():
+        print(f"{count:>5} {times:>8} {times / summary['games']:>8.2%}")
+
+
+if __name__ == '__main__':
+    main()
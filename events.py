@@ -0,0 +1,155 @@
+""" Typed events emitted by the simulation core and the sinks that receive them.
+
+    Pots and rooms report deaths and animal attacks as events instead of
+    printing. A sink decides what happens to them: TextSink turns them into
+    the familiar game messages, ColumnarLog keeps them for analysis and
+    NullSink drops them. Emitters check sink.listening first, so a NullSink
+    costs one attribute lookup per event and no event object is ever built.
+"""
+import sys
+from array import array
+from typing import NamedTuple, Optional, TextIO
+
+
+class SunMismatch(NamedTuple):
+    """ A plant lost health because its pot gets the wrong sun levels. """
+    plant: str
+
+    kind = 'sun'
+
+    def message(self) -> str:
+        return f"Poor {self.plant} dislikes the sun levels."
+
+
+class PlantDied(NamedTuple):
+    """ A plant ran out of health through bad sun levels or lack of water. """
+    plant: str
+    cause: str                      # 'sun' or 'water'
+
+    kind = 'died'
+
+    def message(self) -> str:
+        return f"{self.plant} is dead"
+
+
+class AttackBlocked(NamedTuple):
+    """ An animal attacked a plant but the repellent kept it away. """
+    plant: str
+
+    kind = 'blocked'
+
+    def message(self) -> str:
+        return f"There has been an animal attack! But luckily the {self.plant} has repellent."
+
+
+class AttackDamage(NamedTuple):
+    """ An animal attacked a plant and took health from it. """
+    plant: str
+    damage: int
+    fatal: bool                     # The message reports the death of the plant.
+
+    kind = 'attack'
+
+    def message(self) -> str:
+        if self.fatal:
+            return f"There has been an animal attack! {self.plant} is dead."
+        return f"There has been an animal attack! Poor {self.plant}."
+
+
+Event = SunMismatch | PlantDied | AttackBlocked | AttackDamage
+
+
+class EventSink:
+    """ Receives events from the simulation. The model keeps day and room up to
+        date while it progresses the house, for sinks that record them.
+    """
+    listening = True
+
+    def __init__(self) -> None:
+        self.day = 0
+        self.room = None            # Short name of the room being progressed.
+
+    def emit(self, event: Event) -> None:
+        """ Receive one event. """
+        raise NotImplementedError
+
+    def copy(self) -> 'EventSink':
+        """ Return an empty sink of the same kind for another game. """
+        return type(self)()
+
+
+class NullSink(EventSink):
+    """ Drops every event; emitters skip building them altogether. """
+    listening = False
+
+    def emit(self, event: Event) -> None:
+        pass
+
+
+class TextSink(EventSink):
+    """ Turns events into the game messages and writes them to a stream, either
+        straight away or in one write on flush.
+    """
+    def __init__(self, stream: Optional[TextIO] = None, buffered: bool = True) -> None:
+        """ Set up the sink.
+
+        Parameters:
+            stream: where messages go, sys.stdout (at the time of writing) if None
+            buffered: hold messages until flush instead of writing each one
+        """
+        super().__init__()
+        self.stream = stream
+        self.buffered = buffered
+        self.messages = []
+
+    def emit(self, event: Event) -> None:
+        if self.buffered:
+            self.messages.append(event.message())
+        else:
+            print(event.message(), file=self.stream or sys.stdout)
+
+    def copy(self) -> 'TextSink':
+        return TextSink(self.stream, self.buffered)
+
+    def flush(self) -> None:
+        """ Write out and forget the buffered messages. """
+        if self.messages:
+            stream = self.stream or sys.stdout
+            stream.write('\n'.join(self.messages) + '\n')
+            self.messages = []
+
+
+class ColumnarLog(EventSink):
+    """ Keeps every event as a row of parallel columns: day, room, kind, plant
+        and damage (0 for events without damage).
+    """
+    def __init__(self) -> None:
+        super().__init__()
+        self.days = array('i')
+        self.rooms = []
+        self.kinds = []
+        self.plants = []
+        self.damage = array('i')
+
+    def emit(self, event: Event) -> None:
+        self.days.append(self.day)
+        self.rooms.append(self.room)
+        self.kinds.append(event.kind)
+        self.plants.append(event.plant)
+        self.damage.append(getattr(event, 'damage', 0))
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def columns(self) -> dict[str, list]:
+        """ Return the log as a dictionary of column name to values. """
+        return {'day': list(self.days), 'room': self.rooms, 'kind': self.kinds,
+            'plant': self.plants, 'damage': list(self.damage)}
+
+    def count(self, kind: str) -> int:
+        """ Return the number of events of the given kind. """
+        return self.kinds.count(kind)
+
+
+# Default sink of pots and rooms used outside a Model; every Model has its own.
+STDOUT = TextSink(buffered=False)    # Prints each message as it happens.
@@ -0,0 +1,132 @@
+""" Synthetic house generator for scale testing.
+
+    Usage:
+        python generate_house.py 10000 --outdoor 0.4 --density 0.75 --seed 1 --out big.txt
+
+    Writes a house file in the same format as house1.txt: one 'Room - <name> <n>'
+    header per room followed by its four 'sun.sun_evaporation_plant' pots, then
+    the Plants and Items inventory lines. The same settings and seed always
+    give the same file.
+"""
+import argparse
+import math
+import random
+import sys
+from typing import Optional
+
+from constants import *
+
+OUTDOOR_ROOMS = [name for name, layout in ROOM_LAYOUTS.items()
+    if layout['room_type'] == 'OutDoor']
+
+INDOOR_ROOMS = [name for name, layout in ROOM_LAYOUTS.items()
+    if layout['room_type'] == 'Room']
+
+OUTDOOR_EVAPORATION = (0.8, 1.5)    # Outdoor pots dry out faster than indoor ones.
+
+INDOOR_EVAPORATION = (0.3, 0.9)
+
+
+def parse_species(text: str) -> dict[str, float]:
+    """ Parse a species distribution such as 'Rebutia=3,Cereus=1'.
+
+    Raises:
+        ValueError if a name is not a plant in constants.py, a weight is invalid
+            or every weight is zero.
+    """
+    weights = {}
+    for entry in text.split(','):
+        name, _, weight = entry.partition('=')
+        if name not in PLANTS_DATA:
+            raise ValueError(f"unknown plant: {name}")
+        weights[name] = float(weight or 1)
+        if not 0 <= weights[name] < math.inf:
+            raise ValueError(f"invalid weight for {name}")
+    if not sum(weights.values()) > 0:
+        raise ValueError("at least one weight must be positive")
+    return weights
+
+
+def generate_house(rooms: int, outdoor: float = 0.4, density: float = 0.75,
+        species: Optional[dict[str, float]] = None, inventory: int = 10,
+        items: int = 2, seed: int | str = 0) -> list[str]:
+    """ Return the lines of a random house file.
+
+    Parameters:
+        rooms: number of rooms
+        outdoor: chance that a room is an OutDoor room (Balcony, Greenhouse)
+        density: chance that a pot holds a plant
+        species: relative weight of each plant name, every plant equally if None
+        inventory: number of plants in the inventory, drawn from species
+        items: number of fertilisers and of possum repellents in the inventory
+        seed: seed of the generator
+    """
+    rng = random.Random(seed)
+    species = species or dict.fromkeys(PLANT_NAMES, 1)
+    names = list(species)
+    weights = list(species.values())
+    lines = []
+    room_count = {}
+    for _ in range(rooms):
+        if rng.random() < outdoor:
+            name = rng.choice(OUTDOOR_ROOMS)
+            low, high = OUTDOOR_EVAPORATION
+        else:
+            name = rng.choice(INDOOR_ROOMS)
+            low, high = INDOOR_EVAPORATION
+        room_count[name] = room_count.get(name, 0) + 1
+        pots = []
+        for _ in range(4):
+            sun_lower = rng.randint(1, 10)
+            sun_upper = rng.randint(sun_lower, 10)
+            evaporation = round(rng.uniform(low, high), 1)
+            plant = rng.choices(names, weights)[0] if rng.random() < density else 'None'
+            pots.append(f'{sun_lower}.{sun_upper}_{evaporation}_{plant}')
+        lines.append(f'Room - {name} {room_count[name]}')
+        lines.append(','.join(pots))
+        lines.append('')
+
+    stock = dict.fromkeys(PLANT_NAMES, 0)
+    for plant in rng.choices(names, weights, k=inventory):
+        stock[plant] += 1
+    lines.append('Plants - ' + ','.join(f'{name} {count}' for name, count in stock.items()))
+    lines.append('')
+    lines.append(f'Items - {FERTILISER} {items},{POSSUM_REPELLENT} {items}')
+    return lines
+
+
+def write_house(filename: str, rooms: int, **settings) -> None:
+    """ Write a random house file, see generate_house for the settings. """
+    with open(filename, 'w') as file:
+        file.write('\n'.join(generate_house(rooms, **settings)))
+
+
+def main():
+    """ Entry-point to house generation """
+    parser = argparse.ArgumentParser(description='Write a random house file.')
+    parser.add_argument('rooms', type=int, help='number of rooms')
+    parser.add_argument('--outdoor', type=float, default=0.4,
+        help='chance that a room is outdoors')
+    parser.add_argument('--density', type=float, default=0.75,
+        help='chance that a pot holds a plant')
+    parser.add_argument('--species', type=parse_species, default=None,
+        help="plant weights, e.g. 'Rebutia=3,Cereus=1' (default all equal)")
+    parser.add_argument('--inventory', type=int, default=10,
+        help='number of plants in the inventory')
+    parser.add_argument('--items', type=int, default=2,
+        help='number of each item in the inventory')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default=None, help='house file (default stdout)')
+    args = parser.parse_args()
+
+    settings = {'outdoor': args.outdoor, 'density': args.density,
+        'species': args.species, 'inventory': args.inventory, 'items': args.items,
+        'seed': args.seed}
+    if args.out is None:
+        sys.stdout.write('\n'.join(generate_house(args.rooms, **settings)))
+    else:
+        write_house(args.out, args.rooms, **settings)
+
+
+if __name__ == '__main__':
+    main()
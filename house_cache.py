@@ -0,0 +1,181 @@
+""" Compiled binary cache for house files.
+
+    A house file is compiled into a flat binary image keyed by the SHA-1 of
+    its text, so an edited file never hits a stale entry. The image is read
+    back through a memory map, and its pot columns are typed memoryviews over
+    that map, so nothing is parsed or copied before the rooms are built.
+
+    Layout (little endian, every column aligned to its item size):
+        header      magic, version, room count, plant kinds, item kinds,
+                    CRC-32 of everything after the header
+        float64     evaporation of every pot
+        int32       lower sun level of every pot
+        int32       upper sun level of every pot
+        int8        species index of every pot's plant, NO_PLANT or UNSET_POT
+        uint8       ROOM_LAYOUTS index of every room
+        entries     plant then item inventory: name length, name, int32 count
+"""
+import hashlib
+import mmap
+import os
+import struct
+import zlib
+from array import array
+from typing import Optional
+
+from constants import *
+
+MAGIC = b'GGHC'
+
+VERSION = 2
+
+HEADER = struct.Struct('<4sHxxIIII')
+
+ENTRY = struct.Struct('<B')
+
+COUNT = struct.Struct('<i')
+
+NO_PLANT = -1                       # Pot without a plant.
+
+UNSET_POT = -2                      # Pot never given a sun range or evaporation.
+
+LAYOUT_NAMES = list(ROOM_LAYOUTS)
+
+
+class CompiledHouse:
+    """ Typed views over a compiled house image. """
+
+    def __init__(self, buffer) -> None:
+        """ Map the columns of a compiled image. The header, the size of every
+            column and entry and the checksum are all checked against the raw
+            buffer before any view is taken, so a damaged image leaves nothing
+            exported and its map can be closed straight away.
+
+        Parameters:
+            buffer: the image, e.g. an mmap or bytes
+
+        Raises:
+            ValueError if the image is not a compiled house of this version.
+        """
+        if len(buffer) < HEADER.size:
+            raise ValueError("truncated compiled house")
+        magic, version, rooms, plant_kinds, item_kinds, checksum = \
+            HEADER.unpack_from(buffer)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a compiled house of this version")
+        pots = rooms * 4
+        spans = []
+        offset = HEADER.size
+        for code, size, count in (('d', 8, pots), ('i', 4, pots), ('i', 4, pots),
+                ('b', 1, pots), ('B', 1, rooms)):
+            spans.append((code, offset, offset + size * count))
+            offset += size * count
+        if offset > len(buffer):
+            raise ValueError("truncated compiled house")
+        try:
+            self.plants, offset = self._read_counts(buffer, offset, plant_kinds)
+            self.items, offset = self._read_counts(buffer, offset, item_kinds)
+        except (struct.error, UnicodeDecodeError) as error:
+            raise ValueError(f"damaged compiled house: {error}") from None
+        if offset != len(buffer):
+            raise ValueError("truncated compiled house")
+        self.view = memoryview(buffer)
+        try:
+            if zlib.crc32(self.view[HEADER.size:]) != checksum:
+                raise ValueError("compiled house fails its checksum")
+            self.evaporation, self.sun_lower, self.sun_upper, self.species, \
+                self.layouts = [self.view[start:end].cast(code)
+                for code, start, end in spans]
+        except ValueError:
+            self.view.release()
+            raise
+
+    def _read_counts(self, buffer, offset: int, kinds: int) -> tuple[dict[str, int], int]:
+        """ Read kinds inventory entries starting at offset. """
+        counts = {}
+        for _ in range(kinds):
+            (length,) = ENTRY.unpack_from(buffer, offset)
+            offset += ENTRY.size
+            name = bytes(buffer[offset:offset + length]).decode()
+            offset += length
+            (counts[name],) = COUNT.unpack_from(buffer, offset)
+            offset += COUNT.size
+        return counts, offset
+
+    def room_names(self) -> list[str]:
+        """ Return the ROOM_LAYOUTS name of every room, in house order. """
+        return [LAYOUT_NAMES[index] for index in self.layouts]
+
+    def release(self) -> None:
+        """ Release the views so the underlying map can be closed. """
+        for column in (self.evaporation, self.sun_lower, self.sun_upper,
+                self.species, self.layouts, self.view):
+            column.release()
+
+
+def encode_house(rooms: list[tuple['Room', str]], plants: dict[str, int],
+        items: dict[str, int]) -> bytes:
+    """ Return the compiled image of a loaded house.
+
+    Parameters:
+        rooms, plants, items: the house as returned by load_house
+    """
+    evaporation = array('d')
+    sun_lower = array('i')
+    sun_upper = array('i')
+    species = array('b')
+    layouts = array('B')
+    for room, _ in rooms:
+        layouts.append(LAYOUT_NAMES.index(room.get_name()))
+        for position in range(4):
+            pot = room.get_pot(position)
+            plant = pot.look_at_plant()
+            if pot.get_sun_range() is None:
+                evaporation.append(0.0)
+                sun_lower.append(0)
+                sun_upper.append(0)
+                species.append(UNSET_POT)
+                continue
+            evaporation.append(pot.get_evaporation())
+            sun_lower.append(pot.get_sun_range()[0])
+            sun_upper.append(pot.get_sun_range()[1])
+            species.append(NO_PLANT if plant is None else PLANT_NAMES.index(plant.get_name()))
+    parts = [evaporation.tobytes(), sun_lower.tobytes(), sun_upper.tobytes(),
+        species.tobytes(), layouts.tobytes()]
+    for counts in (plants, items):
+        for name, count in counts.items():
+            encoded = name.encode()
+            parts.append(ENTRY.pack(len(encoded)) + encoded + COUNT.pack(count))
+    body = b''.join(parts)
+    return HEADER.pack(MAGIC, VERSION, len(rooms), len(plants), len(items),
+        zlib.crc32(body)) + body
+
+
+def cache_path(cache_dir: str, text: bytes) -> str:
+    """ Return where the compiled image of a house file's text is stored. """
+    return os.path.join(cache_dir, hashlib.sha1(text).hexdigest() + '.ghc')
+
+
+def open_compiled(path: str) -> Optional[tuple[CompiledHouse, mmap.mmap]]:
+    """ Memory-map a compiled image. Returns None when it is missing, stale or
+        damaged; the caller should then parse the text and store it again.
+    """
+    try:
+        with open(path, 'rb') as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):        # Missing, unreadable or empty.
+        return None
+    try:
+        return CompiledHouse(mapped), mapped
+    except (ValueError, struct.error, IndexError, UnicodeDecodeError):
+        mapped.close()
+        return None
+
+
+def store_compiled(path: str, image: bytes) -> None:
+    """ Write a compiled image, replacing any previous one atomically. """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temporary = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'wb') as file:
+        file.write(image)
+    os.replace(temporary, path)
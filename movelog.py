@@ -0,0 +1,69 @@
+""" Append-only logs of the commands played in a game.
+
+    A log is a text file. Every game in it starts with a header line
+        game <seed> <house file>
+    followed by each command GardenSim accepted, one per line, in the order
+    they were played. Games are only ever appended, so a crash loses at most
+    the command being written. replay.py re-runs a logged game.
+"""
+from typing import NamedTuple, Optional
+
+HEADER = 'game'
+
+
+class LoggedGame(NamedTuple):
+    """ One game read back from a move log. """
+    house_file: str
+    seed: int
+    commands: list[str]
+
+
+class MoveLog:
+    """ Writes the commands of one game to a move log as they are played. """
+
+    def __init__(self, filename: str, house_file: str, seed: int) -> None:
+        """ Open the log for appending and start a new game in it.
+
+        Parameters:
+            filename: path to the log, created if missing
+            house_file: the house the game is played in
+            seed: seed of the game's animal attacks
+        """
+        self.file = open(filename, 'a', buffering=1)      # Line buffered.
+        self.file.write(f'{HEADER} {seed} {house_file}\n')
+
+    def record(self, step: str) -> None:
+        """ Append one accepted command to the log. """
+        self.file.write(step + '\n')
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def read_log(filename: str) -> list[LoggedGame]:
+    """ Return every game in a move log, oldest first.
+
+    Raises:
+        ValueError if commands appear before the first game header.
+    """
+    games = []
+    with open(filename, 'r') as file:
+        for line in file:
+            step = line.strip()
+            if not step:
+                continue
+            word, _, rest = step.partition(' ')
+            if word == HEADER:
+                seed, _, house_file = rest.partition(' ')
+                games.append(LoggedGame(house_file, int(seed), []))
+            elif games:
+                games[-1].commands.append(step)
+            else:
+                raise ValueError(f"{filename}: command before the first game: {step}")
+    return games
+
+
+def last_game(filename: str) -> Optional[LoggedGame]:
+    """ Return the most recent game in a move log, None if there is none. """
+    games = read_log(filename)
+    return games[-1] if games else None
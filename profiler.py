@@ -0,0 +1,122 @@
+""" Opt-in timers and call counters on the hot paths of the game.
+
+    Usage:
+        python a2.py --profile              then type 'stats' during the game
+        python batch.py house1.txt --profile profile.json
+
+    PROFILER.enable() replaces load_house, Model.next, Room.progress_plants,
+    View.draw (and the draw of its subclasses) and Model.get_inventory with
+    wrappers that count calls and add up the time spent in them, nested calls
+    to other phases included. Until it is enabled nothing is wrapped, so a
+    game that does not ask for profiling runs exactly the code it always did.
+    disable() puts the originals back.
+
+    load_house is replaced in a2, which is where Model looks it up; modules
+    that imported it by name before profiling was enabled keep the original.
+"""
+import json
+import time
+from functools import wraps
+from types import ModuleType
+from typing import Callable, Optional
+
+
+class Profiler:
+    """ Call counts and total seconds of each wrapped phase. """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.timers = {}                # Phase name -> [calls, seconds]
+        self._active = set()            # Phases being timed, to skip nested calls.
+        self._originals = []            # (owner, attribute, original) to restore.
+
+    def _timed(self, name: str, function: Callable) -> Callable:
+        """ Return function wrapped to count and time its calls as phase name.
+            A call made while the same phase is already timed (e.g. a subclass
+            calling super().draw) is not counted again.
+        """
+        record = self.timers.setdefault(name, [0, 0.0])
+        active = self._active
+        clock = time.perf_counter
+
+        @wraps(function)
+        def timed(*args, **kwargs):
+            if name in active:
+                return function(*args, **kwargs)
+            active.add(name)
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record[1] += clock() - start
+                record[0] += 1
+                active.discard(name)
+        return timed
+
+    def _wrap(self, owner: object, attribute: str, name: str) -> None:
+        original = getattr(owner, attribute)
+        self._originals.append((owner, attribute, original))
+        setattr(owner, attribute, self._timed(name, original))
+
+    def enable(self, game: Optional[ModuleType] = None) -> None:
+        """ Start timing the hot paths. Does nothing if already enabled.
+
+        Parameters:
+            game: the a2 module to profile, imported if None; a2 running as a
+                script is the module __main__
+        """
+        if self.enabled:
+            return
+        import a2_support
+        if game is None:
+            import a2 as game
+        self._wrap(game, 'load_house', 'load_house')
+        self._wrap(game.Model, 'next', 'Model.next')
+        self._wrap(game.Room, 'progress_plants', 'Room.progress_plants')
+        self._wrap(game.Model, 'get_inventory', 'Model.get_inventory')
+        for view in (a2_support.View, *a2_support.View.__subclasses__()):
+            if 'draw' in vars(view):
+                self._wrap(view, 'draw', 'View.draw')
+        self.enabled = True
+
+    def disable(self) -> None:
+        """ Put the original functions back; the counts are kept. """
+        for owner, attribute, original in reversed(self._originals):
+            setattr(owner, attribute, original)
+        self._originals = []
+        self.enabled = False
+
+    def reset(self) -> None:
+        """ Forget the counts so far. """
+        for record in self.timers.values():
+            record[:] = [0, 0.0]
+
+    def stats(self) -> dict[str, dict]:
+        """ Return the calls and seconds of every phase called so far. """
+        return {name: {'calls': calls, 'seconds': seconds}
+            for name, (calls, seconds) in self.timers.items() if calls}
+
+    def merge(self, stats: dict[str, dict]) -> None:
+        """ Add the stats of another process, e.g. a pool worker, to these. """
+        for name, stat in stats.items():
+            record = self.timers.setdefault(name, [0, 0.0])
+            record[0] += stat['calls']
+            record[1] += stat['seconds']
+
+    def report(self) -> str:
+        """ Return the stats as a table, slowest phase first. """
+        if not self.enabled and not self.stats():
+            return 'Profiling is off; start the game with --profile.'
+        lines = [f'{"phase":<22} {"calls":>9} {"total ms":>11} {"mean us":>10}']
+        for name, stat in sorted(self.stats().items(), key=lambda item: -item[1]['seconds']):
+            lines.append(f"{name:<22} {stat['calls']:>9} {stat['seconds'] * 1000:>11.3f} "
+                f"{stat['seconds'] / stat['calls'] * 1e6:>10.2f}")
+        return '\n'.join(lines)
+
+    def dump(self, filename: str) -> None:
+        """ Write the stats to a JSON file. """
+        with open(filename, 'w') as file:
+            json.dump(self.stats(), file, indent=2)
+
+
+PROFILER = Profiler()
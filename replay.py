@@ -0,0 +1,87 @@
+""" Replay engine for move logs: re-runs a logged game against a fresh Model with
+    rendering and event printing turned off.
+
+    Usage:
+        python replay.py game.log --day 7 --show
+
+    Prints the day reached, the plants alive and whether the game is won. The
+    replay stops at the start of the given day (before any command played on
+    it), so a long session can be bisected by replaying to different days.
+"""
+import argparse
+from typing import Iterator, Optional
+
+from a2 import *
+from movelog import LoggedGame, read_log
+
+
+def _step(model: Model, applied_items: list, step: str) -> tuple[Model, list]:
+    """ Replay one logged command, returning the model and items that follow. """
+    words = tokenize(step)
+    if words[0] == 'load':
+        return Model.load(words[1], events=NullSink())
+    run_command(model, step, applied_items)
+    return model, applied_items
+
+
+def replay(game: LoggedGame, day: Optional[int] = None,
+        engine: str = 'object') -> tuple[Model, list[tuple[str, int, Item]]]:
+    """ Re-run a logged game.
+
+    Parameters:
+        game: the game, as read by movelog.read_log
+        day: stop at the start of this day, play every command if None
+        engine: the Model engine to replay with; both give the same game
+
+    Return:
+        The model and the items waiting for the next day.
+    """
+    model = Model(game.house_file, engine, game.seed, events=NullSink())
+    applied_items = []
+    for step in game.commands:
+        if day is not None and model.get_days_past() >= day:
+            break
+        model, applied_items = _step(model, applied_items, step)
+    return model, applied_items
+
+
+def replay_days(game: LoggedGame, engine: str = 'object') -> Iterator[Model]:
+    """ Re-run a logged game once, yielding the model at the start of each day
+        it reaches. The same model object is yielded every time and changes
+        as the replay goes on.
+    """
+    model = Model(game.house_file, engine, game.seed, events=NullSink())
+    applied_items = []
+    day = model.get_days_past()
+    yield model
+    for step in game.commands:
+        model, applied_items = _step(model, applied_items, step)
+        if model.get_days_past() != day:
+            day = model.get_days_past()
+            yield model
+
+
+def main():
+    """ Entry-point to replays """
+    parser = argparse.ArgumentParser(description='Replay a game from a move log.')
+    parser.add_argument('log', help='move log written by a2.py --log')
+    parser.add_argument('--day', type=int, default=None,
+        help='stop at the start of this day')
+    parser.add_argument('--game', type=int, default=-1,
+        help='index of the game in the log (default the last one)')
+    parser.add_argument('--engine', choices=['object', 'array'], default='object')
+    parser.add_argument('--show', action='store_true', help='draw the house')
+    args = parser.parse_args()
+
+    games = read_log(args.log)
+    if not games:
+        parser.error(f"no game in {args.log}")
+    model, applied_items = replay(games[args.game], args.day, args.engine)
+    if args.show:
+        View().draw(model.get_all_rooms())
+    print(f"day {model.get_days_past()}: {model.get_number_of_plants_alive()} plants "
+        f"alive, {len(applied_items)} items waiting, won: {bool(model.has_won())}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,213 @@
+""" Event-driven day scheduler: plays a game without visiting every pot every day.
+
+    Usage:
+        python scheduler.py house1.txt --days 1000 --script moves.txt --seed 3
+
+    Left alone, a plant's water falls by the same amount every day and its
+    sun penalty does not change, so the day its water goes below 0 and the
+    day it dies can be worked out as soon as it is touched (Pot.forecast).
+    The scheduler keeps the death of every plant in a heap keyed by day and
+    only brings a pot up to date (Room.advance_plant) when a command touches
+    it, when its death comes up or when an animal attacks it. Moves, swaps,
+    watering, planting, removal and items recompute the forecast of the
+    pots they name; everything else costs nothing per day.
+
+    Outdoor plants still draw one attack roll each per day, in house order,
+    so a game played through the scheduler draws the same rolls and reaches
+    the same state as one played with Model.next. The model's plants lag
+    behind while the scheduler runs: call sync() before drawing, saving or
+    forking it. Rooms added to the model afterwards are not scheduled.
+"""
+import argparse
+import heapq
+import time
+from bisect import bisect_left
+from typing import NamedTuple, Optional
+
+from a2 import *
+from batch import read_script
+
+
+class Forecast(NamedTuple):
+    """ Days of the model during whose next() something will happen to a plant. """
+    thirsty: Optional[int]          # Its water first goes below 0.
+    dies: Optional[int]             # It dies and is removed.
+
+
+class Scheduler:
+    """ Plays days and commands on a model, progressing each plant only when
+        something happens to it.
+    """
+
+    def __init__(self, model: Model) -> None:
+        """ Forecast every plant of a model from its current day.
+
+        Parameters:
+            model: the game to play; its event sink should not be listening,
+                otherwise every day is played with Model.next
+        """
+        self.model = model
+        self.slots = []                 # (room name, position) of every pot, in house order.
+        self.index = {}
+        self.outdoor = []
+        for name, room in model.get_rooms().items():
+            for position in room.get_pots():
+                self.index[(name, position)] = len(self.slots)
+                self.slots.append((name, position))
+                self.outdoor.append(isinstance(room, OutDoor))
+        if model.engine is not None:    # The plants are changed behind its back.
+            model.stale_engine = True
+        self.synced = [model.days] * len(self.slots)    # Day each pot is up to date with.
+        self.versions = [0] * len(self.slots)           # Invalidates older heap entries.
+        self.forecasts = {}
+        self.heap = []                  # (day, slot, version) of each predicted death.
+        self.attackable = []            # Sorted slots of the outdoor plants.
+        for slot in range(len(self.slots)):
+            self._schedule(slot)
+
+    def _pot(self, slot: int) -> tuple[Room, Pot]:
+        name, position = self.slots[slot]
+        room = self.model.rooms[name]
+        return room, room.get_pot(position)
+
+    def _sync(self, slot: int, day: Optional[int] = None) -> None:
+        """ Bring the plant in a pot up to the start of a day, by default the
+            model's current day.
+        """
+        day = self.model.days if day is None else day
+        name, position = self.slots[slot]
+        room = self.model.rooms[name]
+        if day > self.synced[slot] and room.get_pot(position).plant is not None:
+            if name not in self.model.owned:
+                room = self.model._own(name)
+            room.advance_plant(position, day - self.synced[slot])
+        self.synced[slot] = day
+
+    def _schedule(self, slot: int) -> None:
+        """ Forecast the plant in an up-to-date pot again, dropping the old forecast. """
+        self.versions[slot] += 1
+        _, pot = self._pot(slot)
+        at = bisect_left(self.attackable, slot)
+        listed = at < len(self.attackable) and self.attackable[at] == slot
+        if pot.plant is None:
+            self.forecasts.pop(slot, None)
+            if listed:
+                del self.attackable[at]
+            return
+        if self.outdoor[slot] and not listed:
+            self.attackable.insert(at, slot)
+        start = self.synced[slot] - 1
+        thirsty, dies = pot.forecast()
+        self.forecasts[slot] = Forecast(None if thirsty is None else start + thirsty,
+            None if dies is None else start + dies)
+        if dies is not None:
+            heapq.heappush(self.heap, (start + dies, slot, self.versions[slot]))
+
+    def _die(self, day: int) -> None:
+        """ Remove the plants whose death is due on or before a day. """
+        heap = self.heap
+        while heap and heap[0][0] <= day:
+            due, slot, version = heapq.heappop(heap)
+            if version == self.versions[slot]:
+                self._sync(slot, due + 1)
+                self._schedule(slot)
+
+    def forecast(self, room_name: str, position: int) -> Optional[Forecast]:
+        """ Return the forecast of the plant at a position, None if there is none. """
+        return self.forecasts.get(self.index[(room_name, position)])
+
+    def sync(self) -> Model:
+        """ Bring every plant up to the model's current day and return the model. """
+        for slot in self.forecasts:
+            self._sync(slot)
+        return self.model
+
+    def next(self, applied_items: list[tuple[str, int, Item]]) -> None:
+        """ Move to the next day as Model.next does. """
+        model = self.model
+        if model.events.listening:
+            self.sync()
+            model.next(applied_items)
+            for slot in range(len(self.slots)):
+                self.synced[slot] = model.days
+                self._schedule(slot)
+            return
+        touched = [self.index[(room_name, position)]
+            for room_name, position, _ in applied_items]
+        for slot in touched:
+            self._sync(slot)
+        model._apply_items(applied_items)
+        for slot in touched:
+            self._schedule(slot)
+        day = model.days
+        self._die(day)
+        if self.attackable:
+            rolls = dice_rolls(len(self.attackable), model.rng)
+            for slot, attacked in zip(list(self.attackable), rolls):
+                if not attacked:
+                    continue
+                if not self._pot(slot)[1].plant.has_repellent():
+                    self._sync(slot, day + 1)
+                    _, pot = self._pot(slot)
+                    pot.plant.decrease_health(ANIMAL_ATTACK_DAMAGE)
+                    model.counter.update(False, pot.plant.is_dead())
+                    self._schedule(slot)
+        model._finish_days(1)
+
+    def advance(self, days: int) -> None:
+        """ Move forward a number of days with nothing applied or moved. Once no
+            outdoor plant is left, the remaining days only cost their deaths.
+        """
+        end = self.model.days + days
+        while self.model.days < end and (self.attackable or self.model.events.listening):
+            self.next([])
+        if self.model.days < end:
+            self._die(end - 1)
+            self.model._finish_days(end - self.model.days)
+
+    def run_command(self, step: str, applied_items: list) -> tuple[str, object]:
+        """ Apply one play command as a2.run_command does, progressing and
+            forecasting again only the pots it names.
+
+        Raises:
+            ValueError if the command is not valid for the house.
+        """
+        name, arguments = parse_command(tokenize(step), self.model)
+        if name == 'n':
+            self.next(applied_items)
+            applied_items.clear()
+            return name, None
+        kinds = next(kinds for kinds in COMMANDS[name][0] if len(kinds) == len(arguments))
+        touched = [self.index[(arguments[i], arguments[i + 1])]
+            for i, kind in enumerate(kinds) if kind == 'room']
+        for slot in touched:
+            self._sync(slot)
+        result = COMMANDS[name][1](self.model, applied_items, *arguments)
+        for slot in touched:
+            self._schedule(slot)
+        return name, result
+
+
+def main():
+    """ Entry-point to scheduled simulations """
+    parser = argparse.ArgumentParser(description='Play a long game with the event scheduler.')
+    parser.add_argument('house', help='house file')
+    parser.add_argument('--days', type=int, default=15, help='day to play up to')
+    parser.add_argument('--script', default=None, help='commands played first')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    scheduler = Scheduler(Model(args.house, rng=args.seed, events=NullSink()))
+    applied_items = []
+    for step in read_script(args.script):
+        scheduler.run_command(step, applied_items)
+    if scheduler.model.get_days_past() < args.days:
+        scheduler.advance(args.days - scheduler.model.get_days_past())
+    model = scheduler.sync()
+    print(f"day {model.get_days_past()}: {model.get_number_of_plants_alive()} plants "
+        f"alive, won: {bool(model.has_won())} ({time.perf_counter() - start:.3f}s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+""" Asyncio game server: hosts many games at once, one per connection, in a
+    single process.
+
+    Usage:
+        python server.py house1.txt --port 8765
+        python server.py house1.txt --unix /tmp/garden.sock
+
+    Every connection gets its own game of the house, a copy-on-write fork of
+    one model loaded at start-up, so idle sessions cost little more than
+    their socket. Clients send one command per line, in the language of
+    GardenSim.play, plus:
+        board               draw the house
+        state               one-line compact state of the game
+        mode board|state|none
+                            what to send after each play command (default board)
+        quit                close the connection
+    save and load are not available, as they would touch the server's files.
+
+    Every reply starts with a line '<status> <count>' followed by count lines
+    of text. The status is 'ok', 'error' for a command that was not played,
+    'over' once the game has ended, or 'bye'. The first reply, sent on
+    connection, is 'ok 1' with the line 'seed <seed>' of the game.
+"""
+import argparse
+import asyncio
+import io
+import random
+from contextlib import redirect_stdout
+from typing import Optional
+
+from a2 import *
+
+MODES = ('board', 'state', 'none')
+
+EMPTY_POT = '-'
+
+
+def compact_state(model: Model, applied_items: list, view: View) -> str:
+    """ Return the game on one line: the day, plants alive, plants planted,
+        items waiting, won/lost/playing and then every room as its name and
+        the glyph of each pot as drawn on the board ('-' when empty), e.g.
+        'day 3 alive 5 planted 6 items 1 playing Bal1:c-R- Kit1:----'.
+    """
+    if model.get_days_past() < 15:
+        result = 'playing'
+    else:
+        result = 'won' if model.has_won() else 'lost'
+    rooms = []
+    for name, room in model.get_rooms().items():
+        glyphs = ''.join(EMPTY_POT if plant is None else view._plant_glyph(plant)
+            for plant in room.get_plants().values())
+        rooms.append(f'{name}:{glyphs}')
+    return (f'day {model.get_days_past()} alive {model.get_number_of_plants_alive()} '
+        f'planted {model.counter.planted} items {len(applied_items)} {result} '
+        + ' '.join(rooms))
+
+
+class Session:
+    """ The game of one connection and what it answers to each line. """
+
+    def __init__(self, template: Model, view: View, seed: int,
+            snapshot: Optional[bytes] = None) -> None:
+        """ Start a game as a fork of the template, with its own animal attacks.
+
+        Parameters:
+            template: model of the house, never played itself
+            view: draws the board; shared by every session
+            seed: seed of the game's animal attacks
+            snapshot: game saved by Model.snapshot to resume instead
+        """
+        if snapshot is None:
+            model, applied_items = template.fork(seed), []
+        else:
+            model, applied_items = Model.restore(snapshot)
+        self.game = GardenSim(template.house_file, view, seed, model=model)
+        self.game.applied_item = applied_items
+        self.mode = 'board'
+        self.over = model.get_days_past() >= 15
+
+    def _board(self) -> list[str]:
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.game.view.draw(self.game.model.get_all_rooms())
+        return output.getvalue().splitlines()
+
+    def _state(self) -> list[str]:
+        return [compact_state(self.game.model, self.game.applied_item, self.game.view)]
+
+    def handle(self, line: str) -> tuple[str, list[str]]:
+        """ Carry out one line from the client and return the reply status and
+            lines.
+        """
+        words = tokenize(line)
+        if not words:
+            return 'error', ['empty command']
+        if words[0] == 'quit':
+            return 'bye', []
+        if words == ['board']:
+            return 'ok', self._board()
+        if words == ['state']:
+            return 'ok', self._state()
+        if words[0] == 'mode':
+            if len(words) != 2 or words[1] not in MODES:
+                return 'error', [f"mode is one of {', '.join(MODES)}"]
+            self.mode = words[1]
+            return 'ok', []
+        if words[0] in ('save', 'load'):
+            return 'error', [f'{words[0]} is not available on the server']
+        if self.over:
+            return 'over', ['the game is over']
+        output = io.StringIO()
+        try:
+            with redirect_stdout(output):   # Messages and events of this game only.
+                self.over = self.game.play_step(line)
+        except ValueError as error:
+            return 'error', [str(error)]
+        lines = output.getvalue().splitlines()
+        if self.mode == 'board':
+            lines += self._board()
+        elif self.mode == 'state':
+            lines += self._state()
+        return ('over' if self.over else 'ok'), lines
+
+
+class GameServer:
+    """ Accepts connections and plays a session of the house on each. """
+
+    def __init__(self, house_file: str, seed: Optional[int] = None,
+            cache_dir: Optional[str] = None) -> None:
+        """ Load the house once for every session.
+
+        Parameters:
+            house_file: path to the house file
+            seed: seed of the sessions' seeds, random if None
+            cache_dir: directory of compiled house images, see load_house
+        """
+        self.template = Model(house_file, rng=0, cache_dir=cache_dir)
+        self.view = View()
+        self.seeds = random.Random(seed)
+        self.sessions = 0               # Connections open now.
+
+    async def handle(self, reader: asyncio.StreamReader,
+            writer: asyncio.StreamWriter) -> None:
+        """ Play one connection's session until it quits or disconnects. """
+        seed = self.seeds.randrange(2 ** 32)
+        session = Session(self.template, self.view, seed)
+        self.sessions += 1
+        try:
+            writer.write(f'ok 1\nseed {seed}\n'.encode())
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                status, lines = session.handle(line.decode(errors='replace'))
+                writer.write(f'{status} {len(lines)}\n'.encode()
+                    + ''.join(text + '\n' for text in lines).encode())
+                await writer.drain()
+                if status == 'bye':
+                    break
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass                        # Lost or misbehaving client: drop the session.
+        finally:
+            self.sessions -= 1
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def serve(self, host: str = '127.0.0.1', port: int = 8765,
+            path: Optional[str] = None) -> None:
+        """ Serve on a TCP port, or on a Unix socket if path is given, forever. """
+        if path is not None:
+            server = await asyncio.start_unix_server(self.handle, path)
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    """ Entry-point to the game server """
+    parser = argparse.ArgumentParser(description='Serve games of a house over a line protocol.')
+    parser.add_argument('house', help='house file')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', default=None, help='serve on this Unix socket instead')
+    parser.add_argument('--seed', type=int, default=None,
+        help='seed of the games\' seeds')
+    parser.add_argument('--cache-dir', default=None,
+        help='directory for compiled house files')
+    args = parser.parse_args()
+
+    server = GameServer(args.house, args.seed, args.cache_dir)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,361 @@
+""" Process-sharded session hosting: game sessions spread over worker processes,
+    with the state of every game in shared memory.
+
+    Usage:
+        python shards.py house1.txt --workers 4 --sessions 1000
+
+    Each session is played by one worker process, which runs its commands
+    exactly like the game server does (server.Session). After every command
+    the worker writes the session's pots to a SessionBlock, a shared memory
+    segment created by the front-end, so the front-end reads boards and
+    win/loss status straight from memory without asking the worker or
+    unpickling anything. Writes are guarded by a sequence number: it is odd
+    while a write is in progress, and a reader that sees it odd or changed
+    reads again.
+
+    Sessions move between workers as snapshots (Model.snapshot): the old
+    worker hands over the bytes of the game, the new one restores it and goes
+    on writing to the same block. balance() moves sessions until every worker
+    hosts about as many.
+
+    Block layout (native byte order):
+        int64       sequence, day, alive, planted, result, items waiting, 2 spare
+        float64     water of every pot
+        int32       health, age of every pot
+        int8        species index of every pot's plant or NO_PLANT
+        uint8       POT_REPELLENT flags of every pot
+"""
+import argparse
+import io
+import random
+import time
+from contextlib import redirect_stdout
+from multiprocessing import Pipe, Process, resource_tracker
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+from typing import NamedTuple, Optional
+
+from a2 import *
+from house_cache import NO_PLANT
+from server import Session
+from snapshot import POT_REPELLENT
+
+SEQUENCE, DAY, ALIVE, PLANTED, RESULT, ITEMS = range(6)
+
+HEADER_FIELDS = 8
+
+PLAYING, WON, LOST = range(3)       # RESULT values
+
+
+class BoardState(NamedTuple):
+    """ A consistent copy of a session's block. """
+    day: int
+    alive: int
+    planted: int
+    result: int
+    items: int
+    water: list[float]
+    health: list[int]
+    age: list[int]
+    species: list[int]
+    flags: list[int]
+
+
+class SessionBlock:
+    """ The shared memory holding one session's game, in house pot order. """
+
+    def __init__(self, pots: int, name: Optional[str] = None) -> None:
+        """ Create a block for a number of pots, or attach to an existing one.
+
+        Parameters:
+            pots: pots in the house
+            name: name of the segment to attach to, None to create one
+        """
+        header = HEADER_FIELDS * 8
+        size = header + pots * (8 + 4 + 4 + 1 + 1)
+        self.memory = SharedMemory(name, create=name is None, size=size)
+        self.name = self.memory.name
+        buf = self.memory.buf
+        self.header = buf[:header].cast('q')
+        offset = header
+        self.water = buf[offset:offset + 8 * pots].cast('d')
+        offset += 8 * pots
+        self.health = buf[offset:offset + 4 * pots].cast('i')
+        offset += 4 * pots
+        self.age = buf[offset:offset + 4 * pots].cast('i')
+        offset += 4 * pots
+        self.species = buf[offset:offset + pots].cast('b')
+        offset += pots
+        self.flags = buf[offset:offset + pots].cast('B')
+
+    def write(self, model: Model, applied_items: list) -> None:
+        """ Copy a game into the block. """
+        header = self.header
+        header[SEQUENCE] += 1               # Odd: write in progress.
+        header[DAY] = model.get_days_past()
+        header[ALIVE] = model.get_number_of_plants_alive()
+        header[PLANTED] = model.counter.planted
+        if model.get_days_past() < 15:
+            header[RESULT] = PLAYING
+        else:
+            header[RESULT] = WON if model.has_won() else LOST
+        header[ITEMS] = len(applied_items)
+        water, health, age = self.water, self.health, self.age
+        species, flags = self.species, self.flags
+        p = 0
+        for room in model.get_rooms().values():
+            for pot in room.get_pots().values():
+                plant = pot.plant
+                if plant is None:
+                    species[p] = NO_PLANT
+                    water[p] = 0.0
+                    health[p] = age[p] = flags[p] = 0
+                else:
+                    species[p] = plant.species.index
+                    water[p] = plant.water
+                    health[p] = plant.health
+                    age[p] = plant.age
+                    flags[p] = POT_REPELLENT if plant.repellent else 0
+                p += 1
+        header[SEQUENCE] += 1
+
+    def read(self) -> BoardState:
+        """ Return a copy of the block, taken while no write was in progress. """
+        header = self.header
+        while True:
+            sequence = header[SEQUENCE]
+            if sequence % 2:
+                continue
+            state = BoardState(header[DAY], header[ALIVE], header[PLANTED],
+                header[RESULT], header[ITEMS], self.water.tolist(), self.health.tolist(),
+                self.age.tolist(), self.species.tolist(), self.flags.tolist())
+            if header[SEQUENCE] == sequence:
+                return state
+
+    def close(self, unlink: bool = False) -> None:
+        """ Detach from the block, and free it if unlink is set. """
+        for view in (self.header, self.water, self.health, self.age, self.species,
+                self.flags):
+            view.release()
+        self.memory.close()
+        if unlink:
+            self.memory.unlink()
+
+
+def _worker(connection: Connection, house_file: str, cache_dir: Optional[str]) -> None:
+    """ Host sessions, carrying out the front-end's requests in order until it
+        sends 'stop'. Every request gets one reply.
+    """
+    template = Model(house_file, rng=0, cache_dir=cache_dir)
+    view = View()
+    sessions = {}                       # Session id -> (Session, SessionBlock)
+    pots = sum(len(room.get_pots()) for room in template.get_rooms().values())
+    while True:
+        request = connection.recv()
+        kind = request[0]
+        try:
+            if kind == 'stop':
+                break
+            if kind == 'open':
+                _, sid, seed, snapshot, name = request
+                session = Session(template, view, seed, snapshot)
+                session.mode = 'none'       # Boards are read from the block.
+                block = SessionBlock(pots, name)
+                block.write(session.game.model, session.game.applied_item)
+                sessions[sid] = (session, block)
+                connection.send(('ok', []))
+            elif kind == 'play':
+                _, sid, step = request
+                session, block = sessions[sid]
+                reply = session.handle(step)
+                block.write(session.game.model, session.game.applied_item)
+                connection.send(reply)
+            elif kind == 'detach':          # Hand the game over to another worker.
+                _, sid = request
+                session, block = sessions.pop(sid)
+                block.close()
+                connection.send(session.game.model.snapshot(session.game.applied_item))
+            elif kind == 'close':
+                _, sid = request
+                _, block = sessions.pop(sid)
+                block.close()
+                connection.send(('ok', []))
+        except Exception as error:          # Keep the worker and the other sessions alive.
+            connection.send(('error', [f'{type(error).__name__}: {error}']))
+    for _, block in sessions.values():
+        block.close()
+
+
+class SessionManager:
+    """ Front-end of the worker processes: opens, plays, moves and closes
+        sessions, and reads their blocks.
+    """
+
+    def __init__(self, house_file: str, workers: int = 2, seed: Optional[int] = None,
+            cache_dir: Optional[str] = None) -> None:
+        """ Start the workers.
+
+        Parameters:
+            house_file: path to the house file every session plays
+            workers: number of worker processes
+            seed: seed of the sessions' seeds, random if None
+            cache_dir: directory of compiled house images, see load_house
+        """
+        self.template = Model(house_file, rng=0, events=NullSink(), cache_dir=cache_dir)
+        self.pots = sum(len(room.get_pots()) for room in self.template.get_rooms().values())
+        self.view = View()
+        self.seeds = random.Random(seed)
+        self.workers = []               # (process, connection) of each worker.
+        # Workers must share this process's resource tracker, or each would
+        # start its own and free the blocks it attached to when it exits.
+        resource_tracker.ensure_running()
+        for _ in range(workers):
+            connection, child = Pipe()
+            process = Process(target=_worker, args=(child, house_file, cache_dir),
+                daemon=True)
+            process.start()
+            child.close()
+            self.workers.append((process, connection))
+        self.sessions = {}              # Session id -> (worker index, seed, SessionBlock)
+        self.next_id = 0
+
+    def __enter__(self) -> 'SessionManager':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.shutdown()
+
+    def _request(self, worker: int, request: tuple) -> object:
+        connection = self.workers[worker][1]
+        connection.send(request)
+        return connection.recv()
+
+    def load(self) -> list[int]:
+        """ Return the number of sessions each worker hosts. """
+        counts = [0] * len(self.workers)
+        for worker, _, _ in self.sessions.values():
+            counts[worker] += 1
+        return counts
+
+    def open(self, worker: Optional[int] = None) -> int:
+        """ Start a session, on the least loaded worker by default, and return its id. """
+        if worker is None:
+            counts = self.load()
+            worker = counts.index(min(counts))
+        sid = self.next_id
+        self.next_id += 1
+        seed = self.seeds.randrange(2 ** 32)
+        block = SessionBlock(self.pots)
+        self._request(worker, ('open', sid, seed, None, block.name))
+        self.sessions[sid] = (worker, seed, block)
+        return sid
+
+    def play(self, sid: int, step: str) -> tuple[str, list[str]]:
+        """ Carry out one line of the server protocol in a session, see server.py. """
+        return self._request(self.sessions[sid][0], ('play', sid, step))
+
+    def play_many(self, steps: list[tuple[int, str]]) -> list[tuple[str, list[str]]]:
+        """ Carry out (session id, line) pairs, every worker working through its
+            own at the same time, and return the replies in the same order.
+        """
+        for sid, step in steps:
+            self.workers[self.sessions[sid][0]][1].send(('play', sid, step))
+        return [self.workers[self.sessions[sid][0]][1].recv() for sid, _ in steps]
+
+    def migrate(self, sid: int, worker: int) -> None:
+        """ Move a session to another worker. """
+        old, seed, block = self.sessions[sid]
+        if old == worker:
+            return
+        snapshot = self._request(old, ('detach', sid))
+        if not isinstance(snapshot, bytes):
+            raise RuntimeError(f"session {sid} could not be detached: {snapshot[1]}")
+        self._request(worker, ('open', sid, seed, snapshot, block.name))
+        self.sessions[sid] = (worker, seed, block)
+
+    def balance(self) -> int:
+        """ Move sessions from the busiest workers to the idlest until they
+            differ by at most one, and return the number moved.
+        """
+        moved = 0
+        counts = self.load()
+        while max(counts) - min(counts) > 1:
+            busiest = counts.index(max(counts))
+            idlest = counts.index(min(counts))
+            sid = next(sid for sid, (worker, _, _) in self.sessions.items()
+                if worker == busiest)
+            self.migrate(sid, idlest)
+            counts[busiest] -= 1
+            counts[idlest] += 1
+            moved += 1
+        return moved
+
+    def close(self, sid: int) -> None:
+        """ End a session and free its block. """
+        worker, _, block = self.sessions.pop(sid)
+        self._request(worker, ('close', sid))
+        block.close(unlink=True)
+
+    def state(self, sid: int) -> BoardState:
+        """ Return the state of a session, read from its block. """
+        return self.sessions[sid][2].read()
+
+    def board(self, sid: int) -> str:
+        """ Return the house of a session drawn as View.draw does, from its block. """
+        state = self.state(sid)
+        all_rooms = []
+        all_plants = []
+        p = 0
+        for room in self.template.get_rooms().values():
+            room_layout = ROOM_LAYOUTS[room.get_name()]
+            all_rooms.append(room_layout.get('layout'))
+            plants = {}
+            for position in room.get_pots():
+                species = state.species[p]
+                if species != NO_PLANT:     # Lower case while young, as View._plant_glyph.
+                    glyph = PLANT_NAMES[species][0]
+                    plants[room_layout.get('positions')[position]] = \
+                        glyph.lower() if state.age[p] < 3 else glyph.upper()
+                p += 1
+            all_plants.append(plants)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.view._draw_house(all_rooms, all_plants)
+        return output.getvalue()
+
+    def shutdown(self) -> None:
+        """ Stop the workers and free every block. """
+        for process, connection in self.workers:
+            connection.send(('stop',))
+        for process, connection in self.workers:
+            process.join()
+            connection.close()
+        for _, _, block in self.sessions.values():
+            block.close(unlink=True)
+        self.sessions = {}
+        self.workers = []
+
+
+def main():
+    """ Entry-point to sharded sessions """
+    parser = argparse.ArgumentParser(description='Play many sessions over worker processes.')
+    parser.add_argument('house', help='house file')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--sessions', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    with SessionManager(args.house, args.workers, args.seed) as manager:
+        sids = [manager.open(worker=0) for _ in range(args.sessions)]
+        print(f"moved {manager.balance()} sessions, load {manager.load()}")
+        start = time.perf_counter()
+        for _ in range(15):
+            manager.play_many([(sid, 'n') for sid in sids])
+        elapsed = time.perf_counter() - start
+        won = sum(manager.state(sid).result == WON for sid in sids)
+        print(f"played {args.sessions} games of 15 days in {elapsed:.3f}s: {won} won")
+        print(manager.board(sids[0]), end='')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,267 @@
+""" Versioned binary snapshots of a whole game.
+
+    A snapshot holds everything needed to resume a game exactly: the rooms and
+    pots, every plant's water, health, age and repellent, the inventory counts,
+    the day, the items waiting to be applied and the state of the random source.
+    Pot data is stored column by column like the compiled house cache, so
+    encoding and decoding are a few bulk array copies per column.
+
+    Layout (little endian, every column aligned to its item size):
+        header      magic, version, flags, day, room count, entry counts,
+                    CRC-32 of everything after the header
+        float64     evaporation, water of every pot
+        int32       lower sun level, upper sun level, health, age of every pot
+        int8        species index of every pot's plant or NO_PLANT
+        uint8       POT_REPELLENT | POT_UNSET flags of every pot
+        uint8       ROOM_LAYOUTS index of every room
+        strings     house file, seed
+        entries     plant then item inventory counts, pending items
+        rng         Mersenne Twister state, if the random source has one
+"""
+import struct
+import zlib
+from array import array
+
+from constants import *
+from house_cache import LAYOUT_NAMES, NO_PLANT
+
+MAGIC = b'GGSS'
+
+VERSION = 2
+
+HEADER = struct.Struct('<4sHHIIIIII')
+
+STRING = struct.Struct('<H')
+
+COUNT = struct.Struct('<i')
+
+PENDING = struct.Struct('<Bc')       # Position and item id; room name is a string.
+
+GAUSS = struct.Struct('<d')
+
+ARRAY_ENGINE = 1                     # Flags
+SEED_INT = 2
+SEED_STR = 4
+RNG_STATE = 8
+GAUSS_NEXT = 16
+
+RNG_WORDS = 625                      # Mersenne Twister state words plus index.
+
+POT_REPELLENT = 1                    # Pot flags
+POT_UNSET = 2                        # Never given a sun range or evaporation.
+
+ITEM_IDS = (WATER, FERTILISER, POSSUM_REPELLENT)
+
+
+class Snapshot:
+    """ A decoded snapshot: plain columns and values, no game objects. """
+
+    def __init__(self) -> None:
+        self.days = 1
+        self.engine = 'object'
+        self.house_file = ''
+        self.seed = None
+        self.layouts = []
+        self.evaporation = []
+        self.water = []
+        self.sun_lower = []
+        self.sun_upper = []
+        self.health = []
+        self.age = []
+        self.species = []
+        self.pot_flags = []
+        self.plants = {}
+        self.items = {}
+        self.pending = []               # (room name, position, item id)
+        self.rng_state = None           # As returned by random.Random.getstate.
+
+    def room_names(self) -> list[str]:
+        """ Return the ROOM_LAYOUTS name of every room, in house order. """
+        return [LAYOUT_NAMES[index] for index in self.layouts]
+
+    def room_keys(self) -> list[str]:
+        """ Return the short name of every room, e.g. 'Bal1', in house order. """
+        keys = []
+        room_count = {}
+        for name in self.room_names():
+            room_count[name] = room_count.get(name, 0) + 1
+            keys.append(name[:3] + str(room_count[name]))
+        return keys
+
+
+def _pack_string(text: str) -> bytes:
+    encoded = text.encode()
+    return STRING.pack(len(encoded)) + encoded
+
+
+def _unpack_string(view: memoryview, offset: int) -> tuple[str, int]:
+    (length,) = STRING.unpack_from(view, offset)
+    offset += STRING.size
+    return bytes(view[offset:offset + length]).decode(), offset + length
+
+
+def encode_snapshot(model: 'Model', applied_items: list[tuple[str, int, 'Item']]) -> bytes:
+    """ Return the snapshot of a game.
+
+    Parameters:
+        model: the game
+        applied_items: items waiting for the next day, as kept by GardenSim
+    """
+    evaporation = array('d')
+    water = array('d')
+    sun_lower = array('i')
+    sun_upper = array('i')
+    health = array('i')
+    age = array('i')
+    species = array('b')
+    pot_flags = array('B')
+    layouts = array('B')
+    for room in model.get_all_rooms():
+        layouts.append(LAYOUT_NAMES.index(room.get_name()))
+        for position in range(4):
+            pot = room.get_pot(position)
+            plant = pot.look_at_plant()
+            if pot.get_sun_range() is None:
+                evaporation.append(0.0)
+                sun_lower.append(0)
+                sun_upper.append(0)
+                pot_flag = POT_UNSET
+            else:
+                pot_flag = 0
+                evaporation.append(pot.get_evaporation())
+                sun_lower.append(pot.get_sun_range()[0])
+                sun_upper.append(pot.get_sun_range()[1])
+            if plant is None:
+                species.append(NO_PLANT)
+                water.append(0.0)
+                health.append(0)
+                age.append(0)
+            else:
+                species.append(plant.species.index)
+                water.append(plant.get_water())
+                health.append(plant.get_health())
+                age.append(plant.get_age())
+                if plant.has_repellent():
+                    pot_flag |= POT_REPELLENT
+            pot_flags.append(pot_flag)
+
+    flags = 0
+    if model.engine is not None:
+        flags |= ARRAY_ENGINE
+    seed = ''
+    if isinstance(model.seed, int):
+        flags |= SEED_INT
+        seed = str(model.seed)
+    elif isinstance(model.seed, str):
+        flags |= SEED_STR
+        seed = model.seed
+    rng_state = b''
+    getstate = getattr(model.rng, 'getstate', None)
+    if getstate is not None:
+        flags |= RNG_STATE
+        _, words, gauss_next = getstate()
+        rng_state = array('I', words).tobytes()
+        if gauss_next is not None:
+            flags |= GAUSS_NEXT
+            rng_state += GAUSS.pack(gauss_next)
+
+    inventory = model.get_inventory()
+    plants = inventory.get_counts('Plant')
+    items = inventory.get_counts('Item')
+    parts = [evaporation.tobytes(), water.tobytes(), sun_lower.tobytes(),
+        sun_upper.tobytes(), health.tobytes(), age.tobytes(), species.tobytes(),
+        pot_flags.tobytes(), layouts.tobytes(),
+        _pack_string(model.house_file), _pack_string(seed)]
+    for counts in (plants, items):
+        for name, count in counts.items():
+            parts.append(_pack_string(name) + COUNT.pack(count))
+    for room_name, position, item in applied_items:
+        parts.append(_pack_string(room_name) + PENDING.pack(position, item.get_id().encode()))
+    parts.append(rng_state)
+    body = b''.join(parts)
+    return HEADER.pack(MAGIC, VERSION, flags, model.get_days_past(), len(layouts),
+        len(plants), len(items), len(applied_items), zlib.crc32(body)) + body
+
+
+def decode_snapshot(data: bytes) -> Snapshot:
+    """ Decode a snapshot.
+
+    Raises:
+        ValueError if the data is not a snapshot of this version, is damaged or
+            names a room layout, plant, item or room that does not exist.
+    """
+    try:
+        return _decode(memoryview(data))
+    except (struct.error, IndexError, UnicodeDecodeError, TypeError) as error:
+        raise ValueError(f"damaged snapshot: {error}")
+
+
+def _decode(view: memoryview) -> Snapshot:
+    magic, version, flags, days, rooms, plant_kinds, item_kinds, pending, crc = \
+        HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise ValueError("not a game snapshot")
+    if version != VERSION:
+        raise ValueError(f"unsupported snapshot version {version}")
+    if zlib.crc32(view[HEADER.size:]) != crc:
+        raise ValueError("damaged snapshot: checksum mismatch")
+    snapshot = Snapshot()
+    snapshot.days = days
+    snapshot.engine = 'array' if flags & ARRAY_ENGINE else 'object'
+    pots = rooms * 4
+    offset = HEADER.size
+    columns = []
+    for code, size, count in (('d', 8, pots), ('d', 8, pots), ('i', 4, pots),
+            ('i', 4, pots), ('i', 4, pots), ('i', 4, pots), ('b', 1, pots),
+            ('B', 1, pots), ('B', 1, rooms)):
+        if offset + size * count > len(view):
+            raise ValueError("truncated snapshot")
+        columns.append(view[offset:offset + size * count].cast(code).tolist())
+        offset += size * count
+    snapshot.evaporation, snapshot.water, snapshot.sun_lower, snapshot.sun_upper, \
+        snapshot.health, snapshot.age, snapshot.species, snapshot.pot_flags, \
+        snapshot.layouts = columns
+    if any(layout >= len(LAYOUT_NAMES) for layout in snapshot.layouts):
+        raise ValueError("damaged snapshot: unknown room layout")
+    if any(species != NO_PLANT and not 0 <= species < len(PLANT_NAMES)
+            for species in snapshot.species):
+        raise ValueError("damaged snapshot: unknown plant")
+    if any(flag & ~(POT_REPELLENT | POT_UNSET) for flag in snapshot.pot_flags):
+        raise ValueError("damaged snapshot: unknown pot flags")
+
+    snapshot.house_file, offset = _unpack_string(view, offset)
+    seed, offset = _unpack_string(view, offset)
+    if flags & SEED_INT:
+        snapshot.seed = int(seed)
+    elif flags & SEED_STR:
+        snapshot.seed = seed
+    for counts, kinds in ((snapshot.plants, plant_kinds), (snapshot.items, item_kinds)):
+        for _ in range(kinds):
+            name, offset = _unpack_string(view, offset)
+            (counts[name],) = COUNT.unpack_from(view, offset)
+            offset += COUNT.size
+    if any(name not in PLANTS_DATA for name in snapshot.plants) or \
+            any(name not in ITEM_IDS for name in snapshot.items):
+        raise ValueError("damaged snapshot: unknown inventory entry")
+    room_names = set(snapshot.room_keys())
+    for _ in range(pending):
+        room_name, offset = _unpack_string(view, offset)
+        position, item_id = PENDING.unpack_from(view, offset)
+        offset += PENDING.size
+        item_id = item_id.decode()
+        if room_name not in room_names or position > 3 or item_id not in ITEM_IDS:
+            raise ValueError("damaged snapshot: unknown pending item")
+        snapshot.pending.append((room_name, position, item_id))
+    if flags & RNG_STATE:
+        words = view[offset:offset + 4 * RNG_WORDS]
+        if len(words) != 4 * RNG_WORDS:
+            raise ValueError("truncated snapshot")
+        offset += 4 * RNG_WORDS
+        gauss_next = None
+        if flags & GAUSS_NEXT:
+            (gauss_next,) = GAUSS.unpack_from(view, offset)
+            offset += GAUSS.size
+        snapshot.rng_state = (3, tuple(words.cast('I')), gauss_next)
+    if offset != len(view):
+        raise ValueError("damaged snapshot: unexpected trailing data")
+    return snapshot
@@ -0,0 +1,305 @@
+""" Search-based strategy solver: finds a plan of moves that keeps as many plants
+    alive on day 15 as possible.
+
+    Usage:
+        python solver.py house1.txt --beam 64 --moves 2 --verify 200
+
+    The search never touches Model while it runs. It reads the house once into
+    a compact state, a tuple with one (species, water, health, repellent,
+    attacks) entry or None per usable pot, and advances that state with a
+    few arithmetic operations per plant. Watering is free, so every plant is
+    watered just enough each day and never goes thirsty; the search only
+    chooses swaps, planting from the inventory and fertiliser or repellent
+    from the inventory. Plants and items that do not exist in the inventory
+    are never conjured.
+
+    Animal attacks are the only chance in the game and a plan does not react
+    to them, so a plant's health is its health without attacks less the
+    damage of each attack. attacks holds the chance that the plant is still alive after each
+    number of attacks so far, which makes the expected number of survivors
+    of a plan exact (up to a fertiliser reviving a plant at exactly 0 health).
+"""
+import argparse
+import heapq
+import sys
+from math import comb
+from typing import NamedTuple, Optional
+
+from a2 import *
+
+GAME_DAYS = 15
+
+ATTACK_CHANCE = sum(face > 70 for face in DICE_FACES) / len(DICE_FACES)
+
+UNHARMED = (1.0,)                   # Alive for sure, never attacked.
+
+GAIN = 1e-12                        # Smallest score change worth a move.
+
+
+class Plan(NamedTuple):
+    """ The best plan found by Solver.solve. """
+    days: list[list[str]]           # Commands of each day, every day ending with 'n'.
+    expected: float                 # Expected plants alive on day 15.
+    states: int                     # Search states evaluated.
+
+    def commands(self) -> list[str]:
+        """ Return the plan as one command list, e.g. for GardenSim.play_script. """
+        return [step for day in self.days for step in day]
+
+
+def survival_table(days: int, chance: float) -> list[list[float]]:
+    """ Return table[n][k], the chance of at most k attacks in n exposed days. """
+    table = []
+    for n in range(days + 1):
+        total = 0.0
+        row = []
+        for k in range(n + 1):
+            total += comb(n, k) * chance ** k * (1 - chance) ** (n - k)
+            row.append(total)
+        table.append(row)
+    return table
+
+
+class Solver:
+    """ Beam search over compact game states, one day at a time. """
+
+    def __init__(self, house_file: str, beam_width: int = 64, moves_per_day: int = 1,
+            targets: int = 12, cache_dir: Optional[str] = None) -> None:
+        """ Read the house and inventory into the compact state.
+
+        Parameters:
+            house_file: path to the house file
+            beam_width: states kept after every move and every day
+            moves_per_day: swaps, plantings and items tried before each 'n'
+            targets: pots a plant of each species may be swapped or planted
+                into, the ones with the right sun levels and indoors first
+            cache_dir: directory of compiled house images, see load_house
+        """
+        model = Model(house_file, events=NullSink(), cache_dir=cache_dir)
+        self.beam_width = beam_width
+        self.moves_per_day = moves_per_day
+        self.slots = []                 # (room name, position) of each usable pot.
+        self.loss = []                  # Water lost per day before drinking.
+        self.outdoor = []
+        sun_ranges = []
+        plants = []
+        for name, room in model.get_rooms().items():
+            for position, pot in room.get_pots().items():
+                if pot.get_sun_range() is None:     # Unset pots cannot hold plants.
+                    continue
+                self.slots.append((name, position))
+                self.loss.append(pot.get_evaporation())
+                self.outdoor.append(room.room_type == 'OutDoor')
+                sun_ranges.append(pot.get_sun_range())
+                plant = pot.look_at_plant()
+                plants.append(None if plant is None else (plant.species.index,
+                    plant.water, plant.health, plant.repellent, UNHARMED))
+        self.mismatch = [[lower > species.sun_levels[1] or upper < species.sun_levels[0]
+            for species in SPECIES.values()] for lower, upper in sun_ranges]
+        self.drink = [species.drink_rate for species in SPECIES.values()]
+        self.targets = [sorted(range(len(self.slots)),
+            key=lambda slot: (self.mismatch[slot][species], self.outdoor[slot]))[:targets]
+            for species in range(len(SPECIES))]
+        counts = model.get_inventory().get_counts('Plant')
+        items = model.get_inventory().get_counts('Item')
+        self.start = (tuple(plants), tuple(counts.get(name, 0) for name in PLANT_NAMES),
+            items.get(FERTILISER, 0), items.get(POSSUM_REPELLENT, 0))
+        self.table = survival_table(GAME_DAYS, ATTACK_CHANCE)
+        self.states = 0
+
+    def survival(self, slot: int, plant: Optional[tuple], day: int) -> float:
+        """ Return the chance that a plant left in a pot from day on is alive on
+            day 15.
+        """
+        if plant is None:
+            return 0.0
+        species, _, health, repellent, attacks = plant
+        remaining = GAME_DAYS - day
+        health -= self.mismatch[slot][species] * remaining
+        if health <= 0:
+            return 0.0
+        if not self.outdoor[slot] or repellent:
+            return sum(attacks)
+        # Health only falls from here on, so surviving to the end is enough.
+        table = self.table[remaining]
+        most = (health - 1) // ANIMAL_ATTACK_DAMAGE
+        return sum(alive * table[min(remaining, most - count)]
+            for count, alive in enumerate(attacks) if count <= most)
+
+    def score(self, plants: tuple, day: int) -> float:
+        """ Return the expected survivors if no plant is moved from day on. """
+        return sum(self.survival(slot, plant, day) for slot, plant in enumerate(plants))
+
+    def moves(self, state: tuple, day: int, items_only: bool) -> list[tuple]:
+        """ Return (score change, state, command, items_only) for every single
+            move from a state that raises its score. Items are applied to a
+            position when the day ends, so once one is chosen no more plants
+            are moved that day.
+        """
+        plants, stock, fertiliser, repellent = state
+        survival = [self.survival(slot, plant, day) for slot, plant in enumerate(plants)]
+        result = []
+        evaluated = 0
+        for species, count in enumerate(stock):
+            if not count or items_only:
+                continue
+            new = (species, 10.0, 10, False, UNHARMED)
+            evaluated += len(self.targets[species])
+            for i in self.targets[species]:
+                gain = self.survival(i, new, day)
+                if plants[i] is None and gain > GAIN:
+                    room_name, position = self.slots[i]
+                    changed = list(plants)
+                    changed[i] = new
+                    left = stock[:species] + (count - 1,) + stock[species + 1:]
+                    result.append((gain, (tuple(changed), left, fertiliser, repellent),
+                        f'p {PLANT_NAMES[species]} {room_name} {position}', False))
+        for i, plant in enumerate(plants):
+            if plant is None:
+                continue
+            room_name, position = self.slots[i]
+            species, water, health, has_repellent, attacks = plant
+            evaluated += 2 + (0 if items_only else len(self.targets[species]))
+            if fertiliser:
+                new = (species, water, health + 1, has_repellent, attacks)
+                gain = self.survival(i, new, day) - survival[i]
+                if gain > GAIN:
+                    changed = list(plants)
+                    changed[i] = new
+                    result.append((gain, (tuple(changed), stock, fertiliser - 1, repellent),
+                        f'a {room_name} {position} {FERTILISER}', True))
+            if repellent and not has_repellent and self.outdoor[i]:
+                new = (species, water, health, True, attacks)
+                gain = self.survival(i, new, day) - survival[i]
+                if gain > GAIN:
+                    changed = list(plants)
+                    changed[i] = new
+                    result.append((gain, (tuple(changed), stock, fertiliser, repellent - 1),
+                        f'a {room_name} {position} {POSSUM_REPELLENT}', True))
+            if items_only:
+                continue
+            for j in self.targets[species]:
+                if j == i:
+                    continue
+                gain = self.survival(i, plants[j], day) + self.survival(j, plant, day) \
+                    - survival[i] - survival[j]
+                if gain > GAIN:
+                    changed = list(plants)
+                    changed[i], changed[j] = plants[j], plant
+                    other_room, other_position = self.slots[j]
+                    result.append((gain, (tuple(changed), stock, fertiliser, repellent),
+                        f's {room_name} {position} {other_room} {other_position}', False))
+        self.states += evaluated
+        return result
+
+    def advance(self, state: tuple, day: int) -> tuple[tuple, list[str]]:
+        """ Water every plant just enough, progress it by one day and restock
+            items. Returns the next state and the watering commands.
+        """
+        plants, stock, fertiliser, repellent = state
+        waterings = []
+        progressed = []
+        for slot, plant in enumerate(plants):
+            if plant is None:
+                progressed.append(None)
+                continue
+            species, water, health, has_repellent, attacks = plant
+            need = self.loss[slot] + self.drink[species]
+            room_name, position = self.slots[slot]
+            while water - need < 0:
+                water = water + 1
+                waterings.append(f'w {room_name} {position}')
+            water -= need
+            health -= self.mismatch[slot][species]
+            if health <= 0:
+                progressed.append(None)                 # Removed as in Room.progress_plant.
+                continue
+            if self.outdoor[slot] and not has_repellent:
+                attacks = tuple(alive * (1 - ATTACK_CHANCE) + before * ATTACK_CHANCE
+                    for alive, before in zip(attacks + (0.0,), (0.0,) + attacks))
+            # Paths with too many attacks for the health left are dead.
+            attacks = tuple(alive if health - ANIMAL_ATTACK_DAMAGE * count > 0 else 0.0
+                for count, alive in enumerate(attacks))
+            progressed.append((species, water, health, has_repellent, attacks))
+        if day % 3 == 0:
+            fertiliser += 1
+            repellent += 1
+        return (tuple(progressed), stock, fertiliser, repellent), waterings
+
+    def solve(self) -> Plan:
+        """ Search for the plan with the most expected survivors on day 15. """
+        self.states = 0
+        beam = [(self.score(self.start[0], 1), self.start, None)]   # (score, state, plan node)
+        for day in range(1, GAME_DAYS):
+            candidates = {state: (score, state, node, False, ())
+                for score, state, node in beam}
+            frontier = list(candidates.values())
+            for _ in range(self.moves_per_day):
+                expanded = []
+                for score, state, node, items_only, steps in frontier:
+                    for gain, moved, command, items in self.moves(state, day, items_only):
+                        if moved not in candidates:
+                            entry = (score + gain, moved, node, items, steps + (command,))
+                            candidates[moved] = entry
+                            expanded.append(entry)
+                frontier = heapq.nlargest(self.beam_width, expanded, key=lambda e: e[0])
+            kept = heapq.nlargest(self.beam_width, candidates.values(), key=lambda e: e[0])
+            beam = []
+            for _, state, node, _, steps in kept:
+                state, waterings = self.advance(state, day)
+                beam.append((self.score(state[0], day + 1), state,
+                    (node, list(steps) + waterings + ['n'])))
+        score, _, node = max(beam, key=lambda entry: entry[0])
+        days = []
+        while node is not None:
+            node, commands = node
+            days.append(commands)
+        days.reverse()
+        return Plan(days, score, self.states)
+
+
+def verify(house_file: str, plan: Plan, seeds: range, engine: str = 'object',
+        cache_dir: Optional[str] = None) -> list[int]:
+    """ Play a plan once per seed and return the plants alive on day 15 of each
+        game; their mean should be close to plan.expected.
+    """
+    alive = []
+    for seed in seeds:
+        model = Model(house_file, engine, seed, events=NullSink(), cache_dir=cache_dir)
+        applied_items = []
+        for step in plan.commands():
+            run_command(model, step, applied_items)
+        alive.append(model.get_number_of_plants_alive())
+    return alive
+
+
+def main():
+    """ Entry-point to the solver """
+    parser = argparse.ArgumentParser(description='Search for a plan keeping plants alive.')
+    parser.add_argument('house', help='house file')
+    parser.add_argument('--beam', type=int, default=64, help='beam width')
+    parser.add_argument('--moves', type=int, default=1, help='moves tried per day')
+    parser.add_argument('--targets', type=int, default=12,
+        help='pots tried for each species')
+    parser.add_argument('--verify', type=int, default=0,
+        help='number of seeded games to play the plan in')
+    parser.add_argument('--out', default=None, help='write the plan as a script')
+    args = parser.parse_args()
+
+    solver = Solver(args.house, args.beam, args.moves, args.targets)
+    plan = solver.solve()
+    if args.out is None:
+        print('\n'.join(plan.commands()))
+    else:
+        with open(args.out, 'w') as file:
+            file.write('\n'.join(plan.commands()) + '\n')
+    print(f"expected alive on day {GAME_DAYS}: {plan.expected:.3f} "
+        f"({plan.states} states evaluated)", file=sys.stderr)
+    if args.verify:
+        alive = verify(args.house, plan, range(args.verify))
+        print(f"played {len(alive)} games: {sum(alive) / len(alive):.3f} alive on average",
+            file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,24 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, ROOT)
+
+
+def game_state(model):
+    """ Everything a game's outcome depends on, read through the public getters. """
+    state = [model.get_days_past(), model.counter.planted, model.counter.dead,
+        model.get_inventory().get_counts('Plant'), model.get_inventory().get_counts('Item')]
+    for name, room in model.get_rooms().items():
+        for position, plant in room.get_plants().items():
+            state.append((name, position, None if plant is None else (plant.get_name(),
+                round(plant.get_water(), 9), plant.get_health(), plant.get_age(),
+                plant.has_repellent())))
+    return state
+
+
+def drain_changes(model):
+    """ Drain the model's change log as (room name, position) pairs. """
+    names = {id(room): name for name, room in model.get_rooms().items()}
+    return {(names[id(room)], position) for room, position in model.changes.drain()}
@@ -0,0 +1,68 @@
+import os
+import random
+
+import pytest
+
+from conftest import ROOT, drain_changes, game_state
+from a2 import *
+
+HOUSES = ['house1.txt', 'house2.txt', 'indoors.txt', 'outdoors.txt', 'winnable.txt']
+
+
+def _setup(rng, rooms):
+    """ Watering, planting and items to give the plants different fates. """
+    commands = []
+    for _ in range(12):
+        where = f'{rng.choice(rooms)} {rng.randrange(4)}'
+        commands.append(rng.choice([f'w {where}', f'w {where}', f'a {where} F',
+            f'a {where} R', f'p {rng.choice(PLANT_NAMES)} {where}']))
+    return commands + ['n']
+
+
+@pytest.mark.parametrize('engine', ['object', 'array'])
+@pytest.mark.parametrize('house', HOUSES)
+@pytest.mark.parametrize('seed', range(4))
+def test_advance_matches_next(engine, house, seed):
+    if engine == 'array':
+        pytest.importorskip('numpy')
+    path = os.path.join(ROOT, house)
+    stepped = Model(path, rng=seed, events=ColumnarLog(), check_counts=True)
+    advanced = Model(path, engine, seed, events=NullSink(), check_counts=True)
+    rng = random.Random(seed)
+    for days in (1, 2, 5, 13, 40):
+        applied_items = ([], [])
+        for step in _setup(rng, list(stepped.get_rooms())):
+            for model, items in zip((stepped, advanced), applied_items):
+                run_command(model, step, items)
+        for _ in range(days):
+            stepped.next([])
+        advanced.advance(days)
+        assert game_state(advanced) == game_state(stepped)
+        assert advanced.rng.getstate() == stepped.rng.getstate()
+        assert drain_changes(advanced) == drain_changes(stepped)
+
+
+def test_advance_covers_items_and_attacks():
+    """ The seeded outdoors games above see fertiliser, repellent, attacks
+        blocked by it and fatal attacks.
+    """
+    path = os.path.join(ROOT, 'outdoors.txt')
+    kinds = set()
+    fertilised = repelled = 0
+    for seed in range(4):
+        model = Model(path, rng=seed, events=ColumnarLog())
+        rng = random.Random(seed)
+        for days in (1, 2, 5, 13, 40):
+            applied_items = []
+            for step in _setup(rng, list(model.get_rooms())):
+                name, _ = run_command(model, step, applied_items)
+                if name == 'a' and applied_items:
+                    room_name, position, item = applied_items[-1]
+                    if model.get_rooms()[room_name].get_pot(position).look_at_plant():
+                        fertilised += item.get_id() == 'F'
+                        repelled += item.get_id() == 'R'
+            for _ in range(days):
+                model.next([])
+        kinds.update(model.events.kinds)
+    assert fertilised and repelled
+    assert {'attack', 'blocked', 'died'} <= kinds
@@ -0,0 +1,44 @@
+import csv
+import io
+import os
+
+from conftest import ROOT
+from batch import FIELDS, run_batch, write_rows
+
+HOUSE = os.path.join(ROOT, 'house1.txt')
+
+
+def test_bad_script_only_fails_its_own_game(tmp_path):
+    good = tmp_path / 'good.txt'
+    good.write_text('n\nn\n')
+    bad = tmp_path / 'bad.txt'
+    bad.write_text('n\nw Bal1 9\n')
+    rows = run_batch([(HOUSE, str(good)), (HOUSE, str(bad)), (HOUSE, None)], workers=2)
+    assert [row['script'] for row in rows] == [str(good), str(bad), '']
+    assert 'error' not in rows[0] and 'error' not in rows[2]
+    assert rows[0]['days'] == rows[2]['days'] == 15
+    assert 'w Bal1 9' in rows[1]['error']
+    assert 'alive' not in rows[1]
+
+
+def test_missing_house_gets_an_error_row(tmp_path):
+    rows = run_batch([(str(tmp_path / 'nowhere.txt'), None), (HOUSE, None)], workers=1)
+    assert rows[0]['error'] and 'error' not in rows[1]
+
+
+def test_error_column_is_written(tmp_path):
+    bad = tmp_path / 'bad.txt'
+    bad.write_text('zz\n')
+    output = io.StringIO()
+    write_rows(run_batch([(HOUSE, str(bad)), (HOUSE, None)], workers=1), output)
+    rows = list(csv.DictReader(io.StringIO(output.getvalue())))
+    assert list(rows[0]) == FIELDS
+    assert rows[0]['error'] and rows[0]['alive'] == ''
+    assert rows[1]['error'] == '' and rows[1]['days'] == '15'
+
+
+def test_missing_script_gets_an_error_row(tmp_path):
+    missing = str(tmp_path / 'nosuch.txt')
+    rows = run_batch([(HOUSE, missing), (HOUSE, None)], workers=1)
+    assert rows[0]['script'] == missing and 'nosuch.txt' in rows[0]['error']
+    assert 'error' not in rows[1] and rows[1]['days'] == 15
@@ -0,0 +1,78 @@
+import os
+
+import pytest
+
+from conftest import ROOT
+from a2 import *
+
+HOUSE = os.path.join(ROOT, 'house1.txt')
+
+
+@pytest.fixture
+def model():
+    return Model(HOUSE, rng=0, events=NullSink())
+
+
+@pytest.mark.parametrize('step, parsed', [
+    ('ls', ('ls', [])),
+    ('ls Bal1 3', ('ls', ['Bal1', 3])),
+    ('m Bal1 0 Bed1 0', ('m', ['Bal1', 0, 'Bed1', 0])),
+    ('p Cereus Bal1 2', ('p', ['Cereus', 'Bal1', 2])),
+    ('w Bed1 1', ('w', ['Bed1', 1])),
+    ('a Bal1 0 F', ('a', ['Bal1', 0, FERTILISER])),
+    ('a Bal1 0 R', ('a', ['Bal1', 0, POSSUM_REPELLENT])),
+    ('s Bal1 1 Bed1 2', ('s', ['Bal1', 1, 'Bed1', 2])),
+    ('rm Bed1 3', ('rm', ['Bed1', 3])),
+    ('n', ('n', [])),
+    ('  w   Bed1  1 ', ('w', ['Bed1', 1])),
+])
+def test_parse_command_reads_every_form(model, step, parsed):
+    assert parse_command(tokenize(step), model) == parsed
+
+
+@pytest.mark.parametrize('step', [
+    '', 'x', 'quit', 'save', 'LS',
+    'ls Bal1', 'ls Bal1 0 1', 'ls Kit1 0', 'ls Bal1 4', 'ls Bal1 -1', 'ls Bal1 a',
+    'm Bal1 0 Bed1', 'm Bal1 0 Kit1 0', 'm Bal1 0 Bed1 01',
+    'p Rose Bal1 2', 'p Bal1 2', 'p cereus Bal1 2',
+    'w', 'w Bal1', 'w bal1 0', 'w Bal1 0 0',
+    'a Bal1 0', 'a Bal1 0 W', 'a Bal1 0 f', 'a Bal1 0 F R',
+    's Bal1 1 Bed1', 's Bal1 1 Bed1 9',
+    'rm', 'rm Bal1 1.0',
+    'n 1', 'n n',
+])
+def test_parse_command_rejects_bad_arguments(model, step):
+    with pytest.raises(ValueError) as error:
+        parse_command(tokenize(step), model)
+    assert str(error.value) == INVALID_MOVE + ' '.join(tokenize(step))
+
+
+def test_every_command_has_a_form_and_a_handler():
+    for name, (forms, handler) in COMMANDS.items():
+        assert forms and callable(handler)
+        for kinds in forms:
+            assert set(kinds) <= {'room', 'position', 'plant', 'item'}
+
+
+def test_run_command_applies_the_handler(model):
+    applied_items = []
+    assert run_command(model, 'ls', applied_items) == ('ls', None)
+    name, plant = run_command(model, 'ls Bal1 0', applied_items)
+    assert name == 'ls' and plant.get_name() == 'Rebutia'
+    name, plant = run_command(model, 'rm Bal1 1', applied_items)
+    assert name == 'rm' and plant.get_name() == 'KingOyster'
+    assert model.get_rooms()['Bal1'].get_pot(1).look_at_plant() is None
+    run_command(model, 'm Bal1 0 Bal1 1', applied_items)
+    assert model.get_rooms()['Bal1'].get_pot(1).look_at_plant().get_name() == 'Rebutia'
+    run_command(model, 'p Cereus Bal1 0', applied_items)
+    assert model.get_rooms()['Bal1'].get_pot(0).look_at_plant().get_name() == 'Cereus'
+    assert 'Cereus' not in model.get_inventory().get_counts('Plant')
+    run_command(model, 'a Bal1 1 R', applied_items)
+    assert [(room, position, item.get_id()) for room, position, item in applied_items] \
+        == [('Bal1', 1, POSSUM_REPELLENT)]
+    assert run_command(model, 'n', applied_items) == ('n', None)
+    assert applied_items == [] and model.get_days_past() == 2
+    assert model.get_rooms()['Bal1'].get_pot(1).look_at_plant().has_repellent()
+    with pytest.raises(ValueError, match=INVALID_MOVE + 'w Kit1 0'):
+        run_command(model, 'w Kit1 0', applied_items)
+    assert model.get_days_past() == 2
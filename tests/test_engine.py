@@ -0,0 +1,114 @@
+import os
+import random
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from conftest import ROOT, game_state
+from a2 import *
+
+HOUSES = ['house1.txt', 'house2.txt', 'indoors.txt', 'outdoors.txt', 'winnable.txt']
+
+
+def _commands(model, rng, count):
+    """ Random play commands for the house of a model, days included. """
+    rooms = list(model.get_rooms())
+    plants = list(PLANT_NAMES)
+    commands = []
+    for _ in range(count):
+        where = f'{rng.choice(rooms)} {rng.randrange(4)}'
+        other = f'{rng.choice(rooms)} {rng.randrange(4)}'
+        commands.append(rng.choice([
+            'n', 'n', 'n', f'w {where}', f'rm {where}', f'm {where} {other}',
+            f's {where} {other}', f'p {rng.choice(plants)} {where}',
+            f'a {where} F', f'a {where} R']))
+    return commands
+
+
+def _play(model, commands):
+    applied_items = []
+    for step in commands:
+        name, _ = run_command(model, step, applied_items)
+        if name == 'n':
+            applied_items = []
+
+
+@pytest.mark.parametrize('house', HOUSES)
+@pytest.mark.parametrize('seed', range(4))
+def test_array_engine_matches_object_engine(house, seed):
+    path = os.path.join(ROOT, house)
+    games = [Model(path, engine, seed, events=ColumnarLog())
+        for engine in ('object', 'array')]
+    commands = _commands(games[0], random.Random(seed), 120)
+    for start in range(0, len(commands), 10):
+        for game in games:
+            _play(game, commands[start:start + 10])
+        assert game_state(games[1]) == game_state(games[0])
+        assert games[1].rng.getstate() == games[0].rng.getstate()
+    assert games[1].events.columns() == games[0].events.columns()
+
+
+def test_array_engine_keeps_forks_apart():
+    path = os.path.join(ROOT, 'house2.txt')
+    games = [Model(path, engine, 1, events=NullSink()) for engine in ('object', 'array')]
+    for game in games:
+        _play(game, ['w Bal1 0', 'n', 'n'])
+    forks = [game.fork(5) for game in games]
+    for game, fork in zip(games, forks):
+        _play(game, ['n', 'w Bal1 1', 'n'])
+        game.advance(3)
+        _play(fork, ['rm Bal1 0', 'n'])
+    assert game_state(games[1]) == game_state(games[0])
+    assert game_state(forks[1]) == game_state(forks[0])
+
+
+def test_array_engine_does_not_touch_plants_between_reads():
+    model = Model(os.path.join(ROOT, 'indoors.txt'), 'array', 0, events=NullSink())
+    for name in model.get_rooms():
+        _play(model, [f'p {PLANT_NAMES[0]} {name} 0', f'w {name} 0'])
+    plants = [plant for room in model.get_all_rooms()
+        for plant in room.get_plants().values() if plant is not None]
+    water = [plant.water for plant in plants]
+    for _ in range(2):
+        model.next([])
+    assert [plant.water for plant in plants] == water
+    model.get_all_rooms()
+    assert plants and all(plant.water < before for plant, before in zip(plants, water))
+
+
+SHORT_ROWS = """Room - Balcony 1
+8.10_1.2_Rebutia,7.8_1.2_None
+
+Room - Bedroom 1
+4.7_0.6_SnakePlant
+
+Plants - Rebutia 1,Cereus 1,Disocactus 1,BridgesiiMonstrose 0,SnakePlant 0,PeaceLily 0,JadePlant 0,Monstera 0,FiddleLeafFig 0,Enoki 0,KingOyster 0,LionsManeMushroom 0
+
+Items - F 2,R 1
+"""
+
+
+@pytest.mark.parametrize('cached', [False, True])
+def test_array_engine_accepts_pots_without_sun_range(cached, tmp_path):
+    house = tmp_path / 'short.txt'
+    house.write_text(SHORT_ROWS)
+    cache_dir = str(tmp_path / 'cache') if cached else None
+    games = [Model(str(house), engine, 3, events=ColumnarLog(), cache_dir=cache_dir)
+        for engine in ('object', 'array')]
+    for game in games:
+        assert game.get_rooms()['Bed1'].get_pot(2).get_sun_range() is None
+        _play(game, ['p Cereus Bal1 1', 'w Bal1 0', 'n', 'n', 'w Bed1 0', 'n'])
+        game.add_room(Room('Bedroom'))
+        _play(game, ['s Bal1 1 Bal1 0', 'n', 'n'])
+    assert game_state(games[1]) == game_state(games[0])
+    assert games[1].events.columns() == games[0].events.columns()
+
+
+def test_array_engine_adds_an_empty_room():
+    path = os.path.join(ROOT, 'house1.txt')
+    games = [Model(path, engine, 0, events=NullSink()) for engine in ('object', 'array')]
+    for game in games:
+        assert game.add_room(Room('Bedroom')) == 'Bed2'
+        _play(game, ['n', 'n'])
+    assert game_state(games[1]) == game_state(games[0])
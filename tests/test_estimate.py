@@ -0,0 +1,47 @@
+import os
+import sys
+
+import pytest
+
+from conftest import ROOT
+import estimate
+
+HOUSE = os.path.join(ROOT, 'house1.txt')
+
+
+@pytest.mark.parametrize('settings', [{'games': 0}, {'games': -3}, {'round_size': 0},
+    {'precision': 0}, {'precision': -0.1}, {'confidence': 1}])
+def test_estimate_rejects_bad_settings(settings):
+    with pytest.raises(ValueError):
+        estimate.estimate(HOUSE, workers=1, **settings)
+
+
+@pytest.mark.parametrize('option', [['--games', '0'], ['--round', '0'],
+    ['--precision', '0']])
+def test_main_rejects_bad_settings(option, monkeypatch, capsys):
+    monkeypatch.setattr(sys, 'argv', ['estimate.py', HOUSE, *option])
+    with pytest.raises(SystemExit) as error:
+        estimate.main()
+    assert error.value.code == 2
+    assert option[0] in capsys.readouterr().err
+
+
+def test_estimate_plays_a_single_game():
+    summary = estimate.estimate(HOUSE, games=1, workers=1)
+    assert summary['games'] == 1
+    assert summary['wins'] in (0, 1)
+
+
+def test_estimate_names_the_bad_command_before_playing(tmp_path):
+    with pytest.raises(ValueError, match='w Bal1 9'):
+        estimate.estimate(HOUSE, ['n', 'w Bal1 9'], games=10, workers=1)
+
+
+def test_main_names_the_script_of_a_bad_command(tmp_path, monkeypatch, capsys):
+    script = tmp_path / 'moves.txt'
+    script.write_text('n\nw Bal1 9\n')
+    monkeypatch.setattr(sys, 'argv', ['estimate.py', HOUSE, '--script', str(script)])
+    with pytest.raises(SystemExit):
+        estimate.main()
+    error = capsys.readouterr().err
+    assert str(script) in error and 'w Bal1 9' in error
@@ -0,0 +1,41 @@
+import os
+
+from conftest import ROOT
+from a2 import *
+
+HOUSE = os.path.join(ROOT, 'outdoors.txt')
+
+
+def test_models_do_not_share_a_default_sink():
+    first, second = Model(HOUSE, rng=0), Model(HOUSE, rng=1)
+    assert first.events is not second.events
+    first.next([])
+    assert (first.events.day, second.events.day) == (1, 0)
+
+
+def test_fork_records_its_own_days_and_rooms():
+    parent = Model(HOUSE, rng=2, events=ColumnarLog())
+    for _ in range(3):
+        parent.next([])
+    fork = parent.fork()
+    assert isinstance(fork.events, ColumnarLog) and len(fork.events) == 0
+    played = len(parent.events)
+    for _ in range(6):
+        fork.next([])
+    parent.next([])
+    assert len(parent.events) >= played
+    assert set(fork.events.days) <= set(range(4, 10))
+    assert set(parent.events.days[played:]) <= {4}
+    alone = Model(HOUSE, rng=2, events=ColumnarLog())
+    for _ in range(9):
+        alone.next([])
+    log = alone.events.columns()
+    start = sum(1 for day in log['day'] if day < 4)
+    assert fork.events.columns() == {name: values[start:] for name, values in log.items()}
+
+
+def test_text_sink_copy_keeps_its_settings():
+    sink = TextSink(buffered=False)
+    sink.day = 7
+    copy = sink.copy()
+    assert (copy.stream, copy.buffered, copy.day) == (sink.stream, False, 0)
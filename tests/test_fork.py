@@ -0,0 +1,33 @@
+import os
+
+from conftest import ROOT
+from a2 import *
+
+HOUSE = os.path.join(ROOT, 'outdoors.txt')
+
+
+def test_fork_keeps_house_list_in_step_with_its_rooms():
+    parent = Model(HOUSE, rng=0, events=NullSink())
+    before = [(name, repr(room.get_plants())) for room, name in parent.house[0]]
+    fork = parent.fork(1)
+    run_command(fork, 'rm Bal1 0', [])
+    run_command(fork, 'w Gre1 0', [])
+    for model in (parent, fork):
+        assert [room for room, _ in model.house[0]] == model.get_all_rooms()
+        assert [name for _, name in model.house[0]] == list(model.get_rooms())
+    assert [(name, repr(room.get_plants())) for room, name in parent.house[0]] == before
+    assert fork.house[0][0][0].get_pot(0).look_at_plant() is None
+    assert parent.house[0][0][0].get_pot(0).look_at_plant() is not None
+    assert fork.house[0][1][0] is not parent.house[0][1][0]
+    assert fork.house[0][2][0] is parent.house[0][2][0]
+
+
+def test_parent_changes_do_not_reach_the_fork():
+    parent = Model(HOUSE, rng=0, events=NullSink())
+    fork = parent.fork()
+    parent.next([])
+    run_command(parent, 'rm Bal2 1', [])
+    assert fork.get_days_past() == 1
+    assert fork.get_rooms()['Bal2'].get_pot(1).look_at_plant() is not None
+    for model in (parent, fork):
+        assert [room for room, _ in model.house[0]] == model.get_all_rooms()
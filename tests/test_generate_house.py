@@ -0,0 +1,26 @@
+import sys
+
+import pytest
+
+import generate_house
+from generate_house import parse_species
+
+
+def test_parse_species_reads_weights():
+    assert parse_species('Rebutia=3,Cereus') == {'Rebutia': 3.0, 'Cereus': 1.0}
+    assert parse_species('Rebutia=0,Cereus=2') == {'Rebutia': 0.0, 'Cereus': 2.0}
+
+
+@pytest.mark.parametrize('text', ['Rebutia=0', 'Rebutia=0,Cereus=0', 'Rebutia=-1',
+    'Rebutia=inf', 'Rebutia=nan', 'Rebutia=x', 'Rose=1'])
+def test_parse_species_rejects_bad_weights(text):
+    with pytest.raises(ValueError):
+        parse_species(text)
+
+
+def test_zero_weights_are_an_argument_error(monkeypatch, capsys):
+    monkeypatch.setattr(sys, 'argv', ['generate_house.py', '3', '--species', 'Rebutia=0'])
+    with pytest.raises(SystemExit) as exit:
+        generate_house.main()
+    assert exit.value.code == 2
+    assert '--species' in capsys.readouterr().err
@@ -0,0 +1,49 @@
+""" A damaged compiled image must never stop a house from loading. """
+import glob
+import os
+
+from a2 import *
+from conftest import ROOT
+
+HOUSE = os.path.join(ROOT, 'house2.txt')
+
+
+def _layout(model: Model) -> list:
+    return [(name, position, None if pot.look_at_plant() is None
+        else pot.look_at_plant().get_name(), pot.get_sun_range(), pot.get_evaporation())
+        for name, room in model.get_rooms().items()
+        for position, pot in room.get_pots().items()]
+
+
+def _damage(tmp_path, change) -> str:
+    """ Compile the house, damage its image with change and return the cache. """
+    cache_dir = str(tmp_path)
+    Model(HOUSE, events=NullSink(), cache_dir=cache_dir)
+    (image,) = glob.glob(os.path.join(cache_dir, '*.ghc'))
+    with open(image, 'rb') as file:
+        data = file.read()
+    with open(image, 'wb') as file:
+        file.write(change(data))
+    return cache_dir
+
+
+def test_truncated_image_falls_back_to_text(tmp_path):
+    cache_dir = _damage(tmp_path, lambda data: data[:len(data) // 2])
+    model = Model(HOUSE, events=NullSink(), cache_dir=cache_dir)
+    assert _layout(model) == _layout(Model(HOUSE, events=NullSink()))
+
+
+def test_corrupt_image_falls_back_to_text(tmp_path):
+    def flip(data: bytes) -> bytes:
+        return data[:40] + bytes([data[40] ^ 0xff]) + data[41:]
+    cache_dir = _damage(tmp_path, flip)
+    model = Model(HOUSE, events=NullSink(), cache_dir=cache_dir)
+    assert _layout(model) == _layout(Model(HOUSE, events=NullSink()))
+
+
+def test_damaged_image_is_replaced(tmp_path):
+    cache_dir = _damage(tmp_path, lambda data: data[:10])
+    Model(HOUSE, events=NullSink(), cache_dir=cache_dir)
+    (image,) = glob.glob(os.path.join(cache_dir, '*.ghc'))
+    with open(image, 'rb') as file:
+        assert CompiledHouse(file.read()).room_names()
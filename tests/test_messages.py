@@ -0,0 +1,40 @@
+import builtins
+import os
+
+import pytest
+
+from conftest import ROOT
+from a2 import *
+
+GOLDEN = os.path.join(ROOT, 'tests', 'golden')
+
+
+@pytest.mark.parametrize('engine', ['object', 'array'])
+def test_game_prints_what_the_original_game_printed(engine, monkeypatch, capsys):
+    """ outdoors-3.out is the output of the original game (the baseline
+        commit) playing outdoors-3.in on outdoors.txt after random.seed(3),
+        with its dice drawn as dice_roll draws them.
+    """
+    if engine == 'array':
+        pytest.importorskip('numpy')
+    with open(os.path.join(GOLDEN, 'outdoors-3.in')) as file:
+        steps = iter(file.read().splitlines())
+
+    def prompt(text=''):
+        print(text, end='')
+        return next(steps)
+    monkeypatch.setattr(builtins, 'input', prompt)
+    house = os.path.join(ROOT, 'outdoors.txt')
+    GardenSim(house, View(), 3, model=Model(house, engine, 3)).play()
+    with open(os.path.join(GOLDEN, 'outdoors-3.out')) as file:
+        assert capsys.readouterr().out == file.read()
+
+
+def test_pot_animal_attack_keeps_its_message():
+    pot = Pot()
+    pot.put_plant(Plant('Rebutia'))
+    pot.plant.health = 1
+    events = TextSink()
+    pot.animal_attack(events)
+    assert pot.plant.is_dead()
+    assert events.messages == ["There has been an animal attack! Poor Rebutia."]
@@ -0,0 +1,80 @@
+import os
+import sys
+
+import pytest
+
+from conftest import ROOT, game_state
+from a2 import *
+from movelog import read_log
+import replay
+
+HOUSE = os.path.join(ROOT, 'outdoors.txt')
+
+STEPS = ['w Bal1 0', 'a Bal1 0 F', 'n', 'zz', 'rm Gre1 2', 'm Bal2 0 Gre1 1', 'n',
+    'a Bal2 1 R', 'n', 's Bal1 3 Gre1 0', 'n', 'w Nowhere 1', 'p Rebutia Gre1 2', 'n',
+    'a Gre1 2 F']
+
+
+def _play(tmp_path, steps, engine='object', seed=6):
+    """ Play steps with a logging GardenSim and return it and the log path. """
+    log = str(tmp_path / 'game.log')
+    house = HOUSE
+    game = GardenSim(house, View(), seed, log_file=log,
+        model=Model(house, engine, seed, events=NullSink()))
+    for step in steps:
+        game.execute(step)
+    game.log.close()
+    return game, log
+
+
+def _pending(applied_items):
+    return [(room, position, item.get_id()) for room, position, item in applied_items]
+
+
+@pytest.mark.parametrize('engine', ['object', 'array'])
+def test_replay_reaches_the_logged_game(engine, tmp_path, monkeypatch, capsys):
+    if engine == 'array':
+        pytest.importorskip('numpy')
+    game, log = _play(tmp_path, STEPS, engine)
+    (logged,) = read_log(log)
+    assert 'zz' not in logged.commands and 'w Nowhere 1' not in logged.commands
+    for replay_engine in ('object', 'array'):
+        if replay_engine == 'array':
+            pytest.importorskip('numpy')
+        model, applied_items = replay.replay(logged, engine=replay_engine)
+        assert game_state(model) == game_state(game.model)
+        assert model.rng.getstate() == game.model.rng.getstate()
+        assert _pending(applied_items) == _pending(game.applied_item)
+
+    capsys.readouterr()
+    View().draw(game.model.get_all_rooms())
+    drawn = capsys.readouterr().out
+    monkeypatch.setattr(sys, 'argv', ['replay.py', log, '--engine', engine, '--show'])
+    replay.main()
+    model = game.model
+    assert capsys.readouterr().out == drawn + (f"day {model.get_days_past()}: "
+        f"{model.get_number_of_plants_alive()} plants alive, "
+        f"{len(game.applied_item)} items waiting, won: {bool(model.has_won())}\n")
+
+
+def test_replay_follows_save_and_load(tmp_path):
+    saved = str(tmp_path / 'game.sav')
+    steps = STEPS[:9] + [f'save {saved}', 'n', 'rm Bal1 0', 'n', f'load {saved}',
+        'w Gre1 1'] + STEPS[9:]
+    game, log = _play(tmp_path, steps)
+    (logged,) = read_log(log)
+    assert f'load {saved}' in logged.commands
+    model, applied_items = replay.replay(logged)
+    assert game_state(model) == game_state(game.model)
+    assert model.rng.getstate() == game.model.rng.getstate()
+    assert _pending(applied_items) == _pending(game.applied_item)
+
+
+def test_replay_stops_at_a_day(tmp_path):
+    game, log = _play(tmp_path, STEPS)
+    (logged,) = read_log(log)
+    days = [model.get_days_past() for model in replay.replay_days(logged)]
+    assert days == list(range(1, game.model.get_days_past() + 1))
+    model, _ = replay.replay(logged, day=3)
+    assert model.get_days_past() == 3
+    assert model.get_rooms()['Bal2'].get_pot(1).look_at_plant().has_repellent() is False
@@ -0,0 +1,90 @@
+import os
+import random
+
+import pytest
+
+from conftest import ROOT, drain_changes, game_state
+from a2 import *
+from scheduler import Scheduler
+
+HOUSES = ['house1.txt', 'house2.txt', 'indoors.txt', 'outdoors.txt', 'winnable.txt']
+
+
+def _command(rng, rooms):
+    """ A random play command, invalid ones included. """
+    where = lambda: f'{rng.choice(rooms)} {rng.randrange(4)}'
+    return rng.choice(['n', 'n', 'n', 'n', f'w {where()}', f'w {where()}',
+        f'm {where()} {where()}', f's {where()} {where()}',
+        f'p {rng.choice(PLANT_NAMES)} {where()}', f'a {where()} F', f'a {where()} R',
+        f'rm {where()}', f'ls {where()}', 'w Nowhere 9'])
+
+
+def _run(run, step, applied_items):
+    try:
+        return run(step, applied_items)
+    except ValueError:
+        return None
+
+
+def _plant(result):
+    plant = result and result[1]
+    if isinstance(plant, Plant):
+        return plant.get_name(), plant.get_water(), plant.get_health(), plant.get_age()
+    return plant
+
+
+@pytest.mark.parametrize('house', HOUSES)
+@pytest.mark.parametrize('seed', range(4))
+def test_scheduler_matches_next(house, seed):
+    path = os.path.join(ROOT, house)
+    stepped = Model(path, rng=seed, events=ColumnarLog(), check_counts=True)
+    scheduler = Scheduler(Model(path, rng=seed, events=NullSink(), check_counts=True))
+    scheduled = scheduler.model
+    rng = random.Random(seed)
+    rooms = list(stepped.get_rooms())
+    stepped_items, scheduled_items = [], []
+    for turn in range(240):
+        step = _command(rng, rooms)
+        expected = _run(lambda *args: run_command(stepped, *args), step, stepped_items)
+        result = _run(scheduler.run_command, step, scheduled_items)
+        assert (result and result[0]) == (expected and expected[0])
+        assert _plant(result) == _plant(expected)
+        assert (scheduled.counter.planted, scheduled.counter.dead, scheduled.days) == \
+            (stepped.counter.planted, stepped.counter.dead, stepped.days)
+        if turn % 60 == 30:
+            days = rng.randrange(1, 30)
+            for _ in range(days):
+                stepped.next([])
+            scheduler.advance(days)
+        if turn % 20 == 19:
+            scheduler.sync()
+            assert game_state(scheduled) == game_state(stepped)
+            assert scheduled.rng.getstate() == stepped.rng.getstate()
+            assert drain_changes(scheduled) == drain_changes(stepped)
+
+
+def test_scheduler_games_cover_items_and_attacks():
+    """ The seeded outdoors games above see fertiliser and repellent put on
+        plants, animal attacks and attacks blocked by repellent.
+    """
+    path = os.path.join(ROOT, 'outdoors.txt')
+    kinds = set()
+    items = set()
+    for seed in range(4):
+        model = Model(path, rng=seed, events=ColumnarLog())
+        rng = random.Random(seed)
+        rooms = list(model.get_rooms())
+        applied_items = []
+        for turn in range(240):
+            step = _command(rng, rooms)
+            result = _run(lambda *args: run_command(model, *args), step, applied_items)
+            if result and result[0] == 'a':
+                room_name, position, item = applied_items[-1]
+                if model.get_rooms()[room_name].get_pot(position).look_at_plant():
+                    items.add(item.get_id())
+            if turn % 60 == 30:
+                for _ in range(rng.randrange(1, 30)):
+                    model.next([])
+        kinds.update(model.events.kinds)
+    assert items == {'F', 'R'}
+    assert {'attack', 'blocked', 'died'} <= kinds
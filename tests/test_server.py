@@ -0,0 +1,101 @@
+import asyncio
+import os
+
+from conftest import ROOT
+from a2 import *
+from server import GameServer, compact_state
+
+HOUSE = os.path.join(ROOT, 'house1.txt')
+
+
+async def _reply(reader):
+    status, count = (await reader.readline()).decode().split()
+    lines = [(await reader.readline()).decode().rstrip('\n') for _ in range(int(count))]
+    return status, lines
+
+
+async def _send(reader, writer, line):
+    writer.write(line.encode() + b'\n')
+    await writer.drain()
+    return await _reply(reader)
+
+
+def _serve(client):
+    """ Run a client coroutine against a server on a free port, return its
+        result and the server.
+    """
+    async def run():
+        game_server = GameServer(HOUSE, seed=4)
+        server = await asyncio.start_server(game_server.handle, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            result = await client(reader, writer)
+            for _ in range(100):        # Let the server notice the disconnect.
+                if not game_server.sessions:
+                    break
+                await asyncio.sleep(0.01)
+        return result, game_server
+    return asyncio.run(run())
+
+
+def test_server_plays_a_short_game():
+    steps = ['w Bal1 0', 'rm Bal1 1', 'n', 'a Bal1 0 F', 'n']
+
+    async def client(reader, writer):
+        replies = [await _reply(reader)]
+        replies.append(await _send(reader, writer, 'mode state'))
+        for step in steps:
+            replies.append(await _send(reader, writer, step))
+        replies.append(await _send(reader, writer, 'quit'))
+        await reader.read()
+        writer.close()
+        return replies
+
+    replies, game_server = _serve(client)
+    status, (seed,) = replies[0]
+    assert status == 'ok' and seed.startswith('seed ')
+    assert replies[1] == ('ok', [])
+    assert replies[-1] == ('bye', [])
+    assert game_server.sessions == 0
+
+    game = GardenSim(HOUSE, View(), model=Model(HOUSE, rng=0).fork(int(seed.split()[1])))
+    game.model.events = NullSink()
+    for step, (status, lines) in zip(steps, replies[2:]):
+        game.execute(step)
+        assert status == 'ok'
+        assert lines[-1] == compact_state(game.model, game.applied_item, game.view)
+    assert replies[3][1][0].endswith('has been removed.')
+
+
+def test_server_answers_stats_and_rejects_bad_commands():
+    async def client(reader, writer):
+        await _reply(reader)
+        replies = [await _send(reader, writer, line) for line in
+            ['mode none', 'stats', 'w Bal9 0', 'zz', '', 'mode fast', 'save x.sav', 'n']]
+        writer.close()
+        return replies
+
+    replies, game_server = _serve(client)
+    assert replies[0] == ('ok', [])
+    status, lines = replies[1]
+    assert status == 'ok' and lines
+    assert replies[2] == ('error', [INVALID_MOVE + 'w Bal9 0'])
+    assert replies[3] == ('error', [INVALID_MOVE + 'zz'])
+    assert replies[4] == ('error', ['empty command'])
+    assert replies[5][0] == 'error'
+    assert replies[6] == ('error', ['save is not available on the server'])
+    assert replies[7][0] == 'ok'
+    assert game_server.sessions == 0
+
+
+def test_server_drops_a_session_on_disconnect():
+    async def client(reader, writer):
+        await _reply(reader)
+        writer.write(b'w Bal1 0\nn\n')  # Hang up without reading the replies.
+        await writer.drain()
+        writer.close()
+        await writer.wait_closed()
+
+    _, game_server = _serve(client)
+    assert game_server.sessions == 0
@@ -0,0 +1,65 @@
+import io
+import os
+import random
+from contextlib import redirect_stdout
+from multiprocessing.shared_memory import SharedMemory
+
+import pytest
+
+from conftest import ROOT
+from a2 import *
+from server import Session
+from shards import SessionManager, PLAYING
+
+HOUSE = os.path.join(ROOT, 'house2.txt')
+
+
+def _steps(rooms, rng, count):
+    steps = []
+    for _ in range(count):
+        room = rng.choice(rooms)
+        steps.append(rng.choice(['n', 'n', f'w {room} {rng.randrange(4)}',
+            f'a {room} {rng.randrange(4)} F', f's {room} 0 {rng.choice(rooms)} 1',
+            f'rm {room} {rng.randrange(4)}', 'zz']))
+    return steps
+
+
+def test_sharded_sessions_play_like_single_process_sessions():
+    with SessionManager(HOUSE, 2, seed=5) as manager:
+        sids = [manager.open() for _ in range(5)]
+        assert manager.load() == [3, 2]
+        template = Model(HOUSE, rng=0, events=NullSink())
+        local = {sid: Session(template, View(), manager.sessions[sid][1]) for sid in sids}
+        for session in local.values():
+            session.mode = 'none'
+        rng = random.Random(2)
+        rooms = list(template.get_rooms())
+        for i, step in enumerate(_steps(rooms, rng, 150)):
+            sid = rng.choice(sids)
+            with redirect_stdout(io.StringIO()):
+                expected = local[sid].handle(step)
+            assert tuple(manager.play(sid, step)) == tuple(expected)
+            if i % 40 == 39:
+                manager.migrate(sid, 1 - manager.sessions[sid][0])
+        assert manager.balance() <= 1
+
+        for sid, session in local.items():
+            model = session.game.model
+            state = manager.state(sid)
+            assert state.day == model.get_days_past()
+            assert state.alive == model.get_number_of_plants_alive()
+            assert state.planted == model.counter.planted
+            assert state.items == len(session.game.applied_item)
+            assert state.result == PLAYING or model.get_days_past() >= 15
+            output = io.StringIO()
+            with redirect_stdout(output):
+                View().draw(model.get_all_rooms())
+            assert manager.board(sid) == output.getvalue()
+
+        names = [manager.sessions[sid][2].name for sid in sids]
+        manager.close(sids[0])
+        with pytest.raises(FileNotFoundError):
+            SharedMemory(names[0])
+    for name in names[1:]:
+        with pytest.raises(FileNotFoundError):
+            SharedMemory(name)
@@ -0,0 +1,105 @@
+import builtins
+import os
+import zlib
+
+import pytest
+
+from conftest import ROOT, game_state
+from a2 import *
+from snapshot import HEADER, decode_snapshot
+
+HOUSE = os.path.join(ROOT, 'outdoors.txt')
+
+
+def _played(engine='object', seed=4):
+    model = Model(HOUSE, engine, seed, events=NullSink())
+    applied_items = []
+    for step in ['w Bal1 0', 'a Bal1 0 F', 'n', 'rm Gre1 2', 'a Bal2 0 R', 'n', 'n',
+            'a Bal1 3 F']:
+        name, _ = run_command(model, step, applied_items)
+        if name == 'n':
+            applied_items = []
+    return model, applied_items
+
+
+def _finish(model, applied_items):
+    model.next(applied_items)
+    while model.get_days_past() < 15:
+        model.next([])
+    return game_state(model)
+
+
+def _forge(data, offset, value):
+    """ Change one byte of the body and fix the checksum, as a foreign writer
+        of a well-formed but wrong snapshot would.
+    """
+    body = bytearray(data[HEADER.size:])
+    body[offset - HEADER.size] = value
+    fields = list(HEADER.unpack_from(data))
+    fields[-1] = zlib.crc32(body)
+    return HEADER.pack(*fields) + bytes(body)
+
+
+@pytest.mark.parametrize('engine', ['object', 'array'])
+@pytest.mark.parametrize('seed', [4, 'text seed'])
+def test_restored_game_plays_on_as_the_saved_one(engine, seed):
+    if engine == 'array':
+        pytest.importorskip('numpy')
+    model, applied_items = _played(engine, seed)
+    restored, pending = Model.restore(model.snapshot(applied_items), events=NullSink())
+    assert game_state(restored) == game_state(model)
+    assert (restored.engine is None) == (engine == 'object')
+    assert restored.seed == seed
+    assert [(room, position, item.get_id()) for room, position, item in pending] == \
+        [(room, position, item.get_id()) for room, position, item in applied_items]
+    assert restored.snapshot(pending) == model.snapshot(applied_items)
+    assert _finish(restored, pending) == _finish(model, applied_items)
+
+
+def test_save_and_load(tmp_path):
+    model, applied_items = _played()
+    path = str(tmp_path / 'game.sav')
+    model.save(path, applied_items)
+    loaded, pending = Model.load(path, events=NullSink())
+    assert game_state(loaded) == game_state(model)
+    assert _finish(loaded, pending) == _finish(model, applied_items)
+
+
+def test_damaged_snapshots_are_rejected():
+    model, applied_items = _played()
+    data = model.snapshot(applied_items)
+    damaged = [b'', data[:10], data[:HEADER.size], data[:-1], data + b'\0',
+        b'XXXX' + data[4:], data[:200] + bytes([data[200] ^ 1]) + data[201:]]
+    for bad in damaged:
+        with pytest.raises(ValueError):
+            decode_snapshot(bad)
+
+
+def test_foreign_indexes_are_rejected():
+    model, applied_items = _played()
+    data = model.snapshot(applied_items)
+    pots = len(model.get_all_rooms()) * 4
+    species = HEADER.size + pots * (8 * 2 + 4 * 4)
+    flags = species + pots
+    layouts = flags + pots
+    for offset, value in ((layouts, 200), (species, 100), (flags, 64)):
+        with pytest.raises(ValueError):
+            decode_snapshot(_forge(data, offset, value))
+    pending = data.rindex(b'F', 0, len(data) - 4 * 625)
+    with pytest.raises(ValueError):
+        decode_snapshot(_forge(data, pending, ord('Z')))
+    room = data.rindex(b'Bal1', 0, pending)
+    with pytest.raises(ValueError):
+        decode_snapshot(_forge(data, room + 3, ord('9')))
+
+
+def test_game_reports_a_snapshot_it_cannot_load(tmp_path, capsys):
+    model, applied_items = _played()
+    data = model.snapshot(applied_items)
+    pots = len(model.get_all_rooms()) * 4
+    path = tmp_path / 'game.sav'
+    path.write_bytes(_forge(data, HEADER.size + pots * (8 * 2 + 4 * 4), 100))
+    game = GardenSim(HOUSE, View(), 1)
+    assert not game.execute(f'load {path}')
+    assert capsys.readouterr().out.startswith(f'Cannot load {path}:')
+    assert game.model.get_days_past() == 1
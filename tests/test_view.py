@@ -0,0 +1,68 @@
+import os
+import shutil
+
+import pytest
+
+from conftest import ROOT
+from a2 import *
+
+HOUSE = os.path.join(ROOT, 'house2.txt')
+
+
+@pytest.fixture
+def terminal(monkeypatch):
+    """ Set the size the view sees for the terminal, 80 by 24 to start with. """
+    size = [80, 24]
+    monkeypatch.setattr(shutil, 'get_terminal_size',
+        lambda *args: os.terminal_size(tuple(size)))
+    return size
+
+
+def test_incremental_view_draws_changes_from_every_log(terminal, capsys):
+    fork = Model(HOUSE, rng=0).fork()
+    run_command(fork, 'p Rebutia Bed1 0', [])
+    rooms = fork.get_all_rooms()
+    assert rooms[0].changes is not rooms[1].changes     # Bal1 is still shared.
+    view = IncrementalView()
+    view.draw(rooms)
+    capsys.readouterr()
+    run_command(fork, 'rm Bed1 0', [])
+    view.draw(fork.get_all_rooms())
+    assert capsys.readouterr().out.startswith('\x1b7\x1b[')
+    view.draw(fork.get_all_rooms())
+    assert capsys.readouterr().out == ''
+
+
+def test_incremental_view_draws_an_empty_house(terminal, capsys):
+    view = IncrementalView()
+    for rooms in ([], [], []):
+        view.draw(rooms)
+    rooms = []
+    view.draw(rooms)
+    view.draw(rooms)
+
+
+def test_house_wider_than_the_terminal_is_drawn_in_full(terminal, capsys):
+    model = Model(HOUSE, rng=0)
+    view = IncrementalView()
+    view.draw(model.get_all_rooms())
+    assert '\x1b[2J' in capsys.readouterr().out
+    terminal[0] = 30
+    run_command(model, 'p Rebutia Bed1 0', [])
+    view.draw(model.get_all_rooms())
+    narrow = capsys.readouterr().out
+    assert narrow.startswith('\x1b7\x1b[r\x1b8')       # The scroll region is given back.
+    assert '\x1b[2J' not in narrow and narrow.count('\n') == ROOM_ROW
+    view.draw(model.get_all_rooms())
+    assert capsys.readouterr().out.count('\n') == ROOM_ROW
+    terminal[0] = 80
+    view.draw(model.get_all_rooms())
+    assert '\x1b[2J' in capsys.readouterr().out
+
+
+def test_game_gives_the_terminal_back(terminal, capsys):
+    game = GardenSim(HOUSE, IncrementalView(), 0)
+    game.play_script(['p Rebutia Bal1 0', 'n'])
+    assert capsys.readouterr().out.endswith('\x1b7\x1b[r\x1b8')
+    game.view.close()
+    assert capsys.readouterr().out == ''